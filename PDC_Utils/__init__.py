@@ -0,0 +1,37 @@
+"""Utilities to manage power duration curves"""
+
+# The public API is resolved on first access (PEP 562), so `import PDC_Utils` stays cheap and
+# lmfit, pandas and fitdecode are only loaded by the code paths that need them
+import importlib
+
+_EXPORTS = {
+    'mmp': ['DEFAULT_DURATIONS', 'MMP', 'CP_DURATIONS', 'CPFit', 'fit_cp', 'mmp_curve', 'mmp_curve_full', 'MMPStream',
+            'MMPEnvelope', 'COGGAN_ZONES', 'NP_WINDOW', 'ActivitySummary', 'summarize_power'],
+    'pdc': ['PDC_MODEL', 'PARAM_BOUNDS', 'power_curve', 'power_curve_grid', 'power_curve_jac', 'initial_guess',
+            'make_params', 'PDC', 'fit_batch', 'FitRecord', 'fit_many', 'thin_curve',
+            'BootstrapResult'],
+    'fit': ['FitLoader', 'resample_power', 'load_fit_file', 'mmp_from_fit', 'pdc_from_fit', 'mmp_from_fit_async',
+            'pdc_from_fit_async'],
+    'cache': ['CACHE_VERSION', 'file_digest', 'MMPCache'],
+    'batch': ['find_fit_files', 'BatchResult', 'iter_mmp_batch', 'mmp_batch'],
+    'store': ['STORE_VERSION', 'StoredActivity', 'ActivityStore'],
+    'instrument': ['Event', 'EventLog', 'stage_hook'],
+    'aio': ['ExecutorBusy', 'configure_executor', 'shutdown_executor', 'run_blocking'],
+}
+_MODULES = {name: module for module, names in _EXPORTS.items() for name in names}
+
+__all__ = list(_MODULES)
+
+
+def __getattr__(name):
+    if name in _EXPORTS:
+        return importlib.import_module(f'{__name__}.{name}')
+    if name in _MODULES:
+        value = getattr(importlib.import_module(f'{__name__}.{_MODULES[name]}'), name)
+        globals()[name] = value
+        return value
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
+
+
+def __dir__():
+    return sorted(set(globals()) | set(__all__) | set(_EXPORTS))
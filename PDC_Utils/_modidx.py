@@ -5,20 +5,196 @@ d = { 'settings': { 'branch': 'main',
                 'doc_host': 'https://jpequegn.github.io',
                 'git_url': 'https://github.com/jpequegn/PDC-Utils',
                 'lib_path': 'PDC_Utils'},
-  'syms': { 'PDC_Utils.core': {'PDC_Utils.core.foo': ('core.html#foo', 'PDC_Utils/core.py')},
+  'syms': { 'PDC_Utils.aio': { 'PDC_Utils.aio.ExecutorBusy': ('async.html#executorbusy', 'PDC_Utils/aio.py'),
+                               'PDC_Utils.aio._Slots': ('async.html#_slots', 'PDC_Utils/aio.py'),
+                               'PDC_Utils.aio._Slots.__init__': ('async.html#_slots.__init__', 'PDC_Utils/aio.py'),
+                               'PDC_Utils.aio._Slots._grant': ('async.html#_slots._grant', 'PDC_Utils/aio.py'),
+                               'PDC_Utils.aio._Slots.acquire': ('async.html#_slots.acquire', 'PDC_Utils/aio.py'),
+                               'PDC_Utils.aio._Slots.pending': ('async.html#_slots.pending', 'PDC_Utils/aio.py'),
+                               'PDC_Utils.aio._Slots.release': ('async.html#_slots.release', 'PDC_Utils/aio.py'),
+                               'PDC_Utils.aio._call': ('async.html#_call', 'PDC_Utils/aio.py'),
+                               'PDC_Utils.aio._shared': ('async.html#_shared', 'PDC_Utils/aio.py'),
+                               'PDC_Utils.aio._stop_check': ('async.html#_stop_check', 'PDC_Utils/aio.py'),
+                               'PDC_Utils.aio.configure_executor': ('async.html#configure_executor', 'PDC_Utils/aio.py'),
+                               'PDC_Utils.aio.run_blocking': ('async.html#run_blocking', 'PDC_Utils/aio.py'),
+                               'PDC_Utils.aio.shutdown_executor': ('async.html#shutdown_executor', 'PDC_Utils/aio.py')},
+            'PDC_Utils.batch': { 'PDC_Utils.batch.BatchResult': ('batch.html#batchresult', 'PDC_Utils/batch.py'),
+                                 'PDC_Utils.batch.BatchResult.ok': ('batch.html#batchresult.ok', 'PDC_Utils/batch.py'),
+                                 'PDC_Utils.batch._process_chunk': ('batch.html#_process_chunk', 'PDC_Utils/batch.py'),
+                                 'PDC_Utils.batch.find_fit_files': ('batch.html#find_fit_files', 'PDC_Utils/batch.py'),
+                                 'PDC_Utils.batch.iter_mmp_batch': ('batch.html#iter_mmp_batch', 'PDC_Utils/batch.py'),
+                                 'PDC_Utils.batch.mmp_batch': ('batch.html#mmp_batch', 'PDC_Utils/batch.py')},
+            'PDC_Utils.cache': { 'PDC_Utils.cache.MMPCache': ('cache.html#mmpcache', 'PDC_Utils/cache.py'),
+                                 'PDC_Utils.cache.MMPCache.__init__': ('cache.html#mmpcache.__init__', 'PDC_Utils/cache.py'),
+                                 'PDC_Utils.cache.MMPCache._path': ('cache.html#mmpcache._path', 'PDC_Utils/cache.py'),
+                                 'PDC_Utils.cache.MMPCache.clear': ('cache.html#mmpcache.clear', 'PDC_Utils/cache.py'),
+                                 'PDC_Utils.cache.MMPCache.entries': ('cache.html#mmpcache.entries', 'PDC_Utils/cache.py'),
+                                 'PDC_Utils.cache.MMPCache.evict': ('cache.html#mmpcache.evict', 'PDC_Utils/cache.py'),
+                                 'PDC_Utils.cache.MMPCache.get': ('cache.html#mmpcache.get', 'PDC_Utils/cache.py'),
+                                 'PDC_Utils.cache.MMPCache.get_or_compute': ('cache.html#mmpcache.get_or_compute', 'PDC_Utils/cache.py'),
+                                 'PDC_Utils.cache.MMPCache.key': ('cache.html#mmpcache.key', 'PDC_Utils/cache.py'),
+                                 'PDC_Utils.cache.MMPCache.put': ('cache.html#mmpcache.put', 'PDC_Utils/cache.py'),
+                                 'PDC_Utils.cache.MMPCache.size': ('cache.html#mmpcache.size', 'PDC_Utils/cache.py'),
+                                 'PDC_Utils.cache.file_digest': ('cache.html#file_digest', 'PDC_Utils/cache.py')},
+            'PDC_Utils.core': {'PDC_Utils.core.foo': ('core.html#foo', 'PDC_Utils/core.py')},
             'PDC_Utils.fit': { 'PDC_Utils.fit.FitLoader': ('fit.html#fitloader', 'PDC_Utils/fit.py'),
                                'PDC_Utils.fit.FitLoader.__init__': ('fit.html#fitloader.__init__', 'PDC_Utils/fit.py'),
+                               'PDC_Utils.fit.FitLoader._decode_power_data': ('fit.html#fitloader._decode_power_data', 'PDC_Utils/fit.py'),
+                               'PDC_Utils.fit.FitLoader._file_signature': ('fit.html#fitloader._file_signature', 'PDC_Utils/fit.py'),
+                               'PDC_Utils.fit.FitLoader._power_frame': ('fit.html#fitloader._power_frame', 'PDC_Utils/fit.py'),
+                               'PDC_Utils.fit.FitLoader.compute_full_mmp_curve': ( 'fit.html#fitloader.compute_full_mmp_curve',
+                                                                                   'PDC_Utils/fit.py'),
                                'PDC_Utils.fit.FitLoader.compute_mmp_curve': ('fit.html#fitloader.compute_mmp_curve', 'PDC_Utils/fit.py'),
                                'PDC_Utils.fit.FitLoader.extract_power_data': ('fit.html#fitloader.extract_power_data', 'PDC_Utils/fit.py'),
                                'PDC_Utils.fit.FitLoader.get_power_duration_data': ( 'fit.html#fitloader.get_power_duration_data',
                                                                                     'PDC_Utils/fit.py'),
+                               'PDC_Utils.fit.FitLoader.iter_chunks': ('fit.html#fitloader.iter_chunks', 'PDC_Utils/fit.py'),
+                               'PDC_Utils.fit.FitLoader.reload': ('fit.html#fitloader.reload', 'PDC_Utils/fit.py'),
+                               'PDC_Utils.fit.FitLoader.resample_power': ('fit.html#fitloader.resample_power', 'PDC_Utils/fit.py'),
+                               'PDC_Utils.fit.FitLoader.stream_mmp_curve': ('fit.html#fitloader.stream_mmp_curve', 'PDC_Utils/fit.py'),
+                               'PDC_Utils.fit.FitLoader.summarize': ('fit.html#fitloader.summarize', 'PDC_Utils/fit.py'),
+                               'PDC_Utils.fit._UnsupportedFit': ('fit.html#_unsupportedfit', 'PDC_Utils/fit.py'),
+                               'PDC_Utils.fit._as_loader': ('fit.html#_as_loader', 'PDC_Utils/fit.py'),
+                               'PDC_Utils.fit._compressed_timestamp': ('fit.html#_compressed_timestamp', 'PDC_Utils/fit.py'),
+                               'PDC_Utils.fit._definition_layout': ('fit.html#_definition_layout', 'PDC_Utils/fit.py'),
+                               'PDC_Utils.fit._iter_power_columns': ('fit.html#_iter_power_columns', 'PDC_Utils/fit.py'),
+                               'PDC_Utils.fit._max_pause': ('fit.html#_max_pause', 'PDC_Utils/fit.py'),
+                               'PDC_Utils.fit._mmp_curve': ('fit.html#_mmp_curve', 'PDC_Utils/fit.py'),
+                               'PDC_Utils.fit._power_frame_from_columns': ('fit.html#_power_frame_from_columns', 'PDC_Utils/fit.py'),
+                               'PDC_Utils.fit._read_ahead': ('fit.html#_read_ahead', 'PDC_Utils/fit.py'),
+                               'PDC_Utils.fit._read_power_chunks': ('fit.html#_read_power_chunks', 'PDC_Utils/fit.py'),
+                               'PDC_Utils.fit._read_power_records': ('fit.html#_read_power_records', 'PDC_Utils/fit.py'),
+                               'PDC_Utils.fit._resample_segment': ('fit.html#_resample_segment', 'PDC_Utils/fit.py'),
+                               'PDC_Utils.fit._scan_power_chunks': ('fit.html#_scan_power_chunks', 'PDC_Utils/fit.py'),
+                               'PDC_Utils.fit._scan_power_records': ('fit.html#_scan_power_records', 'PDC_Utils/fit.py'),
                                'PDC_Utils.fit.load_fit_file': ('fit.html#load_fit_file', 'PDC_Utils/fit.py'),
                                'PDC_Utils.fit.mmp_from_fit': ('fit.html#mmp_from_fit', 'PDC_Utils/fit.py'),
-                               'PDC_Utils.fit.pdc_from_fit': ('fit.html#pdc_from_fit', 'PDC_Utils/fit.py')},
-            'PDC_Utils.mmp': { 'PDC_Utils.mmp.MMP': ('mmp.html#mmp', 'PDC_Utils/mmp.py'),
+                               'PDC_Utils.fit.mmp_from_fit_async': ('fit.html#mmp_from_fit_async', 'PDC_Utils/fit.py'),
+                               'PDC_Utils.fit.pdc_from_fit': ('fit.html#pdc_from_fit', 'PDC_Utils/fit.py'),
+                               'PDC_Utils.fit.pdc_from_fit_async': ('fit.html#pdc_from_fit_async', 'PDC_Utils/fit.py'),
+                               'PDC_Utils.fit.resample_power': ('fit.html#resample_power', 'PDC_Utils/fit.py')},
+            'PDC_Utils.instrument': { 'PDC_Utils.instrument.Event': ('instrument.html#event', 'PDC_Utils/instrument.py'),
+                                      'PDC_Utils.instrument.EventLog': ('instrument.html#eventlog', 'PDC_Utils/instrument.py'),
+                                      'PDC_Utils.instrument.EventLog.__call__': ( 'instrument.html#eventlog.__call__',
+                                                                                  'PDC_Utils/instrument.py'),
+                                      'PDC_Utils.instrument.EventLog.__init__': ( 'instrument.html#eventlog.__init__',
+                                                                                  'PDC_Utils/instrument.py'),
+                                      'PDC_Utils.instrument.EventLog.stage': ('instrument.html#eventlog.stage', 'PDC_Utils/instrument.py'),
+                                      'PDC_Utils.instrument.EventLog.summary': ( 'instrument.html#eventlog.summary',
+                                                                                 'PDC_Utils/instrument.py'),
+                                      'PDC_Utils.instrument._end_stage': ('instrument.html#_end_stage', 'PDC_Utils/instrument.py'),
+                                      'PDC_Utils.instrument._start_stage': ('instrument.html#_start_stage', 'PDC_Utils/instrument.py'),
+                                      'PDC_Utils.instrument.stage_hook': ('instrument.html#stage_hook', 'PDC_Utils/instrument.py')},
+            'PDC_Utils.mmp': { 'PDC_Utils.mmp.ActivitySummary': ('mmp.html#activitysummary', 'PDC_Utils/mmp.py'),
+                               'PDC_Utils.mmp.CPFit': ('mmp.html#cpfit', 'PDC_Utils/mmp.py'),
+                               'PDC_Utils.mmp.CPFit.pdc_init': ('mmp.html#cpfit.pdc_init', 'PDC_Utils/mmp.py'),
+                               'PDC_Utils.mmp.CPFit.power': ('mmp.html#cpfit.power', 'PDC_Utils/mmp.py'),
+                               'PDC_Utils.mmp.MMP': ('mmp.html#mmp', 'PDC_Utils/mmp.py'),
+                               'PDC_Utils.mmp.MMP.__eq__': ('mmp.html#mmp.__eq__', 'PDC_Utils/mmp.py'),
                                'PDC_Utils.mmp.MMP.__init__': ('mmp.html#mmp.__init__', 'PDC_Utils/mmp.py'),
-                               'PDC_Utils.mmp.MMP.fit': ('mmp.html#mmp.fit', 'PDC_Utils/mmp.py')},
-            'PDC_Utils.pdc': { 'PDC_Utils.pdc.PDC': ('pdc.html#pdc', 'PDC_Utils/pdc.py'),
+                               'PDC_Utils.mmp.MMP.__len__': ('mmp.html#mmp.__len__', 'PDC_Utils/mmp.py'),
+                               'PDC_Utils.mmp.MMP.__repr__': ('mmp.html#mmp.__repr__', 'PDC_Utils/mmp.py'),
+                               'PDC_Utils.mmp.MMP._checked': ('mmp.html#mmp._checked', 'PDC_Utils/mmp.py'),
+                               'PDC_Utils.mmp.MMP._sources': ('mmp.html#mmp._sources', 'PDC_Utils/mmp.py'),
+                               'PDC_Utils.mmp.MMP.duration_for': ('mmp.html#mmp.duration_for', 'PDC_Utils/mmp.py'),
+                               'PDC_Utils.mmp.MMP.fit': ('mmp.html#mmp.fit', 'PDC_Utils/mmp.py'),
+                               'PDC_Utils.mmp.MMP.from_bytes': ('mmp.html#mmp.from_bytes', 'PDC_Utils/mmp.py'),
+                               'PDC_Utils.mmp.MMP.merge': ('mmp.html#mmp.merge', 'PDC_Utils/mmp.py'),
+                               'PDC_Utils.mmp.MMP.power_at': ('mmp.html#mmp.power_at', 'PDC_Utils/mmp.py'),
+                               'PDC_Utils.mmp.MMP.to_bytes': ('mmp.html#mmp.to_bytes', 'PDC_Utils/mmp.py'),
+                               'PDC_Utils.mmp.MMP.update': ('mmp.html#mmp.update', 'PDC_Utils/mmp.py'),
+                               'PDC_Utils.mmp.MMPEnvelope': ('mmp.html#mmpenvelope', 'PDC_Utils/mmp.py'),
+                               'PDC_Utils.mmp.MMPEnvelope.__init__': ('mmp.html#mmpenvelope.__init__', 'PDC_Utils/mmp.py'),
+                               'PDC_Utils.mmp.MMPEnvelope.__len__': ('mmp.html#mmpenvelope.__len__', 'PDC_Utils/mmp.py'),
+                               'PDC_Utils.mmp.MMPEnvelope._advance': ('mmp.html#mmpenvelope._advance', 'PDC_Utils/mmp.py'),
+                               'PDC_Utils.mmp.MMPEnvelope._as_mmp': ('mmp.html#mmpenvelope._as_mmp', 'PDC_Utils/mmp.py'),
+                               'PDC_Utils.mmp.MMPEnvelope._best_of': ('mmp.html#mmpenvelope._best_of', 'PDC_Utils/mmp.py'),
+                               'PDC_Utils.mmp.MMPEnvelope._in_window': ('mmp.html#mmpenvelope._in_window', 'PDC_Utils/mmp.py'),
+                               'PDC_Utils.mmp.MMPEnvelope._on_grid': ('mmp.html#mmpenvelope._on_grid', 'PDC_Utils/mmp.py'),
+                               'PDC_Utils.mmp.MMPEnvelope.add': ('mmp.html#mmpenvelope.add', 'PDC_Utils/mmp.py'),
+                               'PDC_Utils.mmp.MMPEnvelope.curve': ('mmp.html#mmpenvelope.curve', 'PDC_Utils/mmp.py'),
+                               'PDC_Utils.mmp.MMPStream': ('mmp.html#mmpstream', 'PDC_Utils/mmp.py'),
+                               'PDC_Utils.mmp.MMPStream.__init__': ('mmp.html#mmpstream.__init__', 'PDC_Utils/mmp.py'),
+                               'PDC_Utils.mmp.MMPStream.__len__': ('mmp.html#mmpstream.__len__', 'PDC_Utils/mmp.py'),
+                               'PDC_Utils.mmp.MMPStream._push_block': ('mmp.html#mmpstream._push_block', 'PDC_Utils/mmp.py'),
+                               'PDC_Utils.mmp.MMPStream.curve': ('mmp.html#mmpstream.curve', 'PDC_Utils/mmp.py'),
+                               'PDC_Utils.mmp.MMPStream.push': ('mmp.html#mmpstream.push', 'PDC_Utils/mmp.py'),
+                               'PDC_Utils.mmp._as_durations': ('mmp.html#_as_durations', 'PDC_Utils/mmp.py'),
+                               'PDC_Utils.mmp._breaks': ('mmp.html#_breaks', 'PDC_Utils/mmp.py'),
+                               'PDC_Utils.mmp._group_max': ('mmp.html#_group_max', 'PDC_Utils/mmp.py'),
+                               'PDC_Utils.mmp._line_fit': ('mmp.html#_line_fit', 'PDC_Utils/mmp.py'),
+                               'PDC_Utils.mmp._max_window_sums': ('mmp.html#_max_window_sums', 'PDC_Utils/mmp.py'),
+                               'PDC_Utils.mmp._max_window_sums_all': ('mmp.html#_max_window_sums_all', 'PDC_Utils/mmp.py'),
+                               'PDC_Utils.mmp._mmp_from_cumsum': ('mmp.html#_mmp_from_cumsum', 'PDC_Utils/mmp.py'),
+                               'PDC_Utils.mmp._power_cumsum': ('mmp.html#_power_cumsum', 'PDC_Utils/mmp.py'),
+                               'PDC_Utils.mmp._search_key': ('mmp.html#_search_key', 'PDC_Utils/mmp.py'),
+                               'PDC_Utils.mmp._stream_cumsums': ('mmp.html#_stream_cumsums', 'PDC_Utils/mmp.py'),
+                               'PDC_Utils.mmp._weighted_sums': ('mmp.html#_weighted_sums', 'PDC_Utils/mmp.py'),
+                               'PDC_Utils.mmp.fit_cp': ('mmp.html#fit_cp', 'PDC_Utils/mmp.py'),
+                               'PDC_Utils.mmp.mmp_curve': ('mmp.html#mmp_curve', 'PDC_Utils/mmp.py'),
+                               'PDC_Utils.mmp.mmp_curve_full': ('mmp.html#mmp_curve_full', 'PDC_Utils/mmp.py'),
+                               'PDC_Utils.mmp.summarize_power': ('mmp.html#summarize_power', 'PDC_Utils/mmp.py')},
+            'PDC_Utils.pdc': { 'PDC_Utils.pdc.BootstrapResult': ('pdc.html#bootstrapresult', 'PDC_Utils/pdc.py'),
+                               'PDC_Utils.pdc.FitRecord': ('pdc.html#fitrecord', 'PDC_Utils/pdc.py'),
+                               'PDC_Utils.pdc.FitRecord.from_result': ('pdc.html#fitrecord.from_result', 'PDC_Utils/pdc.py'),
+                               'PDC_Utils.pdc.PDC': ('pdc.html#pdc', 'PDC_Utils/pdc.py'),
                                'PDC_Utils.pdc.PDC.__init__': ('pdc.html#pdc.__init__', 'PDC_Utils/pdc.py'),
+                               'PDC_Utils.pdc.PDC.bootstrap': ('pdc.html#pdc.bootstrap', 'PDC_Utils/pdc.py'),
                                'PDC_Utils.pdc.PDC.fit': ('pdc.html#pdc.fit', 'PDC_Utils/pdc.py'),
-                               'PDC_Utils.pdc.power_curve': ('pdc.html#power_curve', 'PDC_Utils/pdc.py')}}}
+                               'PDC_Utils.pdc.PDC.fit_async': ('pdc.html#pdc.fit_async', 'PDC_Utils/pdc.py'),
+                               'PDC_Utils.pdc.PDC.fit_separable': ('pdc.html#pdc.fit_separable', 'PDC_Utils/pdc.py'),
+                               'PDC_Utils.pdc.PDC.fit_separable_async': ('pdc.html#pdc.fit_separable_async', 'PDC_Utils/pdc.py'),
+                               'PDC_Utils.pdc.PDC.thin': ('pdc.html#pdc.thin', 'PDC_Utils/pdc.py'),
+                               'PDC_Utils.pdc._Timeout': ('pdc.html#_timeout', 'PDC_Utils/pdc.py'),
+                               'PDC_Utils.pdc.__getattr__': ('pdc.html#__getattr__', 'PDC_Utils/pdc.py'),
+                               'PDC_Utils.pdc._batch_init': ('pdc.html#_batch_init', 'PDC_Utils/pdc.py'),
+                               'PDC_Utils.pdc._bootstrap': ('pdc.html#_bootstrap', 'PDC_Utils/pdc.py'),
+                               'PDC_Utils.pdc._default_guess': ('pdc.html#_default_guess', 'PDC_Utils/pdc.py'),
+                               'PDC_Utils.pdc._fit_chunk': ('pdc.html#_fit_chunk', 'PDC_Utils/pdc.py'),
+                               'PDC_Utils.pdc._fit_separable': ('pdc.html#_fit_separable', 'PDC_Utils/pdc.py'),
+                               'PDC_Utils.pdc._from_internal': ('pdc.html#_from_internal', 'PDC_Utils/pdc.py'),
+                               'PDC_Utils.pdc._init_values': ('pdc.html#_init_values', 'PDC_Utils/pdc.py'),
+                               'PDC_Utils.pdc._join': ('pdc.html#_join', 'PDC_Utils/pdc.py'),
+                               'PDC_Utils.pdc._linear_basis': ('pdc.html#_linear_basis', 'PDC_Utils/pdc.py'),
+                               'PDC_Utils.pdc._model': ('pdc.html#_model', 'PDC_Utils/pdc.py'),
+                               'PDC_Utils.pdc._report_many': ('pdc.html#_report_many', 'PDC_Utils/pdc.py'),
+                               'PDC_Utils.pdc._resample_weights': ('pdc.html#_resample_weights', 'PDC_Utils/pdc.py'),
+                               'PDC_Utils.pdc._residual_jac': ('pdc.html#_residual_jac', 'PDC_Utils/pdc.py'),
+                               'PDC_Utils.pdc._solve_linear': ('pdc.html#_solve_linear', 'PDC_Utils/pdc.py'),
+                               'PDC_Utils.pdc._stderr': ('pdc.html#_stderr', 'PDC_Utils/pdc.py'),
+                               'PDC_Utils.pdc._to_internal': ('pdc.html#_to_internal', 'PDC_Utils/pdc.py'),
+                               'PDC_Utils.pdc._upper_hull': ('pdc.html#_upper_hull', 'PDC_Utils/pdc.py'),
+                               'PDC_Utils.pdc._warm_start': ('pdc.html#_warm_start', 'PDC_Utils/pdc.py'),
+                               'PDC_Utils.pdc.fit_batch': ('pdc.html#fit_batch', 'PDC_Utils/pdc.py'),
+                               'PDC_Utils.pdc.fit_many': ('pdc.html#fit_many', 'PDC_Utils/pdc.py'),
+                               'PDC_Utils.pdc.initial_guess': ('pdc.html#initial_guess', 'PDC_Utils/pdc.py'),
+                               'PDC_Utils.pdc.make_params': ('pdc.html#make_params', 'PDC_Utils/pdc.py'),
+                               'PDC_Utils.pdc.power_curve': ('pdc.html#power_curve', 'PDC_Utils/pdc.py'),
+                               'PDC_Utils.pdc.power_curve_grid': ('pdc.html#power_curve_grid', 'PDC_Utils/pdc.py'),
+                               'PDC_Utils.pdc.power_curve_jac': ('pdc.html#power_curve_jac', 'PDC_Utils/pdc.py'),
+                               'PDC_Utils.pdc.thin_curve': ('pdc.html#thin_curve', 'PDC_Utils/pdc.py')},
+            'PDC_Utils.store': { 'PDC_Utils.store.ActivityStore': ('store.html#activitystore', 'PDC_Utils/store.py'),
+                                 'PDC_Utils.store.ActivityStore.__contains__': ( 'store.html#activitystore.__contains__',
+                                                                                 'PDC_Utils/store.py'),
+                                 'PDC_Utils.store.ActivityStore.__init__': ('store.html#activitystore.__init__', 'PDC_Utils/store.py'),
+                                 'PDC_Utils.store.ActivityStore.__iter__': ('store.html#activitystore.__iter__', 'PDC_Utils/store.py'),
+                                 'PDC_Utils.store.ActivityStore.__len__': ('store.html#activitystore.__len__', 'PDC_Utils/store.py'),
+                                 'PDC_Utils.store.ActivityStore._memory_map': ( 'store.html#activitystore._memory_map',
+                                                                                'PDC_Utils/store.py'),
+                                 'PDC_Utils.store.ActivityStore._read_index': ( 'store.html#activitystore._read_index',
+                                                                                'PDC_Utils/store.py'),
+                                 'PDC_Utils.store.ActivityStore._save_index': ( 'store.html#activitystore._save_index',
+                                                                                'PDC_Utils/store.py'),
+                                 'PDC_Utils.store.ActivityStore._write_index': ( 'store.html#activitystore._write_index',
+                                                                                 'PDC_Utils/store.py'),
+                                 'PDC_Utils.store.ActivityStore.add': ('store.html#activitystore.add', 'PDC_Utils/store.py'),
+                                 'PDC_Utils.store.ActivityStore.add_fit': ('store.html#activitystore.add_fit', 'PDC_Utils/store.py'),
+                                 'PDC_Utils.store.ActivityStore.batch': ('store.html#activitystore.batch', 'PDC_Utils/store.py'),
+                                 'PDC_Utils.store.ActivityStore.compact': ('store.html#activitystore.compact', 'PDC_Utils/store.py'),
+                                 'PDC_Utils.store.ActivityStore.get': ('store.html#activitystore.get', 'PDC_Utils/store.py'),
+                                 'PDC_Utils.store.ActivityStore.mmp_curve': ('store.html#activitystore.mmp_curve', 'PDC_Utils/store.py'),
+                                 'PDC_Utils.store.ActivityStore.size': ('store.html#activitystore.size', 'PDC_Utils/store.py'),
+                                 'PDC_Utils.store.StoredActivity': ('store.html#storedactivity', 'PDC_Utils/store.py'),
+                                 'PDC_Utils.store.StoredActivity.elapsed_time': ( 'store.html#storedactivity.elapsed_time',
+                                                                                  'PDC_Utils/store.py'),
+                                 'PDC_Utils.store.StoredActivity.to_frame': ('store.html#storedactivity.to_frame', 'PDC_Utils/store.py')}}}
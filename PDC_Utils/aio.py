@@ -0,0 +1,177 @@
+"""Run loading and fitting from asyncio code without stalling the event loop"""
+
+# AUTOGENERATED! DO NOT EDIT! File to edit: ../nbs/07_ASYNC.ipynb.
+
+# %% auto 0
+__all__ = ['ExecutorBusy', 'configure_executor', 'shutdown_executor', 'run_blocking']
+
+# %% ../nbs/07_ASYNC.ipynb 3
+import asyncio
+import collections
+import contextvars
+import functools
+import os
+import threading
+import time
+from concurrent.futures import Executor, ProcessPoolExecutor, ThreadPoolExecutor
+from typing import Any, Callable, Optional, Tuple
+
+# %% ../nbs/07_ASYNC.ipynb 5
+class ExecutorBusy(RuntimeError):
+    """Raised when `max_pending` calls are already waiting for the shared executor"""
+
+# Set while a call runs on the shared executor, to the event signalling that its caller was cancelled
+_CANCEL = contextvars.ContextVar('PDC_Utils.aio.cancel', default=None)
+
+def _stop_check(timeout: Optional[float]) -> Optional[Callable[[], bool]]:
+    """Check for long computations, true once `timeout` seconds have passed or the async caller was cancelled
+    
+    Returns None when neither can happen, so that computations can skip the check altogether.
+    """
+    deadline = None if timeout is None else time.monotonic() + timeout
+    cancel = _CANCEL.get()
+    if deadline is None and cancel is None:
+        return None
+    return lambda: (deadline is not None and time.monotonic() > deadline) or (cancel is not None and cancel.is_set())
+
+# %% ../nbs/07_ASYNC.ipynb 6
+class _Slots:
+    """Count of the calls running on the executor, and the queue of callers waiting for one to finish
+    
+    The count is shared by every thread and event loop of the process. A finished call hands its slot
+    straight to the first waiting caller, on that caller's loop.
+    """
+    
+    def __init__(self, limit: int, max_pending: Optional[int]):
+        self.limit, self.max_pending = limit, max_pending
+        self.running = 0
+        self._waiters = collections.deque()
+        self._lock = threading.Lock()
+    
+    @property
+    def pending(self) -> int:
+        """Number of callers waiting for a slot"""
+        return len(self._waiters)
+    
+    async def acquire(self):
+        """Wait for a free slot
+        
+        Raises:
+            ExecutorBusy: If `max_pending` callers are already waiting
+        """
+        with self._lock:
+            if self.running < self.limit and not self._waiters:
+                self.running += 1
+                return
+            if self.max_pending is not None and len(self._waiters) >= self.max_pending:
+                raise ExecutorBusy(f"{len(self._waiters)} calls are already waiting for the executor")
+            waiter = asyncio.get_running_loop().create_future()
+            entry = (waiter.get_loop(), waiter)
+            self._waiters.append(entry)
+        try:
+            await waiter
+        except asyncio.CancelledError:
+            with self._lock:
+                queued = entry in self._waiters
+                if queued: self._waiters.remove(entry)
+            # A slot handed over just before the cancellation belongs to this caller, pass it on
+            if not queued and not waiter.cancelled(): self.release()
+            raise
+    
+    def release(self):
+        """Free a slot, or hand it to the first waiting caller, from any thread"""
+        with self._lock:
+            if not self._waiters:
+                self.running -= 1
+                return
+            loop, waiter = self._waiters.popleft()
+        try:
+            loop.call_soon_threadsafe(self._grant, waiter)
+        except RuntimeError:
+            # The caller's loop is closed
+            self.release()
+    
+    def _grant(self, waiter: asyncio.Future):
+        if waiter.done(): self.release()
+        else: waiter.set_result(None)
+
+# %% ../nbs/07_ASYNC.ipynb 7
+_SHARED: Optional[Tuple[Executor, _Slots]] = None
+_SHARED_LOCK = threading.RLock()  # re-entered when `_shared` creates the default executor
+
+def configure_executor(max_workers: Optional[int] = None, max_pending: Optional[int] = None,
+                       backend: str = 'thread'):
+    """Replace the shared executor used by `run_blocking`
+    
+    Calls already running finish on the previous executor, which is then shut down.
+    
+    Args:
+        max_workers: Calls running at once, defaults to the number of CPUs
+        max_pending: Calls allowed to wait for a worker before `ExecutorBusy` is raised, unbounded by default
+        backend: 'thread', or 'process' to run calls outside the interpreter lock. Functions,
+                 arguments and results then have to be picklable, and running calls cannot be cancelled
+    """
+    global _SHARED
+    if backend not in ('thread', 'process'): raise ValueError(f"Unknown backend {backend!r}, expected 'thread' or 'process'")
+    if max_workers is not None and max_workers < 1: raise ValueError("max_workers must be at least 1")
+    max_workers = max_workers or os.cpu_count() or 1
+    executor = (ThreadPoolExecutor(max_workers, thread_name_prefix='pdc-utils') if backend == 'thread'
+                else ProcessPoolExecutor(max_workers))
+    with _SHARED_LOCK:
+        previous, _SHARED = _SHARED, (executor, _Slots(max_workers, max_pending))
+    if previous is not None: previous[0].shutdown(wait=False)
+
+def shutdown_executor(wait: bool = True):
+    """Shut the shared executor down, a new one is created by the next call to `run_blocking`"""
+    global _SHARED
+    with _SHARED_LOCK:
+        previous, _SHARED = _SHARED, None
+    if previous is not None: previous[0].shutdown(wait=wait)
+
+def _shared() -> Tuple[Executor, _Slots]:
+    """The shared executor and its slots, created with the defaults on first use"""
+    if _SHARED is None:
+        with _SHARED_LOCK:
+            if _SHARED is None:
+                configure_executor()
+    return _SHARED
+
+# %% ../nbs/07_ASYNC.ipynb 8
+def _call(cancel: threading.Event, func: Callable, args: tuple, kwargs: dict) -> Any:
+    """Run `func` with `cancel` as the cancellation event seen by `_stop_check`"""
+    _CANCEL.set(cancel)
+    return func(*args, **kwargs)
+
+async def run_blocking(func: Callable, *args, **kwargs) -> Any:
+    """Run a blocking call on the shared executor and wait for its result
+    
+    Args:
+        func: The function to call
+        *args: Positional arguments of `func`
+        **kwargs: Keyword arguments of `func`
+    
+    Returns:
+        The result of `func`
+    
+    Raises:
+        ExecutorBusy: If `max_pending` calls are already waiting for a worker
+    """
+    executor, slots = _shared()
+    await slots.acquire()
+    cancel = threading.Event()
+    try:
+        if isinstance(executor, ProcessPoolExecutor):
+            future = executor.submit(functools.partial(func, *args, **kwargs))
+        else:
+            future = executor.submit(contextvars.copy_context().run, _call, cancel, func, args, kwargs)
+    except BaseException:
+        slots.release()
+        raise
+    # The slot is freed when the call returns, not when its caller stops waiting for it
+    future.add_done_callback(lambda _: slots.release())
+    try:
+        return await asyncio.wrap_future(future)
+    except asyncio.CancelledError:
+        # Not started: the future is cancelled with the task. Running: ask it to stop
+        cancel.set()
+        raise
@@ -0,0 +1,142 @@
+"""Decode directories of FIT files and compute their MMP curves in parallel"""
+
+# AUTOGENERATED! DO NOT EDIT! File to edit: ../nbs/04_BATCH.ipynb.
+
+# %% auto 0
+__all__ = ['find_fit_files', 'BatchResult', 'iter_mmp_batch', 'mmp_batch']
+
+# %% ../nbs/04_BATCH.ipynb 3
+import glob
+import os
+import numpy as np
+from concurrent.futures import FIRST_COMPLETED, ProcessPoolExecutor, wait
+from concurrent.futures.process import BrokenProcessPool
+from itertools import islice
+from pathlib import Path
+from typing import Dict, Iterable, Iterator, List, NamedTuple, Optional, Tuple, Union
+
+from .cache import MMPCache
+from .fit import _mmp_curve
+from .mmp import MMP
+
+# %% ../nbs/04_BATCH.ipynb 5
+def find_fit_files(source: Union[str, Path, Iterable[Union[str, Path]]]) -> List[Path]:
+    """List the FIT files of a batch source
+    
+    Args:
+        source: Directory searched recursively for .fit files, glob pattern, or iterable of paths
+    
+    Returns:
+        Sorted list of paths
+    """
+    if isinstance(source, (str, Path)):
+        if Path(source).is_dir():
+            return sorted(p for p in Path(source).rglob('*') if p.suffix.lower() == '.fit' and p.is_file())
+        return sorted(Path(p) for p in glob.glob(str(source), recursive=True))
+    return [Path(p) for p in source]
+
+# %% ../nbs/04_BATCH.ipynb 7
+class BatchResult(NamedTuple):
+    """MMP curve of one file of a batch, or the error that prevented computing it"""
+    path: Path
+    durations: Optional[np.ndarray] = None
+    mmp: Optional[np.ndarray] = None
+    error: Optional[str] = None
+    
+    @property
+    def ok(self) -> bool:
+        """Whether the curve was computed"""
+        return self.error is None
+
+# %% ../nbs/04_BATCH.ipynb 8
+def _process_chunk(paths: List[Path], durations: Optional[List[int]], cache: Optional[MMPCache]) -> List[BatchResult]:
+    """Compute the MMP curve of every file in `paths`, catching per-file errors"""
+    results = []
+    for path in paths:
+        try:
+            x, y = _mmp_curve(path, durations, cache)
+            results.append(BatchResult(path, x, y))
+        except Exception as e:
+            results.append(BatchResult(path, error=f"{type(e).__name__}: {e}"))
+    return results
+
+# %% ../nbs/04_BATCH.ipynb 9
+def iter_mmp_batch(source: Union[str, Path, Iterable[Union[str, Path]]],
+                   durations: Optional[List[int]] = None,
+                   workers: Optional[int] = None,
+                   chunksize: int = 8,
+                   cache: Union[None, str, Path, MMPCache] = None) -> Iterator[BatchResult]:
+    """Compute the MMP curves of many FIT files in parallel, yielding results as they complete
+    
+    Args:
+        source: Directory, glob pattern or iterable of FIT file paths
+        durations: List of durations in seconds to compute MMP for
+        workers: Number of worker processes, defaults to the number of CPUs.
+                 With 1 the files are processed in this process
+        chunksize: Number of files sent to a worker at a time
+        cache: Optional MMPCache, or its directory, shared by the workers
+    
+    Yields:
+        One BatchResult per file, in completion order. Two chunks per worker are in flight at
+        a time, so stopping early does not wait for the rest of the archive
+    """
+    paths = find_fit_files(source)
+    if cache is not None and not isinstance(cache, MMPCache):
+        cache = MMPCache(cache)
+    chunksize = max(chunksize, 1)
+    chunks = [paths[i:i + chunksize] for i in range(0, len(paths), chunksize)]
+    if workers == 1:
+        for chunk in chunks:
+            yield from _process_chunk(chunk, durations, cache)
+        return
+    executor = ProcessPoolExecutor(max_workers=workers)
+    in_flight = 2 * (workers or os.cpu_count() or 1)
+    queue, futures = iter(chunks), {}
+    try:
+        while True:
+            for chunk in islice(queue, in_flight - len(futures)):
+                try:
+                    futures[executor.submit(_process_chunk, chunk, durations, cache)] = chunk
+                except BrokenProcessPool as e:
+                    yield from (BatchResult(path, error=f"BrokenProcessPool: {e}") for path in chunk)
+            if not futures:
+                break
+            done, _ = wait(futures, return_when=FIRST_COMPLETED)
+            for future in done:
+                chunk = futures.pop(future)
+                try:
+                    yield from future.result()
+                except BrokenProcessPool as e:
+                    # A worker died (e.g. killed for memory), report the files it held
+                    yield from (BatchResult(path, error=f"BrokenProcessPool: {e}") for path in chunk)
+    finally:
+        # Reached early when the caller stops iterating: drop the queued chunks instead of finishing them
+        for future in futures:
+            future.cancel()
+        executor.shutdown(wait=False)
+
+# %% ../nbs/04_BATCH.ipynb 10
+def mmp_batch(source: Union[str, Path, Iterable[Union[str, Path]]],
+              durations: Optional[List[int]] = None,
+              workers: Optional[int] = None,
+              chunksize: int = 8,
+              cache: Union[None, str, Path, MMPCache] = None) -> Tuple[Dict[Path, MMP], Dict[Path, str]]:
+    """Compute the MMP curves of many FIT files in parallel
+    
+    Args:
+        source: Directory, glob pattern or iterable of FIT file paths
+        durations: List of durations in seconds to compute MMP for
+        workers: Number of worker processes, defaults to the number of CPUs
+        chunksize: Number of files sent to a worker at a time
+        cache: Optional MMPCache, or its directory, shared by the workers
+    
+    Returns:
+        Tuple of (MMP objects by path, error messages by path)
+    """
+    curves, errors = {}, {}
+    for result in iter_mmp_batch(source, durations, workers, chunksize, cache):
+        if result.ok:
+            curves[result.path] = MMP(result.durations, result.mmp)
+        else:
+            errors[result.path] = result.error
+    return curves, errors
@@ -0,0 +1,150 @@
+"""Persistent on-disk cache of MMP curves computed from FIT files"""
+
+# AUTOGENERATED! DO NOT EDIT! File to edit: ../nbs/03_CACHE.ipynb.
+
+# %% auto 0
+__all__ = ['CACHE_VERSION', 'file_digest', 'MMPCache']
+
+# %% ../nbs/03_CACHE.ipynb 3
+import hashlib
+import os
+import struct
+import tempfile
+import numpy as np
+from pathlib import Path
+from typing import Callable, Optional, Tuple, Union
+
+# %% ../nbs/03_CACHE.ipynb 5
+# Bump when the MMP computation changes so stale entries are never served
+CACHE_VERSION = 3
+_MAGIC = b'MMPC'
+_HEADER = struct.Struct('<4sI')
+
+# %% ../nbs/03_CACHE.ipynb 6
+def file_digest(filepath: Union[str, Path], chunk_size: int = 1 << 20) -> bytes:
+    """Hash of a file's contents
+    
+    Args:
+        filepath: Path to the file
+        chunk_size: Number of bytes read at a time
+    
+    Returns:
+        16-byte BLAKE2b digest
+    """
+    digest = hashlib.blake2b(digest_size=16)
+    with open(filepath, 'rb') as f:
+        for chunk in iter(lambda: f.read(chunk_size), b''):
+            digest.update(chunk)
+    return digest.digest()
+
+# %% ../nbs/03_CACHE.ipynb 7
+class MMPCache:
+    """Directory of cached MMP curves with a size cap and LRU eviction"""
+    
+    def __init__(self, directory: Union[str, Path], max_bytes: int = 256 * 1024 * 1024):
+        """Initialize with the cache directory, created if needed, and its size cap in bytes"""
+        self.directory = Path(directory).expanduser()
+        self.directory.mkdir(parents=True, exist_ok=True)
+        self.max_bytes = max_bytes
+        self._size = None  # running estimate of the bytes on disk, measured on first write
+    
+    def key(self, filepath: Union[str, Path], **params) -> str:
+        """Cache key for a file's contents and the parameters that affect its MMP curve
+        
+        Args:
+            filepath: Path to the FIT file
+            params: Parameters of the computation, None values and arrays are allowed
+        
+        Returns:
+            Hex key naming the cache entry
+        """
+        digest = hashlib.blake2b(file_digest(filepath), digest_size=16)
+        digest.update(struct.pack('<I', CACHE_VERSION))
+        for name in sorted(params):
+            digest.update(name.encode() + b'\x00')
+            if params[name] is not None:
+                value = np.asarray(params[name])
+                digest.update(str(value.dtype).encode() + value.tobytes())
+        return digest.hexdigest()
+    
+    def _path(self, key: str) -> Path:
+        return self.directory / f"{key}.mmp"
+    
+    def get(self, key: str) -> Optional[Tuple[np.ndarray, np.ndarray]]:
+        """Cached (durations, mmp_values) for `key`, or None on a miss"""
+        path = self._path(key)
+        try:
+            data = path.read_bytes()
+            os.utime(path)  # mark as recently used
+        except FileNotFoundError:
+            return None
+        if len(data) < _HEADER.size:
+            return None
+        magic, n = _HEADER.unpack_from(data)
+        if magic != _MAGIC or len(data) != _HEADER.size + 12 * n:
+            path.unlink(missing_ok=True)
+            return None
+        durations = np.frombuffer(data, dtype='<i4', count=n, offset=_HEADER.size).astype(np.int64)
+        mmp = np.frombuffer(data, dtype='<f8', count=n, offset=_HEADER.size + 4 * n).copy()
+        return durations, mmp
+    
+    def put(self, key: str, durations: np.ndarray, mmp: np.ndarray):
+        """Store an MMP curve under `key` and evict old entries beyond the size cap"""
+        durations, mmp = np.asarray(durations), np.asarray(mmp)
+        data = (_HEADER.pack(_MAGIC, len(durations)) + durations.astype('<i4').tobytes()
+                + mmp.astype('<f8').tobytes())
+        path = self._path(key)
+        # Write then rename so concurrent readers never see a partial entry; the temporary
+        # file is unique, so threads and processes writing the same key do not collide
+        fd, tmp = tempfile.mkstemp(suffix='.tmp', dir=self.directory)
+        with os.fdopen(fd, 'wb') as f:
+            f.write(data)
+        os.replace(tmp, path)
+        self._size = self.size() if self._size is None else self._size + len(data)
+        if self._size > self.max_bytes:
+            self.evict()
+    
+    def get_or_compute(self, key: str, compute: Callable[[], Tuple[np.ndarray, np.ndarray]]) -> Tuple[np.ndarray, np.ndarray]:
+        """Cached curve for `key`, computing and storing it with `compute` on a miss"""
+        cached = self.get(key)
+        if cached is not None:
+            return cached
+        durations, mmp = compute()
+        self.put(key, durations, mmp)
+        return durations, mmp
+    
+    def entries(self) -> list:
+        """(last use, size, path) of every entry, least recently used first"""
+        entries = []
+        for entry in os.scandir(self.directory):
+            if entry.name.endswith('.mmp'):
+                try:
+                    stat = entry.stat()
+                except FileNotFoundError:
+                    continue
+                entries.append((stat.st_mtime_ns, stat.st_size, Path(entry.path)))
+        return sorted(entries)
+    
+    def size(self) -> int:
+        """Total size in bytes of the cached entries"""
+        return sum(size for _, size, _ in self.entries())
+    
+    def evict(self, low_water: float = 0.9):
+        """Delete least recently used entries until the cache fits in `low_water * max_bytes`
+        
+        Evicting below the cap leaves headroom so that every write does not rescan the directory.
+        """
+        entries = self.entries()
+        total = sum(size for _, size, _ in entries)
+        for _, size, path in entries:
+            if total <= self.max_bytes * low_water:
+                break
+            path.unlink(missing_ok=True)
+            total -= size
+        self._size = total
+    
+    def clear(self):
+        """Delete every cached entry"""
+        for _, _, path in self.entries():
+            path.unlink(missing_ok=True)
+        self._size = 0
@@ -3,16 +3,34 @@
 # AUTOGENERATED! DO NOT EDIT! File to edit: ../nbs/02_FIT.ipynb.
 
 # %% auto 0
-__all__ = ['FitLoader', 'load_fit_file', 'mmp_from_fit', 'pdc_from_fit']
+__all__ = ['FitLoader', 'resample_power', 'load_fit_file', 'mmp_from_fit', 'pdc_from_fit', 'mmp_from_fit_async',
+           'pdc_from_fit_async']
 
 # %% ../nbs/02_FIT.ipynb 3
-import fitdecode
+import io
 import numpy as np
-import pandas as pd
+import struct
+from array import array
 from pathlib import Path
-from typing import Optional, Tuple, List
+from typing import TYPE_CHECKING, Dict, Iterator, Optional, Sequence, Tuple, List, Union
 import warnings
 
+# pandas and fitdecode are imported where they are first needed, so a cache hit never loads them
+if TYPE_CHECKING:
+    import pandas as pd
+
+from .mmp import COGGAN_ZONES, ActivitySummary, MMPStream, mmp_curve, mmp_curve_full, summarize_power
+from .cache import MMPCache
+from .aio import run_blocking
+from .instrument import _start_stage, _end_stage
+
+_MAX_PAUSE = 3600.  # the longest default MMP duration
+_RIDE_GAP = 86400.  # records further apart than this belong to separate recordings
+
+def _max_pause(durations: Optional[Sequence[int]]) -> float:
+    """Longest pause resampled in full, so that no MMP window up to the longest of `durations` changes"""
+    return max(_MAX_PAUSE, float(np.max(durations))) if durations is not None and len(durations) else _MAX_PAUSE
+
 # %% ../nbs/02_FIT.ipynb 5
 class FitLoader:
     """Load and extract data from Garmin FIT files"""
@@ -24,49 +42,121 @@ class FitLoader:
             raise FileNotFoundError(f"FIT file not found: {filepath}")
         if not self.filepath.suffix.lower() == '.fit':
             warnings.warn(f"File extension is not .fit: {filepath}")
+        self._records = None
+        self._records_signature = None
     
-    def extract_power_data(self) -> pd.DataFrame:
+    def _file_signature(self) -> Tuple[int, int]:
+        """Modification time and size identifying the file contents on disk"""
+        stat = self.filepath.stat()
+        return stat.st_mtime_ns, stat.st_size
+    
+    def _power_frame(self) -> 'pd.DataFrame':
+        """Decoded records, decoding the file again only if it changed on disk"""
+        signature = self._file_signature()
+        if self._records is None or signature != self._records_signature:
+            self._records = self._decode_power_data()
+            self._records_signature = signature
+        return self._records
+    
+    def reload(self) -> 'pd.DataFrame':
+        """Discard the decoded records and decode the FIT file again
+        
+        Returns:
+            DataFrame with columns: timestamp, power, elapsed_time
+        """
+        self._records = self._records_signature = None
+        return self._power_frame().copy()
+    
+    def extract_power_data(self) -> 'pd.DataFrame':
         """Extract power and time data from FIT file
         
+        The file is decoded once and the records are reused by every accessor
+        until the file's modification time or size changes.
+        
         Returns:
             DataFrame with columns: timestamp, power, elapsed_time
         """
-        records = []
-        start_time = None
-        
-        with fitdecode.FitReader(self.filepath) as fit:
-            for frame in fit:
-                if isinstance(frame, fitdecode.FitDataMessage):
-                    if frame.name == 'record':
-                        record = {}
-                        
-                        # Extract relevant fields
-                        for field in frame.fields:
-                            if field.name == 'timestamp':
-                                record['timestamp'] = field.value
-                                if start_time is None:
-                                    start_time = field.value
-                            elif field.name == 'power':
-                                record['power'] = field.value
-                        
-                        # Only keep records with power data
-                        if 'power' in record and record['power'] is not None:
-                            if 'timestamp' in record:
-                                # Calculate elapsed time in seconds
-                                elapsed = (record['timestamp'] - start_time).total_seconds()
-                                record['elapsed_time'] = elapsed
-                            records.append(record)
-        
-        if not records:
-            raise ValueError("No power data found in FIT file")
+        return self._power_frame().copy()
+    
+    def _decode_power_data(self) -> 'pd.DataFrame':
+        """Decode the power and time records from the FIT file into columns"""
+        start = _start_stage()
+        try:
+            columns, reader = _scan_power_records(self.filepath.read_bytes()), 'fast'
+        except _UnsupportedFit:
+            columns, reader = _read_power_records(self.filepath), 'fitdecode'
+        frame = _power_frame_from_columns(*columns)
+        _end_stage('fit.decode', start, records=len(frame), reader=reader)
+        return frame
+    
+    def iter_chunks(self, chunk_size: int = 4096, channels: Sequence[str] = ()) -> Iterator['pd.DataFrame']:
+        """Decode the FIT file incrementally, yielding the power records in chunks
         
-        df = pd.DataFrame(records)
+        The file is read in blocks and only one chunk of records is held at a time,
+        so memory stays flat on multi-day files. Chunks are not cached.
         
-        # Ensure we have elapsed_time column
-        if 'elapsed_time' not in df.columns and 'timestamp' in df.columns:
-            df['elapsed_time'] = (df['timestamp'] - df['timestamp'].iloc[0]).dt.total_seconds()
+        Args:
+            chunk_size: Number of records per chunk, the last chunk may be shorter
+            channels: Extra record channels to decode, any of 'heart_rate' and 'cadence'
         
-        return df
+        Yields:
+            DataFrames with columns: timestamp, power, elapsed_time, then one per channel
+        """
+        empty = True
+        for timestamps, powers, columns, start in _iter_power_columns(self.filepath, chunk_size, tuple(channels)):
+            empty = False
+            yield _power_frame_from_columns(timestamps, powers, start, columns)
+        if empty:
+            raise ValueError("No power data found in FIT file")
+    
+    def stream_mmp_curve(self, durations: Optional[List[int]] = None, chunk_size: int = 4096,
+                         gaps: str = 'zero', max_gap: float = 5.0) -> Tuple[np.ndarray, np.ndarray]:
+        """Compute the Mean Maximal Power curve from decoded chunks, without holding the whole ride
+        
+        Args:
+            durations: List of durations in seconds to compute MMP for
+            chunk_size: Number of records decoded at a time
+            gaps: 'zero' to count pauses as zero power, 'break' so that no window spans them
+            max_gap: Longest gap in seconds bridged by holding the previous sample
+        
+        Returns:
+            Tuple of (durations, mmp_values) as numpy arrays
+        """
+        start = _start_stage()
+        max_pause = _max_pause(durations)
+        # Runs of records more than a day apart are separate recordings, each with its stream, the records
+        # of its last second and its record count; the largest is kept, as in `resample_power`
+        rides = []
+        chunks = records = 0
+        for chunk in self.iter_chunks(chunk_size):
+            chunks, records = chunks + 1, records + len(chunk)
+            elapsed, power = chunk['elapsed_time'].values, chunk['power'].values
+            valid = ~(np.isnan(elapsed) | np.isnan(power))
+            elapsed, power = elapsed[valid], power[valid]
+            jumps = np.flatnonzero(np.abs(np.diff(elapsed)) > _RIDE_GAP) + 1
+            for run_elapsed, run_power in zip(np.split(elapsed, jumps), np.split(power, jumps)):
+                if not len(run_elapsed):
+                    continue
+                ride = next((ride for ride in rides if abs(run_elapsed[0] - ride[1][-1]) <= _RIDE_GAP), None)
+                if ride is None:
+                    ride = [MMPStream(durations), np.zeros(0), np.zeros(0), 0]
+                    rides.append(ride)
+                # Resample from the records of the ride's last second, which may go on in this chunk, so the
+                # gap between chunks is filled and a second split between chunks is averaged over all its records
+                ride[3] += len(run_elapsed)
+                run_elapsed, run_power = np.append(ride[1], run_elapsed), np.append(ride[2], run_power)
+                resampled = resample_power(run_elapsed, run_power, 1.0, gaps, max_gap, max_pause)
+                ride[0].push(resampled[:-1])
+                # FIT timestamps are whole seconds, so the last second starts on the grid
+                last = run_elapsed >= np.floor(run_elapsed.max())
+                ride[1], ride[2] = run_elapsed[last], run_power[last]
+        if rides:
+            stream, last_elapsed, last_power, _ = max(rides, key=lambda ride: ride[3])
+            stream.push(resample_power(last_elapsed, last_power, 1.0, gaps, max_gap, max_pause))
+        else:
+            stream = MMPStream(durations)
+        _end_stage('fit.stream_mmp', start, chunks=chunks, records=records, samples=stream.n)
+        return stream.curve()
     
     def get_power_duration_data(self) -> Tuple[np.ndarray, np.ndarray]:
         """Extract power and duration data suitable for MMP/PDC analysis
@@ -74,7 +164,7 @@ class FitLoader:
         Returns:
             Tuple of (durations, powers) as numpy arrays
         """
-        df = self.extract_power_data()
+        df = self._power_frame()
         
         # Use elapsed time as duration and power values
         durations = df['elapsed_time'].values
@@ -87,45 +177,411 @@ class FitLoader:
         
         return durations, powers
     
-    def compute_mmp_curve(self, durations: Optional[List[int]] = None) -> Tuple[np.ndarray, np.ndarray]:
+    def resample_power(self, rate: float = 1.0, gaps: str = 'zero', max_gap: float = 5.0,
+                       max_pause: float = _MAX_PAUSE) -> np.ndarray:
+        """Power on a regular time grid built from the record timestamps
+        
+        Args:
+            rate: Samples per second of the grid
+            gaps: 'zero' to fill gaps longer than `max_gap` with zeros, 'break' to mark them with NaN
+            max_gap: Longest gap in seconds, e.g. from smart recording, bridged by holding the previous sample
+            max_pause: Longer gaps become `max_pause` seconds of zeros, or a single NaN with 'break'
+        
+        Returns:
+            Power samples at `rate` Hz from the first record
+        """
+        df = self._power_frame()
+        start = _start_stage()
+        power = resample_power(df['elapsed_time'].values, df['power'].values, rate, gaps, max_gap, max_pause)
+        _end_stage('fit.resample', start, records=len(df), samples=len(power))
+        return power
+    
+    def compute_mmp_curve(self, durations: Optional[List[int]] = None, gaps: str = 'zero',
+                          max_gap: float = 5.0) -> Tuple[np.ndarray, np.ndarray]:
         """Compute Mean Maximal Power curve from FIT file data
         
+        The records are first resampled to 1 Hz from their timestamps, see `resample_power`.
+        
         Args:
             durations: List of durations in seconds to compute MMP for.
-                      If None, uses default durations from 1s to 3600s
+                      If None, uses default durations from 1s to 3600s.
+                      Durations longer than the ride are dropped
+            gaps: 'zero' to count pauses as zero power, 'break' so that no window spans them
+            max_gap: Longest gap in seconds bridged by holding the previous sample
         
         Returns:
             Tuple of (durations, mmp_values) as numpy arrays
         """
-        if durations is None:
-            # Default durations: 1s to 1 hour with more resolution at shorter durations
-            durations = list(range(1, 61)) + list(range(60, 301, 5)) + list(range(300, 1801, 30)) + list(range(1800, 3601, 60))
+        power = self.resample_power(1.0, gaps, max_gap, _max_pause(durations))
+        start = _start_stage()
+        curve = mmp_curve(power, durations)
+        _end_stage('fit.mmp', start, samples=len(power), durations=len(curve[0]))
+        return curve
+    
+    def summarize(self, ftp: Optional[float] = None, zones: Sequence[float] = COGGAN_ZONES,
+                  durations: Optional[List[int]] = None, gaps: str = 'zero',
+                  max_gap: float = 5.0) -> ActivitySummary:
+        """Summarize the ride and compute its MMP curve from one resampled power stream
         
-        df = self.extract_power_data()
-        powers = df['power'].values
+        Work, average and normalized power, IF, TSS and time in zone share the cumulative
+        sum of the MMP computation, see `summarize_power`. Pauses are kept in full, so the
+        totals do not depend on `durations`.
         
-        mmp_values = []
+        Args:
+            ftp: Functional threshold power in watts, needed for IF, TSS and zones
+            zones: Upper bounds of every zone but the last, as fractions of `ftp`
+            durations: List of durations in seconds to compute MMP for
+            gaps: 'zero' to count pauses as zero power, 'break' so that no window spans them
+            max_gap: Longest gap in seconds bridged by holding the previous sample
         
-        for duration in durations:
-            if duration > len(powers):
-                # Not enough data for this duration
-                mmp_values.append(np.nan)
-                continue
-            
-            # Calculate rolling mean for this duration
-            rolling_mean = pd.Series(powers).rolling(window=duration, min_periods=duration).mean()
-            max_power = rolling_mean.max()
-            
-            mmp_values.append(max_power if not np.isnan(max_power) else 0)
+        Returns:
+            ActivitySummary of the ride
+        """
+        power = self.resample_power(1.0, gaps, max_gap, _RIDE_GAP)
+        start = _start_stage()
+        summary = summarize_power(power, ftp, zones, durations)
+        _end_stage('fit.summary', start, samples=len(power), durations=len(summary.mmp[0]))
+        return summary
+    
+    def compute_full_mmp_curve(self, gaps: str = 'zero', max_gap: float = 5.0) -> Tuple[np.ndarray, np.ndarray]:
+        """Compute the Mean Maximal Power for every duration from 1s to the ride length
         
-        # Remove NaN values
-        durations = np.array(durations)
-        mmp_values = np.array(mmp_values)
-        valid_mask = ~np.isnan(mmp_values)
+        Args:
+            gaps: 'zero' to count pauses as zero power, 'break' so that no window spans them
+            max_gap: Longest gap in seconds bridged by holding the previous sample
         
-        return durations[valid_mask], mmp_values[valid_mask]
+        Returns:
+            Tuple of (durations, mmp_values) as numpy arrays
+        """
+        # Every duration up to the ride length is computed, so no pause within the recording is shortened
+        power = self.resample_power(1.0, gaps, max_gap, _RIDE_GAP)
+        start = _start_stage()
+        curve = mmp_curve_full(power)
+        _end_stage('fit.mmp', start, samples=len(power), durations=len(curve[0]))
+        return curve
 
 # %% ../nbs/02_FIT.ipynb 7
+_FIT_EPOCH = 631065600  # FIT timestamps count seconds from 1989-12-31 00:00:00 UTC
+_RECORD_MESG = 20
+_TIMESTAMP_FIELD, _POWER_FIELD = 253, 7
+_NO_TIMESTAMP = -1
+# struct code, size and invalid value of the base types we unpack
+_BASE_TYPES = {0x06: ('I', 4, 0xFFFFFFFF), 0x04: ('H', 2, 0xFFFF), 0x02: ('B', 1, 0xFF)}
+# Record fields that can be decoded as extra channels: field number, struct code and invalid value
+_CHANNELS = {'heart_rate': (3, 'B', 0xFF), 'cadence': (4, 'B', 0xFF)}
+# Bytes kept ahead of the parser when streaming, more than the largest possible message
+_READ_AHEAD = 1 << 18
+
+# %% ../nbs/02_FIT.ipynb 8
+class _UnsupportedFit(Exception):
+    """Raised by the fast path for files that need the full fitdecode reader"""
+
+# %% ../nbs/02_FIT.ipynb 9
+def _compressed_timestamp(offset: int, last: int) -> int:
+    """Full timestamp from the 5-bit offset of a compressed timestamp header"""
+    timestamp = offset + (last & ~0x1F)
+    return timestamp + 0x20 if offset < (last & 0x1F) else timestamp
+
+# %% ../nbs/02_FIT.ipynb 10
+def _definition_layout(data: bytes, pos: int, has_dev: bool, fields: Sequence[Tuple[int, str]]):
+    """Parse a definition message at `pos`
+    
+    Args:
+        data: FIT bytes
+        pos: Position of the definition content, after its header byte
+        has_dev: Whether the definition lists developer fields
+        fields: (field number, struct code) of the record fields to unpack, power first
+    
+    Returns:
+        Tuple of (struct, timestamp index, index of each of `fields`, whether it is a record, end position)
+    """
+    endian = '>' if data[pos + 1] else '<'
+    global_num = struct.unpack_from(endian + 'H', data, pos + 2)[0]
+    n_fields = data[pos + 4]
+    pos += 5
+    wanted = {num: (i, code) for i, (num, code) in enumerate(fields)} if global_num == _RECORD_MESG else {}
+    wanted[_TIMESTAMP_FIELD] = (None, 'I')
+    fmt, ts_idx, indices, n_values = endian, None, [None] * len(fields), 0
+    for _ in range(n_fields):
+        num, size, base = data[pos], data[pos + 1], data[pos + 2]
+        pos += 3
+        if num not in wanted:
+            fmt += f'{size}x'
+            continue
+        code, base_size, _ = _BASE_TYPES.get(base & 0x1F, (None, None, None))
+        slot, expected = wanted[num]
+        if code is None or size != base_size or code != expected:
+            raise _UnsupportedFit(f"Unexpected definition for field {num}")
+        if slot is None: ts_idx = n_values
+        else: indices[slot] = n_values
+        fmt += code
+        n_values += 1
+    if has_dev:
+        n_dev = data[pos]
+        pos += 1
+        fmt += f'{sum(data[pos + 3 * i + 1] for i in range(n_dev))}x'
+        pos += 3 * n_dev
+    return struct.Struct(fmt), ts_idx, tuple(indices), global_num == _RECORD_MESG, pos
+
+# %% ../nbs/02_FIT.ipynb 11
+def _read_ahead(f, data: bytes, pos: int, block_size: int) -> Tuple[bytes, bool]:
+    """Drop the bytes of `data` before `pos` and read until `_READ_AHEAD` bytes are buffered
+    
+    Returns:
+        Tuple of (buffered bytes, whether the end of the file was reached)
+    """
+    parts, size = [data[pos:]], len(data) - pos
+    while size < _READ_AHEAD:
+        more = f.read(block_size)
+        if not more:
+            return b''.join(parts), True
+        parts.append(more)
+        size += len(more)
+    return b''.join(parts), False
+
+# %% ../nbs/02_FIT.ipynb 12
+def _scan_power_chunks(f, chunk_size: Optional[int] = None, channels: Sequence[str] = (),
+                       block_size: int = 1 << 20) -> Iterator[Tuple[array, array, Dict[str, array], Optional[int]]]:
+    """Fast path: timestamps, power and `channels` of every `record` message with power, read from file object `f`
+    
+    The file is read `block_size` bytes at a time and parsed as it arrives.
+    
+    Args:
+        f: Binary file object positioned at the start of the FIT data
+        chunk_size: Number of records per chunk, None for a single chunk
+        channels: Names of extra channels from `_CHANNELS`
+        block_size: Number of bytes read at a time
+    
+    Yields:
+        Tuples of (timestamps, powers, channels, start) where timestamps are FIT seconds
+        (`_NO_TIMESTAMP` when missing), channels maps names to float columns (NaN when
+        missing) and start is the first record timestamp
+    """
+    fields = [(_POWER_FIELD, 'H')] + [_CHANNELS[name][:2] for name in channels]
+    invalid = [_CHANNELS[name][2] for name in channels]
+    new_columns = lambda: (array('q'), array('H'), [array('d') for _ in channels])
+    timestamps, powers, extra = new_columns()
+    start = None
+    data, eof = _read_ahead(f, b'', 0, block_size)
+    pos = 0
+    try:
+        while True:
+            if not eof and len(data) - pos < _READ_AHEAD:
+                (data, eof), pos = _read_ahead(f, data, pos, block_size), 0
+            if pos >= len(data) and eof:
+                break
+            header_size = data[pos]
+            data_size = struct.unpack_from('<I', data, pos + 4)[0]
+            if header_size < 12 or data[pos + 8:pos + 12] != b'.FIT': raise _UnsupportedFit("Bad header")
+            pos += header_size
+            end = pos + data_size
+            layouts, last_ts = {}, 0
+            limit = len(data) - _READ_AHEAD
+            while pos < end:
+                if pos > limit and not eof:
+                    (data, eof), end, pos = _read_ahead(f, data, pos, block_size), end - pos, 0
+                    limit = len(data) - _READ_AHEAD
+                header = data[pos]
+                pos += 1
+                if header & 0x40 and not header & 0x80:
+                    layout = _definition_layout(data, pos, header & 0x20, fields)
+                    layouts[header & 0x0F] = layout[:4]
+                    pos = layout[4]
+                    continue
+                compressed = header & 0x80
+                unpacker, ts_idx, indices, is_record = layouts[(header >> 5) & 0x03 if compressed else header & 0x0F]
+                values = unpacker.unpack_from(data, pos)
+                pos += unpacker.size
+                ts = _NO_TIMESTAMP
+                if ts_idx is not None and values[ts_idx] != 0xFFFFFFFF: ts = last_ts = values[ts_idx]
+                if compressed: ts = last_ts = _compressed_timestamp(header & 0x1F, last_ts)
+                if not is_record: continue
+                if start is None and ts != _NO_TIMESTAMP: start = ts
+                power_idx = indices[0]
+                if power_idx is None or values[power_idx] == 0xFFFF: continue
+                timestamps.append(ts)
+                powers.append(values[power_idx])
+                for column, i, bad in zip(extra, indices[1:], invalid):
+                    column.append(np.nan if i is None or values[i] == bad else values[i])
+                if chunk_size is not None and len(powers) >= chunk_size:
+                    yield timestamps, powers, dict(zip(channels, extra)), start
+                    timestamps, powers, extra = new_columns()
+            if pos != end: raise _UnsupportedFit("Message overruns the data section")
+            if end + 2 > len(data) and eof: raise _UnsupportedFit("Truncated file")
+            pos = end + 2  # skip the file CRC, a chained FIT file may follow
+    except (struct.error, IndexError, KeyError) as e:
+        raise _UnsupportedFit(str(e)) from e
+    if powers or chunk_size is None:
+        yield timestamps, powers, dict(zip(channels, extra)), start
+
+# %% ../nbs/02_FIT.ipynb 13
+def _scan_power_records(data: bytes) -> Tuple[array, array, Optional[int]]:
+    """Fast path: timestamps and power of every `record` message with power in raw FIT bytes
+    
+    Returns:
+        Tuple of (timestamps, powers, start) as for `_scan_power_chunks`
+    """
+    timestamps, powers, _, start = next(_scan_power_chunks(io.BytesIO(data), block_size=max(len(data), 1)))
+    return timestamps, powers, start
+
+# %% ../nbs/02_FIT.ipynb 14
+def _read_power_chunks(filepath: Path, chunk_size: Optional[int] = None, channels: Sequence[str] = (),
+                       skip: int = 0) -> Iterator[Tuple[array, array, Dict[str, array], Optional[int]]]:
+    """Timestamps, power and `channels` of every `record` message with power, decoded with fitdecode
+    
+    Args:
+        filepath: Path to the FIT file
+        chunk_size: Number of records per chunk, None for a single chunk
+        channels: Names of extra channels from `_CHANNELS`
+        skip: Number of leading power records to leave out, already decoded by the fast path
+    
+    Yields:
+        Tuples of (timestamps, powers, channels, start) as for `_scan_power_chunks`
+    """
+    import fitdecode
+    names = ('timestamp', 'power') + tuple(channels)
+    new_columns = lambda: (array('q'), array('H'), [array('d') for _ in channels])
+    timestamps, powers, extra = new_columns()
+    start = None
+    layouts = {}
+    # Without a processor timestamps stay raw FIT seconds instead of datetime objects
+    with fitdecode.FitReader(filepath, processor=None) as fit:
+        for frame in fit:
+            if not isinstance(frame, fitdecode.FitDataMessage) or frame.name != 'record':
+                continue
+            fields = frame.fields
+            key = (frame.def_mesg, frame.time_offset is None)
+            layout = layouts.get(key)
+            if layout is None:
+                # Look up the fields once per definition, the last one wins as fitdecode appends
+                # the timestamp of a compressed header after the regular fields
+                found = [f.name for f in fields]
+                layout = layouts[key] = tuple(len(found) - 1 - found[::-1].index(name) if name in found else None
+                                              for name in names)
+            ts_idx, power_idx = layout[:2]
+            ts = fields[ts_idx].value if ts_idx is not None else None
+            if start is None and ts is not None: start = ts
+            if power_idx is None or fields[power_idx].value is None: continue
+            if skip:
+                skip -= 1
+                continue
+            timestamps.append(_NO_TIMESTAMP if ts is None else ts)
+            powers.append(fields[power_idx].value)
+            for column, i in zip(extra, layout[2:]):
+                value = fields[i].value if i is not None else None
+                column.append(np.nan if value is None else value)
+            if chunk_size is not None and len(powers) >= chunk_size:
+                yield timestamps, powers, dict(zip(channels, extra)), start
+                timestamps, powers, extra = new_columns()
+    if powers or chunk_size is None:
+        yield timestamps, powers, dict(zip(channels, extra)), start
+
+# %% ../nbs/02_FIT.ipynb 15
+def _read_power_records(filepath: Path) -> Tuple[array, array, Optional[int]]:
+    """Timestamps and power of every `record` message with power, decoded with fitdecode
+    
+    Returns:
+        Tuple of (timestamps, powers, start) as for `_scan_power_chunks`
+    """
+    timestamps, powers, _, start = next(_read_power_chunks(filepath))
+    return timestamps, powers, start
+
+# %% ../nbs/02_FIT.ipynb 16
+def _iter_power_columns(filepath: Path, chunk_size: int, channels: Sequence[str]):
+    """Decoded chunks of a FIT file, from the fast path or, for files it does not support, from fitdecode"""
+    for name in channels:
+        if name not in _CHANNELS: raise ValueError(f"Unknown channel {name!r}, expected one of {list(_CHANNELS)}")
+    done = 0
+    try:
+        with open(filepath, 'rb') as f:
+            for columns in _scan_power_chunks(f, chunk_size, channels):
+                done += len(columns[1])
+                yield columns
+        return
+    except _UnsupportedFit:
+        pass
+    # Carry on with fitdecode after the records the fast path has already produced
+    yield from _read_power_chunks(filepath, chunk_size, channels, skip=done)
+
+# %% ../nbs/02_FIT.ipynb 17
+def _power_frame_from_columns(timestamps: array, powers: array, start: Optional[int],
+                              channels: Optional[Dict[str, array]] = None) -> 'pd.DataFrame':
+    """Build the power DataFrame once from decoded columns"""
+    import pandas as pd
+    if not powers:
+        raise ValueError("No power data found in FIT file")
+    ts = np.frombuffer(timestamps, dtype=np.int64)
+    missing = ts == _NO_TIMESTAMP
+    elapsed = (ts - (start or 0)).astype(np.float64)
+    elapsed[missing] = np.nan
+    when = (ts + _FIT_EPOCH).astype('datetime64[s]').astype('datetime64[us]')
+    when[missing] = np.datetime64('NaT')
+    frame = {'timestamp': pd.Series(when).dt.tz_localize('UTC'),
+             'power': np.frombuffer(powers, dtype=np.uint16).astype(np.int64),
+             'elapsed_time': elapsed}
+    frame.update({name: np.frombuffer(column, dtype=np.float64) for name, column in (channels or {}).items()})
+    return pd.DataFrame(frame)
+
+# %% ../nbs/02_FIT.ipynb 19
+def resample_power(elapsed: np.ndarray, power: np.ndarray, rate: float = 1.0, gaps: str = 'zero',
+                   max_gap: float = 5.0, max_pause: float = _MAX_PAUSE) -> np.ndarray:
+    """Regularise power samples to `rate` Hz using their elapsed times
+    
+    Records more than a day away from the rest of the ride are dropped, keeping the recording
+    with the most records, so one corrupt timestamp cannot blow up the grid.
+    
+    Args:
+        elapsed: Seconds since the start of each sample, NaN samples are dropped
+        power: Power of each sample
+        rate: Samples per second of the grid
+        gaps: 'zero' to fill gaps longer than `max_gap` with zeros, 'break' to mark them with NaN
+        max_gap: Longest gap in seconds bridged by holding the previous sample
+        max_pause: Longer gaps become `max_pause` seconds of zeros, or a single NaN with 'break'
+    
+    Returns:
+        Power samples at `rate` Hz from the first sample
+    """
+    if gaps not in ('zero', 'break'):
+        raise ValueError(f"Unknown gaps {gaps!r}, expected 'zero' or 'break'")
+    elapsed, power = np.asarray(elapsed, dtype=np.float64), np.asarray(power, dtype=np.float64)
+    valid = ~(np.isnan(elapsed) | np.isnan(power))
+    elapsed, power = elapsed[valid], power[valid]
+    if not len(power):
+        return np.zeros(0)
+    if (np.diff(elapsed) < 0).any():
+        order = np.argsort(elapsed, kind='stable')
+        elapsed, power = elapsed[order], power[order]
+    step = np.diff(elapsed)
+    rides = np.split(np.arange(len(elapsed)), np.flatnonzero(step > _RIDE_GAP) + 1)
+    if len(rides) > 1:
+        ride = max(rides, key=len)
+        elapsed, power, step = elapsed[ride], power[ride], step[ride[:-1]]
+    pauses = np.flatnonzero(step > max(max_pause, max_gap)) + 1
+    if not len(pauses):
+        return _resample_segment(elapsed, power, rate, gaps, max_gap)
+    pause = np.zeros(int(max_pause * rate)) if gaps == 'zero' else np.full(1, np.nan)
+    segments = [_resample_segment(e, p, rate, gaps, max_gap)
+                for e, p in zip(np.split(elapsed, pauses), np.split(power, pauses))]
+    return np.concatenate([part for segment in segments for part in (pause, segment)][1:])
+
+def _resample_segment(elapsed: np.ndarray, power: np.ndarray, rate: float, gaps: str, max_gap: float) -> np.ndarray:
+    """Resample records with no gap longer than the pause limit, see `resample_power`"""
+    slot = np.floor((elapsed - elapsed[0]) * rate).astype(np.int64)
+    counts = np.bincount(slot)
+    recorded = counts > 0
+    resampled = np.bincount(slot, weights=power)
+    resampled[recorded] /= counts[recorded]
+    # Recorded slots on either side of each slot; the first and last slots are always recorded
+    index = np.arange(len(resampled))
+    before = np.maximum.accumulate(np.where(recorded, index, 0))
+    after = np.minimum.accumulate(np.where(recorded, index, len(index))[::-1])[::-1]
+    missing = ~recorded
+    hold = missing & ((after - before) / rate <= max_gap)
+    resampled[hold] = resampled[before[hold]]
+    resampled[missing & ~hold] = 0. if gaps == 'zero' else np.nan
+    return resampled
+
+# %% ../nbs/02_FIT.ipynb 21
 def load_fit_file(filepath: str) -> FitLoader:
     """Load a FIT file and return a FitLoader instance
     
@@ -137,38 +593,86 @@ def load_fit_file(filepath: str) -> FitLoader:
     """
     return FitLoader(filepath)
 
-# %% ../nbs/02_FIT.ipynb 8
-def mmp_from_fit(filepath: str, durations: Optional[List[int]] = None):
+# %% ../nbs/02_FIT.ipynb 22
+def _as_loader(filepath) -> FitLoader:
+    """Reuse an existing loader, and its decoded records, or open `filepath`"""
+    return filepath if hasattr(filepath, 'compute_mmp_curve') else FitLoader(filepath)
+
+# %% ../nbs/02_FIT.ipynb 23
+def _mmp_curve(filepath, durations: Optional[List[int]], cache, gaps: Optional[str] = None,
+               max_gap: Optional[float] = None) -> Tuple[np.ndarray, np.ndarray]:
+    """MMP curve of a FIT file, served from `cache` when one is given"""
+    loader = _as_loader(filepath)
+    # Only resampling options that were given are passed on, the loader's defaults apply otherwise
+    options = {name: value for name, value in (('gaps', gaps), ('max_gap', max_gap)) if value is not None}
+    if cache is None:
+        return loader.compute_mmp_curve(durations, **options)
+    if not isinstance(cache, MMPCache):
+        cache = MMPCache(cache)
+    key = cache.key(loader.filepath, durations=durations, **{'gaps': 'zero', 'max_gap': 5.0, **options})
+    return cache.get_or_compute(key, lambda: loader.compute_mmp_curve(durations, **options))
+
+# %% ../nbs/02_FIT.ipynb 24
+def mmp_from_fit(filepath: Union[str, FitLoader], durations: Optional[List[int]] = None,
+                 cache: Union[None, str, Path, MMPCache] = None, gaps: Optional[str] = None,
+                 max_gap: Optional[float] = None):
     """Create an MMP object from a FIT file
     
     Args:
-        filepath: Path to the FIT file
+        filepath: Path to the FIT file, or a FitLoader whose decoded records are reused
         durations: List of durations in seconds to compute MMP for
+        cache: Optional MMPCache, or its directory, holding curves keyed by file contents
+        gaps: 'zero' to count pauses as zero power, 'break' so that no window spans them,
+              defaults to 'zero'
+        max_gap: Longest gap in seconds bridged by holding the previous sample, defaults to 5
     
     Returns:
         MMP object with data from the FIT file
     """
     from .mmp import MMP
     
-    loader = FitLoader(filepath)
-    x, y = loader.compute_mmp_curve(durations)
+    x, y = _mmp_curve(filepath, durations, cache, gaps, max_gap)
     
     return MMP(x, y)
 
-# %% ../nbs/02_FIT.ipynb 9
-def pdc_from_fit(filepath: str, durations: Optional[List[int]] = None):
+# %% ../nbs/02_FIT.ipynb 25
+def pdc_from_fit(filepath: Union[str, FitLoader], durations: Optional[List[int]] = None,
+                 cache: Union[None, str, Path, MMPCache] = None, gaps: Optional[str] = None,
+                 max_gap: Optional[float] = None):
     """Create a PDC object from a FIT file
     
     Args:
-        filepath: Path to the FIT file
+        filepath: Path to the FIT file, or a FitLoader whose decoded records are reused
         durations: List of durations in seconds to compute MMP for
+        cache: Optional MMPCache, or its directory, holding curves keyed by file contents
+        gaps: 'zero' to count pauses as zero power, 'break' so that no window spans them,
+              defaults to 'zero'
+        max_gap: Longest gap in seconds bridged by holding the previous sample, defaults to 5
     
     Returns:
         PDC object with data from the FIT file
     """
     from .pdc import PDC
     
-    loader = FitLoader(filepath)
-    x, y = loader.compute_mmp_curve(durations)
+    x, y = _mmp_curve(filepath, durations, cache, gaps, max_gap)
     
     return PDC(x, y)
+
+# %% ../nbs/02_FIT.ipynb 26
+async def mmp_from_fit_async(filepath: Union[str, FitLoader], durations: Optional[List[int]] = None,
+                             cache: Union[None, str, Path, MMPCache] = None, gaps: Optional[str] = None,
+                             max_gap: Optional[float] = None):
+    """`mmp_from_fit` run on the shared executor, without blocking the event loop
+    
+    See `run_blocking` for how concurrent calls are bounded and cancelled.
+    """
+    return await run_blocking(mmp_from_fit, filepath, durations, cache, gaps, max_gap)
+
+async def pdc_from_fit_async(filepath: Union[str, FitLoader], durations: Optional[List[int]] = None,
+                             cache: Union[None, str, Path, MMPCache] = None, gaps: Optional[str] = None,
+                             max_gap: Optional[float] = None):
+    """`pdc_from_fit` run on the shared executor, without blocking the event loop
+    
+    See `run_blocking` for how concurrent calls are bounded and cancelled.
+    """
+    return await run_blocking(pdc_from_fit, filepath, durations, cache, gaps, max_gap)
@@ -0,0 +1,85 @@
+"""Optional timing hooks across the FIT → MMP → PDC pipeline"""
+
+# AUTOGENERATED! DO NOT EDIT! File to edit: ../nbs/06_INSTRUMENT.ipynb.
+
+# %% auto 0
+__all__ = ['Event', 'stage_hook', 'EventLog']
+
+# %% ../nbs/06_INSTRUMENT.ipynb 3
+import time
+from contextlib import contextmanager
+from contextvars import ContextVar
+from typing import TYPE_CHECKING, Callable, Iterator, List, NamedTuple, Optional
+
+if TYPE_CHECKING:
+    import pandas as pd
+
+# %% ../nbs/06_INSTRUMENT.ipynb 5
+class Event(NamedTuple):
+    """Wall time and counters of one pipeline stage"""
+    stage: str
+    seconds: float
+    info: dict
+
+_HOOKS: ContextVar[tuple] = ContextVar('PDC_Utils_hooks', default=())
+
+# %% ../nbs/06_INSTRUMENT.ipynb 6
+@contextmanager
+def stage_hook(hook: Callable[[Event], None]) -> Iterator[Callable[[Event], None]]:
+    """Send an `Event` to `hook` for every pipeline stage run inside the block
+    
+    Blocks nest, and every hook installed by an enclosing block also receives the events.
+    Exceptions raised by a hook propagate to the instrumented call.
+    
+    Args:
+        hook: Callable receiving each Event, e.g. a function forwarding to a metrics system
+    
+    Yields:
+        The hook
+    """
+    token = _HOOKS.set(_HOOKS.get() + (hook,))
+    try:
+        yield hook
+    finally:
+        _HOOKS.reset(token)
+
+# %% ../nbs/06_INSTRUMENT.ipynb 7
+def _start_stage() -> Optional[float]:
+    """Start time of a stage, or None when no hook is installed"""
+    return time.perf_counter() if _HOOKS.get() else None
+
+def _end_stage(stage: str, start: Optional[float], **info):
+    """Report a stage started at `start` to the installed hooks"""
+    if start is None:
+        return
+    event = Event(stage, time.perf_counter() - start, info)
+    for hook in _HOOKS.get():
+        hook(event)
+
+# %% ../nbs/06_INSTRUMENT.ipynb 8
+class EventLog:
+    """Hook keeping every event, with a per-stage summary"""
+    
+    def __init__(self):
+        self.events: List[Event] = []
+    
+    def __call__(self, event: Event):
+        self.events.append(event)
+    
+    def stage(self, name: str) -> List[Event]:
+        """Events of the stage `name`, in the order they were reported"""
+        return [e for e in self.events if e.stage == name]
+    
+    def summary(self) -> 'pd.DataFrame':
+        """Number of calls, total and mean seconds, and summed numeric counters of each stage"""
+        import pandas as pd
+        rows = [{'stage': e.stage, 'seconds': e.seconds,
+                 **{k: v for k, v in e.info.items() if isinstance(v, (int, float))}}
+                for e in self.events]
+        if not rows:
+            return pd.DataFrame(columns=['calls', 'seconds', 'mean_seconds'])
+        grouped = pd.DataFrame(rows).groupby('stage', sort=False)
+        table = grouped.sum(numeric_only=True)
+        table.insert(0, 'calls', grouped.size())
+        table.insert(2, 'mean_seconds', table['seconds'] / table['calls'])
+        return table
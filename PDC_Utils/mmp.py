@@ -3,20 +3,504 @@
 # AUTOGENERATED! DO NOT EDIT! File to edit: ../nbs/00_MMP.ipynb.
 
 # %% auto 0
-__all__ = ['MMP']
+__all__ = ['CP_DURATIONS', 'DEFAULT_DURATIONS', 'COGGAN_ZONES', 'NP_WINDOW', 'MMP', 'CPFit', 'fit_cp', 'mmp_curve',
+           'mmp_curve_full', 'ActivitySummary', 'summarize_power', 'MMPStream', 'MMPEnvelope']
 
 # %% ../nbs/00_MMP.ipynb 4
+import struct
+from typing import NamedTuple, Optional, Tuple
 import numpy as np
-import pandas as pd
 
 # %% ../nbs/00_MMP.ipynb 6
+_MMP_HEADER = struct.Struct('<4sBI') # magic, dtype code of the durations, number of points
+_MMP_MAGIC = b'MMP1'
+_INT32 = np.iinfo(np.int32)
+
+def _as_durations(x):
+    "Durations as a contiguous int32 array, or float32 when some are fractional or out of the int32 range"
+    x = np.asarray(x)
+    if x.dtype.kind in 'biu' or x.dtype.kind == 'f' and np.isfinite(x).all() and (x == np.round(x)).all():
+        if not len(x) or (x.min() >= _INT32.min and x.max() <= _INT32.max):
+            return np.ascontiguousarray(x, dtype=np.int32)
+    return np.ascontiguousarray(x, dtype=np.float32)
+
+def _search_key(x, values):
+    "`values` cast to the dtype of `x`, so `np.searchsorted` does not convert all of `x`"
+    if x.dtype.kind != 'i': return values.astype(x.dtype)
+    # An integer duration is at or above `d` exactly when it is at or above `ceil(d)`
+    return np.nan_to_num(np.clip(np.ceil(values), _INT32.min, _INT32.max)).astype(np.int32)
+
+# %% ../nbs/00_MMP.ipynb 8
 class MMP:
     "A Mean Max Power curve"
+    __slots__ = ('x', 'y', 'sources')
+    
+    def __init__(self
+                 , x              # Time
+                 , y              # Power
+                 , sources=None): # Activity that set each point
+        self.x, self.y, self.sources = _as_durations(x), np.ascontiguousarray(y, dtype=np.float32), sources
+    
+    def __len__(self): return len(self.x)
+    def __repr__(self): return f"MMP({len(self.x)} points, {self.x[:1].tolist()}..{self.x[-1:].tolist()} s)"
+    
+    def __eq__(self, other):
+        if not isinstance(other, MMP): return NotImplemented
+        return np.array_equal(self.x, other.x) and np.array_equal(self.y, other.y)
+    __hash__ = None
+    
+    def _checked(self):
+        "Durations and powers, which lookups need to match"
+        if len(self.x) != len(self.y): raise ValueError(f"{len(self.x)} durations but {len(self.y)} powers")
+        return self.x, self.y
+    
+    def _sources(self):
+        "Activity of each point, None where unknown"
+        if self.sources is None: return np.full(len(self.x), None, dtype=object)
+        return np.asarray(self.sources, dtype=object)
+    
+    def merge(self, other):
+        "Element-wise best of `self` and `other` on the union of their durations, keeping which activity set each point"
+        x = np.union1d(np.asarray(self.x), np.asarray(other.x))
+        y, sources = np.full(len(x), -np.inf), np.full(len(x), None, dtype=object)
+        for curve in (self, other):
+            idx = np.searchsorted(x, np.asarray(curve.x))
+            cy = np.asarray(curve.y, dtype=float)
+            better = cy > y[idx]
+            y[idx[better]] = cy[better]
+            sources[idx[better]] = curve._sources()[better]
+        return MMP(x, y, sources)
+    
+    def update(self, other):
+        "Raise `self` to the best of `self` and `other` in place, O(D) when both share the same durations"
+        x, ox = np.asarray(self.x), np.asarray(other.x)
+        if len(x) != len(ox) or not np.array_equal(x, ox):
+            merged = self.merge(other)
+            self.x, self.y, self.sources = merged.x, merged.y, merged.sources
+            return self
+        y, oy = np.asarray(self.y, dtype=float), np.asarray(other.y, dtype=float)
+        better = oy > y
+        sources = self._sources()
+        sources[better] = other._sources()[better]
+        self.y, self.sources = np.where(better, oy, y).astype(np.float32), sources
+        return self
+    
+    def power_at(self, duration): # Duration in seconds, or an array of them
+        "Power held for `duration`, interpolated in log-duration, NaN outside the curve"
+        x, y = self._checked()
+        d = np.asarray(duration, dtype=float)
+        if len(x) < 2: return np.where(d == x[0], y[0], np.nan)[()] if len(x) else np.full(d.shape, np.nan)[()]
+        i = np.clip(np.searchsorted(x, _search_key(x, d)), 1, len(x) - 1)
+        x0, x1, y0, y1 = x[i - 1].astype(float), x[i].astype(float), y[i - 1].astype(float), y[i].astype(float)
+        with np.errstate(divide='ignore', invalid='ignore'):
+            p = y0 + np.log(d / x0) / np.log(x1 / x0) * (y1 - y0)
+        return np.where((d >= x[0]) & (d <= x[-1]), p, np.nan)[()]
+    
+    def duration_for(self, power): # Power in watts, or an array of them
+        "Longest duration `power` is held for, interpolated in log-duration, NaN outside the curve"
+        x, y = self._checked()
+        p = np.asarray(power, dtype=float)
+        if len(x) < 2: return np.where(p == y[0], x[0], np.nan)[()] if len(x) else np.full(p.shape, np.nan)[()]
+        # Powers decrease with duration, so search them reversed; `k` is the last point at or above `p`
+        k = len(x) - 1 - np.searchsorted(y[::-1], p.astype(np.float32))
+        i = np.clip(k, 0, len(x) - 2)
+        x0, x1, y0, y1 = x[i].astype(float), x[i + 1].astype(float), y[i].astype(float), y[i + 1].astype(float)
+        with np.errstate(divide='ignore', invalid='ignore'):
+            t = np.where(y0 > y1, (y0 - p) / (y0 - y1), 0.)
+            d = np.where(k == len(x) - 1, x[-1], np.exp(np.log(x0) + t * np.log(x1 / x0)))
+        return np.where((k >= 0) & (p >= y[-1]), d, np.nan)[()]
+    
+    def to_bytes(self):
+        "Compact little-endian encoding of the durations and powers, `sources` are not kept"
+        x, y = self._checked()
+        return (_MMP_HEADER.pack(_MMP_MAGIC, x.dtype.kind == 'f', len(x))
+                + x.astype(x.dtype.newbyteorder('<')).tobytes() + y.astype('<f4').tobytes())
+    
+    @classmethod
+    def from_bytes(cls, data): # Bytes written by `to_bytes`
+        "Curve decoded from `to_bytes`"
+        magic, fractional, n = _MMP_HEADER.unpack_from(data)
+        if magic != _MMP_MAGIC or len(data) != _MMP_HEADER.size + 8 * n:
+            raise ValueError("Not an encoded MMP curve")
+        x = np.frombuffer(data, dtype='<f4' if fractional else '<i4', count=n, offset=_MMP_HEADER.size)
+        return cls(x.copy(), np.frombuffer(data, dtype='<f4', count=n, offset=_MMP_HEADER.size + 4 * n).copy())
+    
+    def fit(self
+            , model='2p'       # '2p' for CP and W', '3p' to also fit the time offset `k`
+            , durations=None): # (shortest, longest) durations fitted, defaults to `CP_DURATIONS[model]`
+        "Critical power model fitted in closed form to the points of the curve, see `fit_cp`"
+        x, y = self._checked()
+        return fit_cp(x, y, model, durations)
+
+# %% ../nbs/00_MMP.ipynb 18
+# Durations in seconds fitted by default, the range where each model holds
+CP_DURATIONS = {'2p': (120, 1200), '3p': (30, 1200)}
+# Offsets searched for `k` in the 3-parameter model
+_CP_OFFSETS = -np.arange(0, 120.5, 0.5)
+
+# %% ../nbs/00_MMP.ipynb 19
+class CPFit(NamedTuple):
+    "Critical power model: `cp` (W), `w_prime` (J), offset `k` (s, 0 for 2 parameters), RMS power error (W) and points used"
+    cp: float
+    w_prime: float
+    k: float
+    rmse: float
+    n: int
+    
+    def power(self, t): # Durations in seconds
+        "Power the model predicts for `t`, one row per curve for a batch"
+        cp, w_prime, k = (np.asarray(v)[..., None] if np.ndim(v) else v for v in (self.cp, self.w_prime, self.k))
+        return cp + w_prime / (np.asarray(t, dtype=float) - k)
+    
+    def pdc_init(self):
+        "Starting values for `PDC.fit`, whose model reduces to `ftp + frc / t` between the sprint and threshold"
+        return {'ftp': self.cp, 'frc': self.w_prime}
+
+# %% ../nbs/00_MMP.ipynb 20
+def _weighted_sums(w, u, v):
+    "Sums over the last axis of `w`, `w·u`, `w·u²`, `w·v`, `w·u·v` for `w`, `v` of shape (curves, durations) and `u` (offsets, durations)"
+    return (w.sum(-1)[:, None], w @ u.T, w @ (u * u).T, (w * v).sum(-1)[:, None], (w * v) @ u.T)
+
+def _line_fit(sw, su, suu, sv, suv):
+    "Intercept and slope of the weighted least-squares line from its sums"
+    with np.errstate(divide='ignore', invalid='ignore'):
+        slope = (sw * suv - su * sv) / (sw * suu - su * su)
+        return (sv - slope * su) / sw, slope
+
+# %% ../nbs/00_MMP.ipynb 21
+def fit_cp(x,                # Durations in seconds
+           Y,                # Power, one curve or one row per curve, NaN where a duration is missing
+           model='2p',       # '2p' for CP and W', '3p' to also fit the time offset `k`
+           durations=None):  # (shortest, longest) durations fitted, defaults to `CP_DURATIONS[model]`
+    "Fit the 2- or 3-parameter critical power model in closed form, returning a `CPFit` of floats or of arrays for a batch"
+    if model not in CP_DURATIONS: raise ValueError(f"Unknown model {model!r}, expected '2p' or '3p'")
+    lo, hi = CP_DURATIONS[model] if durations is None else durations
+    x, Y = np.asarray(x, dtype=float), np.asarray(Y, dtype=float)
+    single = Y.ndim == 1
+    Y = np.atleast_2d(Y)
+    w = ((x >= lo) & (x <= hi) & (x > 0) & ~np.isnan(Y)).astype(float)
+    Y = np.where(w > 0, Y, 0.)
+    n = w.sum(-1)
+    if model == '2p':
+        # Work against duration: the intercept is W' and the slope CP
+        w_prime, cp = (v[:, 0] for v in _line_fit(*_weighted_sums(w, x[None], Y * x)))
+        k = np.zeros(len(Y))
+    else:
+        # Power against 1 / (t - k) for every offset: the intercept is CP and the slope W'
+        u = 1 / (x[None] - _CP_OFFSETS[:, None])
+        sw, su, suu, sv, suv = _weighted_sums(w, u, Y)
+        a, b = _line_fit(sw, su, suu, sv, suv)
+        sse = (w * Y * Y).sum(-1)[:, None] - a * sv - b * suv
+        best = np.nanargmin(np.where(np.isfinite(sse), sse, np.inf), axis=-1)
+        rows = np.arange(len(Y))
+        cp, w_prime, k = a[rows, best], b[rows, best], _CP_OFFSETS[best]
+    fit = CPFit(cp, w_prime, k, np.zeros(len(Y)), n.astype(int))
+    with np.errstate(invalid='ignore'):
+        rmse = np.sqrt((w * (fit.power(np.where(w > 0, x, 1.)) - Y) ** 2).sum(-1) / n)
+    # Fewer points than parameters leave the model undetermined
+    bad = n < (2 if model == '2p' else 3)
+    fit = CPFit(*(np.where(bad, np.nan, v) for v in (cp, w_prime, k, rmse)), fit.n)
+    return CPFit(*(v[0].item() for v in fit)) if single else fit
+
+# %% ../nbs/00_MMP.ipynb 25
+DEFAULT_DURATIONS = (list(range(1, 61)) + list(range(60, 301, 5))
+                     + list(range(300, 1801, 30)) + list(range(1800, 3601, 60)))
+
+# %% ../nbs/00_MMP.ipynb 26
+def _power_cumsum(power):
+    "Zero-prefixed cumulative sum of `power`, kept integer for integer samples so window sums are exact"
+    power = np.asarray(power)
+    cs = np.zeros(len(power) + 1, dtype=np.int64 if power.dtype.kind in 'biu' else np.float64)
+    np.cumsum(power, out=cs[1:])
+    return cs
+
+# %% ../nbs/00_MMP.ipynb 27
+def _max_window_sums(cs, durations):
+    "Best window sum in `cs` for each of `durations`"
+    return np.array([(cs[d:] - cs[:-d]).max() for d in durations], dtype=cs.dtype)
+
+# %% ../nbs/00_MMP.ipynb 28
+def _group_max(cs, ds, starts, block):
+    "Best window sum for each of `ds` over the windows starting in the blocks at `starts`"
+    n = len(cs) - 1
+    idx = (starts[:, None] + np.arange(block)).ravel()
+    ends = idx[None, :] + ds[:, None]
+    sums = cs[np.minimum(ends, n)] - cs[idx][None, :]
+    sums[ends > n] = 0
+    return sums.max(axis=1)
+
+# %% ../nbs/00_MMP.ipynb 29
+def _max_window_sums_all(cs, block=32, group=32, scan_below=256, seeds=4):
+    "Best window sum in `cs` for every duration, pruning blocks of start positions that cannot win"
+    n = len(cs) - 1
+    best = np.empty(n, dtype=cs.dtype)
+    d = min(scan_below, n)
+    best[:d] = _max_window_sums(cs, range(1, d + 1))
+    d += 1
+    # Pruning relies on `cs` being non-decreasing, i.e. on non-negative power
+    if n and (np.diff(cs) < 0).any():
+        best[d - 1:] = _max_window_sums(cs, range(d, n + 1))
+        return best
+    while d <= n:
+        ds = np.arange(d, min(d + group, n + 1))
+        starts = np.arange(0, n - ds[0] + 1, block)
+        # No window of the group starting in a block can beat the longest window covering that block
+        ub = cs[np.minimum(starts + block - 1 + ds[-1], n)] - cs[starts]
+        top = np.argpartition(ub, -min(seeds, len(ub)))[-seeds:]
+        lb = _group_max(cs, ds, starts[top], block)
+        todo = ub > lb.min()
+        todo[top] = False
+        if todo.any(): lb = np.maximum(lb, _group_max(cs, ds, starts[todo], block))
+        best[ds - 1] = lb
+        d = ds[-1] + 1
+    return best
+
+# %% ../nbs/00_MMP.ipynb 30
+def _breaks(power):
+    "Mask of the NaN samples of `power` marking breaks in the recording, None when there are none"
+    if power.dtype.kind != 'f': return None
+    breaks = np.isnan(power)
+    return breaks if breaks.any() else None
+
+# %% ../nbs/00_MMP.ipynb 31
+def mmp_curve(power,           # Power samples at 1 Hz, NaN where the recording breaks
+              durations=None): # Durations in seconds, defaults to `DEFAULT_DURATIONS`
+    "Mean maximal power of `power` for each duration no longer than the stream, as `(durations, mmp)` arrays"
+    durations = np.asarray(DEFAULT_DURATIONS if durations is None else durations, dtype=np.int64)
+    if (durations < 1).any(): raise ValueError("Durations must be at least 1 second")
+    return _mmp_from_cumsum(*_stream_cumsums(np.asarray(power)), durations)
+
+# %% ../nbs/00_MMP.ipynb 32
+def _stream_cumsums(power):
+    "Cumulative power with breaks counted as zero, and the cumulative break count or None without breaks"
+    breaks = _breaks(power)
+    if breaks is None: return _power_cumsum(power), None
+    return _power_cumsum(np.where(breaks, 0., power)), _power_cumsum(breaks.astype(np.int64))
+
+def _mmp_from_cumsum(cs, nb, durations):
+    "`mmp_curve` from the cumulative sums of `_stream_cumsums`, counting only windows without a break"
+    durations = durations[durations <= len(cs) - 1]
+    if nb is None: return durations, _max_window_sums(cs, durations) / durations
+    kept, best = [], []
+    for d in durations:
+        clean = nb[d:] == nb[:-d]
+        if clean.any():
+            kept.append(d)
+            best.append((cs[d:] - cs[:-d])[clean].max())
+    kept = np.array(kept, dtype=np.int64)
+    return kept, np.array(best, dtype=np.float64) / kept
+
+# %% ../nbs/00_MMP.ipynb 33
+def mmp_curve_full(power): # Power samples at 1 Hz, NaN where the recording breaks
+    "Mean maximal power for every duration from 1 s to the length of `power`, as `(durations, mmp)` arrays"
+    power = np.asarray(power)
+    breaks = _breaks(power)
+    if breaks is None:
+        cs = _power_cumsum(power)
+        durations = np.arange(1, len(cs), dtype=np.int64)
+        return durations, _max_window_sums_all(cs) / durations
+    # Best of the unbroken segments, each covering the durations up to its own length
+    edges = np.flatnonzero(np.diff(np.concatenate([[True], breaks, [True]]).astype(np.int8)))
+    best = np.full(0, -np.inf)
+    for start, end in zip(edges[::2], edges[1::2]):
+        sums = _max_window_sums_all(_power_cumsum(power[start:end]))
+        if len(sums) > len(best): best = np.concatenate([best, np.full(len(sums) - len(best), -np.inf)])
+        np.maximum(best[:len(sums)], sums, out=best[:len(sums)])
+    durations = np.arange(1, len(best) + 1, dtype=np.int64)
+    return durations, best / durations
+
+# %% ../nbs/00_MMP.ipynb 39
+COGGAN_ZONES = (0.55, 0.75, 0.90, 1.05, 1.20, 1.50)
+NP_WINDOW = 30
+
+# %% ../nbs/00_MMP.ipynb 40
+class ActivitySummary(NamedTuple):
+    "Totals of a ride: recorded seconds, work in kJ, average and normalized power, IF, TSS, seconds per zone and the MMP curve"
+    duration: int
+    work: float
+    average_power: float
+    normalized_power: float
+    intensity_factor: float
+    tss: float
+    zones: Optional[np.ndarray]
+    mmp: Tuple[np.ndarray, np.ndarray]
+
+# %% ../nbs/00_MMP.ipynb 41
+def summarize_power(power,                # Power samples at 1 Hz, NaN where the recording breaks
+                    ftp=None,             # Functional threshold power, needed for IF, TSS and zones
+                    zones=COGGAN_ZONES,   # Upper bounds of every zone but the last, as fractions of `ftp`
+                    durations=None):      # MMP durations in seconds, defaults to `DEFAULT_DURATIONS`
+    "Summarize `power` in one pass over its cumulative sum, shared with its MMP curve"
+    durations = np.asarray(DEFAULT_DURATIONS if durations is None else durations, dtype=np.int64)
+    if (durations < 1).any(): raise ValueError("Durations must be at least 1 second")
+    power = np.asarray(power)
+    cs, nb = _stream_cumsums(power)
+    seconds = len(power) - (0 if nb is None else int(nb[-1]))
+    work = float(cs[-1])
+    # Normalized power: fourth-power mean of the 30 s rolling means, skipping windows over a break
+    w = NP_WINDOW
+    rolling = np.subtract(cs[w:], cs[:-w], dtype=np.float64) if len(power) >= w else np.zeros(0)
+    if nb is not None: rolling = rolling[nb[w:] == nb[:-w]]
+    rolling /= w
+    np.power(rolling, 4, out=rolling)
+    normalized = float(rolling.mean() ** 0.25) if len(rolling) else np.nan
+    average = work / seconds if seconds else np.nan
+    if ftp is None:
+        intensity, tss, in_zone = np.nan, np.nan, None
+    else:
+        intensity = normalized / ftp
+        tss = 100 * seconds * normalized * intensity / (ftp * 3600)
+        index = np.searchsorted(np.asarray(zones, dtype=np.float64) * ftp, power, side='right')
+        # NaN sorts past every bound: drop breaks from the last bin instead of masking every sample
+        in_zone = np.bincount(index, minlength=len(zones) + 1)
+        if nb is not None: in_zone[-1] -= nb[-1]
+    return ActivitySummary(seconds, work / 1000, average, normalized, intensity, tss, in_zone,
+                           _mmp_from_cumsum(cs, nb, durations))
+
+# %% ../nbs/00_MMP.ipynb 45
+class MMPStream:
+    "Mean maximal power of a stream of 1 Hz power samples, updated as samples arrive"
+    def __init__(self, durations=None): # Durations in seconds, defaults to `DEFAULT_DURATIONS`
+        self.durations = np.unique(np.asarray(DEFAULT_DURATIONS if durations is None else durations, dtype=np.int64))
+        if (self.durations < 1).any(): raise ValueError("Durations must be at least 1 second")
+        self._tail = np.zeros(0, dtype=np.int64)
+        self._best = np.full(len(self.durations), np.iinfo(np.int64).min)
+        self.n = 0
+    
+    def __len__(self): return self.n
+    
+    def push(self
+             , samples       # One power sample or an array of them, NaN where the recording breaks
+             , block=65536): # Samples scored at a time, bounding the work arrays
+        "Add samples to the stream and update the best window sums"
+        samples = np.atleast_1d(np.asarray(samples))
+        if samples.dtype.kind not in 'biu' and self._best.dtype.kind != 'f':
+            self._tail, self._best = self._tail.astype(np.float64), self._best.astype(np.float64)
+        breaks = _breaks(samples)
+        if breaks is not None:
+            # No window spans a break: score the stretches between breaks, forgetting the tail at each one
+            edges = np.flatnonzero(breaks)
+            for lo, hi in zip(np.concatenate([[0], edges + 1]), np.concatenate([edges, [len(samples)]])):
+                if lo > 0:
+                    self._tail = self._tail[:0]
+                    self.n += 1
+                self.push(samples[lo:hi], block)
+            return self
+        for start in range(0, len(samples), block):
+            self._push_block(samples[start:start + block].astype(self._best.dtype, copy=False))
+        return self
+    
+    def _push_block(self, samples):
+        ext = np.concatenate([self._tail, samples])
+        cs = _power_cumsum(ext)
+        # Score every window ending on a new sample; the tail holds every earlier sample such a window can reach
+        first = len(self._tail) + 1
+        if len(samples) <= 64:
+            # Few samples, typically a live feed: all durations at once, masking windows that start before the stream
+            ends = np.arange(first, len(cs))
+            starts = ends[None, :] - self.durations[:, None]
+            sums = np.where(starts >= 0, cs[ends][None, :] - cs[np.maximum(starts, 0)], self._best[:, None])
+            np.maximum(self._best, sums.max(axis=1), out=self._best)
+        else:
+            for i, d in enumerate(self.durations[self.durations < len(cs)]):
+                lo = max(first, d)
+                self._best[i] = max(self._best[i], (cs[lo:] - cs[lo - d:len(cs) - d]).max())
+        self.n += len(samples)
+        self._tail = ext[-self.durations[-1]:]
+    
+    def curve(self):
+        "Current `(durations, mmp)` for the durations the stream has reached, like `mmp_curve`"
+        reached = self._best > np.iinfo(np.int64).min
+        return self.durations[reached], self._best[reached] / self.durations[reached]
+
+# %% ../nbs/00_MMP.ipynb 49
+class MMPEnvelope:
+    "Best MMP across many activities, all-time or over a rolling window of days"
     def __init__(self
-                 , x     # Time
-                 , y):   # Power
-        self.x, self.y = x, y
+                 , durations=None  # Duration grid in seconds, defaults to `DEFAULT_DURATIONS`
+                 , window=None):   # Rolling window in days, None for all-time
+        self.durations = np.unique(np.asarray(DEFAULT_DURATIONS if durations is None else durations))
+        self.window = None if window is None else np.timedelta64(int(round(window * 86400)), 's')
+        self._curves = np.empty((16, len(self.durations)))
+        self._dates = np.empty(16, dtype='datetime64[s]')
+        self.activities = []
+        self._best = np.full(len(self.durations), np.nan)
+        self._owner = np.full(len(self.durations), -1)
+        self._as_of = None
+    
+    def __len__(self): return len(self.activities)
+    
+    def _on_grid(self, mmp):
+        "Power of `mmp` at each duration of the grid, NaN where the curve has no point"
+        row = np.full(len(self.durations), np.nan)
+        x = np.asarray(mmp.x)
+        idx = np.searchsorted(self.durations, x)
+        found = (idx < len(self.durations)) & (self.durations[np.minimum(idx, len(self.durations) - 1)] == x)
+        row[idx[found]] = np.asarray(mmp.y, dtype=float)[found]
+        return row
+    
+    def _in_window(self, as_of):
+        "Mask of the stored rides inside the window ending at `as_of`"
+        dates = self._dates[:len(self)]
+        inside = dates <= as_of
+        if self.window is not None: inside &= dates > as_of - self.window
+        return inside
+    
+    def _best_of(self, rides, cols=slice(None)):
+        "Best power and owning ride index over `rides` (indices) for the `cols` durations"
+        curves = self._curves[rides][:, cols]
+        if not len(rides): return np.full(curves.shape[1], np.nan), np.full(curves.shape[1], -1)
+        filled = np.where(np.isnan(curves), -np.inf, curves)
+        arg = filled.argmax(axis=0)
+        best = filled[arg, np.arange(curves.shape[1])]
+        owner = np.asarray(rides)[arg]
+        missing = np.isneginf(best)
+        best[missing], owner[missing] = np.nan, -1
+        return best, owner
+    
+    def _advance(self, as_of):
+        "Move the window end to `as_of`, recomputing only the durations whose best ride expired"
+        self._as_of = as_of
+        if self.window is None: return
+        owned = self._owner >= 0
+        expired = np.zeros(len(self.durations), dtype=bool)
+        expired[owned] = self._dates[self._owner[owned]] <= as_of - self.window
+        if expired.any():
+            rides = np.flatnonzero(self._in_window(as_of))
+            self._best[expired], self._owner[expired] = self._best_of(rides, expired)
+    
+    def add(self
+            , mmp            # MMP curve of the activity
+            , date           # When the activity took place
+            , activity=None): # Activity identifier, defaults to its insertion index
+        "Add an activity and update the envelope in O(D)"
+        n = len(self)
+        if n == len(self._dates):
+            self._curves = np.concatenate([self._curves, np.empty_like(self._curves)])
+            self._dates = np.concatenate([self._dates, np.empty_like(self._dates)])
+        date = np.datetime64(date, 's')
+        self._curves[n], self._dates[n] = self._on_grid(mmp), date
+        self.activities.append(n if activity is None else activity)
+        if self._as_of is None or date > self._as_of: self._advance(date)
+        if self._in_window(self._as_of)[n]:
+            row = self._curves[n]
+            better = row > np.where(np.isnan(self._best), -np.inf, self._best)
+            self._best[better], self._owner[better] = row[better], n
+        return self
     
-    def fit(self): pass
-        
+    def curve(self, as_of=None): # End of the window, defaults to the latest activity
+        "Envelope as an `MMP` whose `sources` name the activity behind each point"
+        if as_of is not None:
+            as_of = np.datetime64(as_of, 's')
+            if self._as_of is None or as_of < self._as_of:
+                # Looking back in time: compute from scratch without moving the window
+                best, owner = self._best_of(np.flatnonzero(self._in_window(as_of)))
+                return self._as_mmp(best, owner)
+            self._advance(as_of)
+        return self._as_mmp(self._best, self._owner)
     
+    def _as_mmp(self, best, owner):
+        valid = owner >= 0
+        activities = np.empty(len(self) + 1, dtype=object)
+        activities[:-1] = self.activities
+        return MMP(self.durations[valid], best[valid], activities[owner[valid]])
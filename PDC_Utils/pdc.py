@@ -3,12 +3,22 @@
 # AUTOGENERATED! DO NOT EDIT! File to edit: ../nbs/01_PDC.ipynb.
 
 # %% auto 0
-__all__ = ['power_curve', 'PDC']
+__all__ = ['PARAM_BOUNDS', 'power_curve', 'power_curve_jac', 'power_curve_grid', 'initial_guess', 'make_params', 'PDC',
+           'fit_batch', 'FitRecord', 'fit_many', 'thin_curve', 'BootstrapResult', 'PDC_MODEL']
 
 # %% ../nbs/01_PDC.ipynb 4
-from lmfit import Model, Parameters
+import functools
+from concurrent.futures import ProcessPoolExecutor, ThreadPoolExecutor, as_completed
+from concurrent.futures.process import BrokenProcessPool
+from typing import TYPE_CHECKING, NamedTuple, Optional
 import numpy as np
-import pandas as pd
+
+if TYPE_CHECKING:
+    import pandas as pd
+
+from .aio import _stop_check, run_blocking
+from .instrument import _start_stage, _end_stage
+from .mmp import fit_cp
 
 # %% ../nbs/01_PDC.ipynb 6
 def power_curve(x, 
@@ -22,21 +32,544 @@ def power_curve(x,
     p -= np.maximum(0, a * np.log(x / tte))
     return p
 
-# %% ../nbs/01_PDC.ipynb 7
+# %% ../nbs/01_PDC.ipynb 8
+def power_curve_jac(x, frc, ftp, tte, tau, tau2, a):
+    "Derivatives of `power_curve` with respect to frc, ftp, tte, tau, tau2 and a, stacked along a last axis of 6"
+    x = np.asarray(x, dtype=float)
+    e1, e2 = np.exp(-x/tau), np.exp(-x/tau2)
+    log_ratio = np.log(x / tte)
+    decaying = a * log_ratio > 0
+    columns = [(1.0 - e1) / x,
+               1 - e2,
+               np.where(decaying, a / tte, 0.),
+               -frc * e1 / tau**2,
+               -ftp * x * e2 / tau2**2,
+               np.where(decaying, -log_ratio, 0.)]
+    # Parameters may be arrays broadcasting against `x`, e.g. one row per athlete
+    return np.stack(np.broadcast_arrays(*columns), axis=-1)
+
+# %% ../nbs/01_PDC.ipynb 9
+_JAC_COLUMNS = ['frc', 'ftp', 'tte', 'tau', 'tau2', 'a']
+
+def _residual_jac(params, data, weights, x):
+    "Jacobian of the lmfit residual `(data - power_curve) * weights` over the varying parameters"
+    jac = -power_curve_jac(x, *(params[name].value for name in _JAC_COLUMNS))
+    jac = jac[:, [i for i, name in enumerate(_JAC_COLUMNS) if params[name].vary]]
+    if weights is not None: jac *= np.asarray(weights, dtype=float)[:, None]
+    return jac
+
+# %% ../nbs/01_PDC.ipynb 11
+def power_curve_grid(x,                # Durations in seconds
+                     frc, ftp, tte, tau, tau2, a, # Parameters, scalars or 1-D arrays with one value per scenario
+                     dtype=np.float64, # np.float64 or np.float32
+                     out=None,         # Optional (scenarios, durations) array of `dtype` to write into
+                     block=256):       # Scenarios evaluated per scratch block
+    "`power_curve` for every scenario × duration, as an array with one row per scenario"
+    x = np.asarray(x, dtype=dtype)
+    params = np.broadcast_arrays(*(np.atleast_1d(np.asarray(v, dtype=dtype)) for v in (frc, ftp, tte, tau, tau2, a)))
+    if params[0].ndim != 1: raise ValueError("Parameters must be scalars or 1-D arrays")
+    frc, ftp, tte, tau, tau2, a = (v[:, None] for v in params)
+    shape = (len(frc), len(x))
+    if out is None: out = np.empty(shape, dtype=dtype)
+    elif out.shape != shape or out.dtype != dtype: raise ValueError(f"out must be a {np.dtype(dtype)} array of shape {shape}")
+    neg_x = -x
+    scratch = np.empty((min(block, shape[0]), shape[1]), dtype=dtype)
+    for start in range(0, shape[0], block):
+        r = slice(start, start + block)
+        o, s = out[r], scratch[:len(out[r])]
+        # frc / x * (1 - exp(-x / tau))
+        np.divide(neg_x, tau[r], out=o)
+        np.exp(o, out=o)
+        np.subtract(1, o, out=o)
+        o *= frc[r]
+        o /= x
+        # + ftp * (1 - exp(-x / tau2))
+        np.divide(neg_x, tau2[r], out=s)
+        np.exp(s, out=s)
+        np.subtract(1, s, out=s)
+        s *= ftp[r]
+        o += s
+        # - max(0, a * log(x / tte))
+        np.divide(x, tte[r], out=s)
+        np.log(s, out=s)
+        s *= a[r]
+        np.maximum(s, 0, out=s)
+        o -= s
+    return out
+
+# %% ../nbs/01_PDC.ipynb 15
+_all_ = ['PDC_MODEL']
+
+@functools.lru_cache(maxsize=None)
+def _model():
+    "The lmfit `Model` of `power_curve`, built on first use"
+    from lmfit import Model
+    return Model(power_curve)
+
+def __getattr__(name):
+    "Build `PDC_MODEL` when it is first accessed"
+    if name == 'PDC_MODEL': return _model()
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
+
+# name: (default initial value, min, max)
+PARAM_BOUNDS = {'frc': (5000, 1, 15000),
+                'ftp': (150, 100, 400),
+                'tte': (2000, 1800, 3600),
+                'tau': (12, 10, 25),
+                'tau2': (5000, 10, 25),
+                'a': (10, 1, 200)}
+
+# %% ../nbs/01_PDC.ipynb 16
+def _default_guess():
+    "Default starting values"
+    guess = {name: value for name, (value, _, _) in PARAM_BOUNDS.items()}
+    # The default tau2 is clipped onto its upper bound, where the fit tends to stall
+    guess['tau2'] = 20
+    return guess
+
+def initial_guess(x, # Time
+                  y): # Power
+    "Starting values for `frc` and `ftp` estimated from the MMP points, defaults for the rest"
+    x, y = np.asarray(x, dtype=float), np.asarray(y, dtype=float)
+    order = np.argsort(x)
+    x, y = x[order], y[order]
+    guess = _default_guess()
+    # Between the sprint and threshold the model reduces to `ftp + frc / x`, the 2-parameter critical power model
+    cp = fit_cp(x, y, '2p', durations=(60, 600))
+    if np.isfinite(cp.cp) and cp.w_prime > 0:
+        guess.update(cp.pdc_init())
+        return guess
+    # Too few points for the fit: ~95% of the 20 minute power is the classic threshold estimate
+    ftp = 0.95 * np.interp(1200, x, y) if x[-1] >= 1200 else 0.95 * y[-1]
+    guess['ftp'] = ftp
+    # Past the sprint, power above threshold times duration is roughly the anaerobic work capacity
+    mid = (x >= 60) & (x <= 600)
+    if mid.any(): guess['frc'] = np.median((y[mid] - ftp) * x[mid])
+    return guess
+
+# %% ../nbs/01_PDC.ipynb 17
+def _init_values(init, x, y):
+    "Initial values from `init`: None for the defaults, 'auto' for `initial_guess`, a dict, `Parameters`, fit result or `CPFit`"
+    if init is None: return {}
+    if isinstance(init, str):
+        if init != 'auto': raise ValueError(f"Unknown init {init!r}, expected 'auto'")
+        return initial_guess(x, y)
+    if hasattr(init, 'best_values'): return init.best_values
+    if hasattr(init, 'pdc_init'): return init.pdc_init()
+    if hasattr(init, 'valuesdict'): return init.valuesdict()
+    return dict(init)
+
+# %% ../nbs/01_PDC.ipynb 18
+def make_params(init=None): # Dict of initial values, missing ones use the defaults
+    "Fresh `Parameters` with the default bounds, starting at `init` clipped just inside those bounds"
+    from lmfit import Parameters
+    init = init or {}
+    params = Parameters()
+    for name, (value, lo, hi) in PARAM_BOUNDS.items():
+        # On a bound the bounds transform has a zero gradient and the solver cannot move the parameter
+        margin = 1e-3 * (hi - lo)
+        params.add(name, value=float(np.clip(init.get(name, value), lo + margin, hi - margin)), min=lo, max=hi)
+    return params
+
+# %% ../nbs/01_PDC.ipynb 19
 class PDC:
     "A Power Duraction Curve"
-    def __init__(self, x, y): self.x, self.y = x, y
-    
-    def fit(self):
-        gmodel = Model(power_curve)
-        params = Parameters()
-        params.add('frc', value=5000, min=1, max=15000)
-        params.add('ftp', value=150, min=100, max=400)
-        params.add('tte', value=2000, min=1800, max=3600)
-        params.add('tau', value=12, min=10, max=25)
-        params.add('tau2', value=5000, min=10, max=25)
-        params.add('a', value=10, min=1, max=200)
-        
-        return gmodel.fit(self.y, params, x=self.x)
-        
+    def __init__(self, x, y, weights=None): self.x, self.y, self.weights = x, y, weights
+    
+    def fit(self
+            , init=None     # None, 'auto', a dict of values, `Parameters` or a previous fit result
+            , jac=True      # Use the analytic Jacobian instead of finite differences
+            , timeout=None): # Seconds after which the fit is aborted and reported as failed
+        "Fit `power_curve` to the curve, warm-starting from `init` when given"
+        start = _start_stage()
+        params = make_params(_init_values(init, self.x, self.y))
+        fit_kws, njev = None, [0]
+        if jac:
+            dfun = _residual_jac
+            if start is not None:
+                def dfun(*args, **kws): # Counts Jacobians, the solver evaluates one per iteration
+                    njev[0] += 1
+                    return _residual_jac(*args, **kws)
+            fit_kws = {'Dfun': dfun}
+        stop = _stop_check(timeout)
+        iter_cb = None if stop is None else lambda *args, **kws: stop()
+        result = _model().fit(self.y, params, x=self.x, weights=self.weights, fit_kws=fit_kws, iter_cb=iter_cb)
+        _end_stage('pdc.fit', start, points=len(self.y), nfev=result.nfev, iterations=njev[0] if jac else None,
+                   success=bool(result.success and not result.aborted))
+        return result
+    
+    def fit_separable(self
+                      , init=None     # None, 'auto', a dict of values, `Parameters` or a previous fit result
+                      , timeout=None): # Seconds after which the fit is aborted and reported as failed
+        "Fit `power_curve` by variable projection, solving `frc`, `ftp` and `a` exactly at every step, as a `FitRecord`"
+        return _fit_separable(self.x, self.y, init, timeout, self.weights)
+    
+    async def fit_async(self, init=None, jac=True, timeout=None):
+        "`PDC.fit` on the shared executor of `run_blocking`, stopping at the next iteration if cancelled"
+        return await run_blocking(self.fit, init, jac, timeout)
+    
+    async def fit_separable_async(self, init=None, timeout=None):
+        "`PDC.fit_separable` on the shared executor of `run_blocking`, stopping at the next step if cancelled"
+        return await run_blocking(self.fit_separable, init, timeout)
+    
+    def thin(self
+             , per_decade=20 # Log-spaced bins per decade of duration
+             , hull=False):  # Also drop the points below the upper concave hull of work against time
+        "A `PDC` of the curve thinned by `thin_curve`, weighted to fit like the full curve"
+        return PDC(*thin_curve(self.x, self.y, per_decade, hull, self.weights))
+    
+    def bootstrap(self
+                  , n=1000              # Number of resamples
+                  , level=0.95          # Coverage of the percentile intervals
+                  , method='separable'  # 'fit' for `PDC.fit`, 'separable' for `PDC.fit_separable`, 'batch' for `fit_batch`
+                  , workers=None        # Workers of `fit_many`, defaults to the number of CPUs. Unused by 'batch'
+                  , backend='process'   # 'process' or 'thread'
+                  , chunksize=64        # Refits sent to a worker at a time
+                  , seed=None):         # Seed of the resampling
+        "Percentile intervals of every parameter over refits of the curve resampled with replacement, as a `BootstrapResult`"
+        return _bootstrap(self, n, level, method, workers, backend, chunksize, seed)
+
+# %% ../nbs/01_PDC.ipynb 28
+_LOWER, _INIT, _UPPER = (np.array([bounds[i] for bounds in PARAM_BOUNDS.values()], dtype=float) for i in (1, 0, 2))
+
+def _to_internal(values):
+    "Unbounded internal values of parameters inside `PARAM_BOUNDS`, inverse of `_from_internal`"
+    return np.arcsin(2 * (values - _LOWER) / (_UPPER - _LOWER) - 1)
+
+def _from_internal(u):
+    "Parameter values and their derivatives with respect to the internal values `u`"
+    half = (_UPPER - _LOWER) / 2
+    return _LOWER + half * (np.sin(u) + 1), half * np.cos(u)
+
+# %% ../nbs/01_PDC.ipynb 29
+def _batch_init(init, x, Y):
+    "Initial values, one row per curve, clipped just inside the bounds"
+    import pandas as pd
+    if init is None: values = np.tile(_INIT, (len(Y), 1))
+    elif isinstance(init, str):
+        if init != 'auto': raise ValueError(f"Unknown init {init!r}, expected 'auto'")
+        # As `initial_guess`, with one critical power fit for the whole batch
+        values = np.tile(list(_default_guess().values()), (len(Y), 1)).astype(float)
+        cp = fit_cp(x, Y, '2p', durations=(60, 600))
+        ok = np.isfinite(cp.cp) & (cp.w_prime > 0)
+        values[ok, 0], values[ok, 1] = cp.w_prime[ok], cp.cp[ok]
+        for i in np.flatnonzero(~ok & (~np.isnan(Y)).any(axis=1)):
+            keep = ~np.isnan(Y[i])
+            values[i] = list(initial_guess(x[keep], Y[i][keep]).values())
+    elif isinstance(init, pd.DataFrame): values = init[list(PARAM_BOUNDS)].to_numpy(dtype=float)
+    else: values = np.broadcast_to(np.asarray(init, dtype=float), (len(Y), len(PARAM_BOUNDS)))
+    margin = 1e-3 * (_UPPER - _LOWER)
+    return np.clip(values, _LOWER + margin, _UPPER - margin)
+
+# %% ../nbs/01_PDC.ipynb 30
+def fit_batch(x,                # Durations shared by every curve
+              Y,                # Power, one row per curve, NaN where a duration is missing
+              weights=None,     # Optional weights broadcasting against `Y`
+              init=None,        # None for the defaults, 'auto' for `initial_guess`, or one row of values per curve
+              max_iter=500,     # Maximum number of iterations
+              ftol=1.5e-8,      # Relative reduction of the cost below which a curve has converged
+              xtol=1.5e-8):     # Relative step size below which a curve has converged
+    "Fit `power_curve` to every row of `Y` at once, returning a table of parameters, chi-square and success flags"
+    import pandas as pd
+    start = _start_stage()
+    index = Y.index if isinstance(Y, pd.DataFrame) else None
+    x, Y = np.asarray(x, dtype=float), np.asarray(Y, dtype=float)
+    if Y.ndim == 1: Y = Y[None, :]
+    mask = ~np.isnan(Y)
+    w = np.where(mask, 1. if weights is None else np.broadcast_to(np.asarray(weights, dtype=float), Y.shape), 0.)
+    data = np.where(mask, Y, 0.)
     
+    def residuals(u, rows):
+        values, _ = _from_internal(u)
+        model = power_curve(x, *values.T[:, :, None])
+        r = w[rows] * (model - data[rows])
+        return r, (r**2).sum(axis=1)
+    
+    u = _to_internal(_batch_init(init, x, Y))
+    r, cost = residuals(u, slice(None))
+    lam = np.full(len(Y), 1e-3)
+    damping = np.zeros((len(Y), 6))
+    converged = np.zeros(len(Y), dtype=bool)
+    iterations = np.zeros(len(Y), dtype=int)
+    for _ in range(max_iter):
+        rows = np.flatnonzero(~converged & np.isfinite(cost))
+        if not len(rows): break
+        iterations[rows] += 1
+        values, scale = _from_internal(u[rows])
+        J = power_curve_jac(x, *values.T[:, :, None]) * scale[:, None, :] * w[rows][:, :, None]
+        A = J.transpose(0, 2, 1) @ J
+        g = (J.transpose(0, 2, 1) @ r[rows][:, :, None])[:, :, 0]
+        # As in MINPACK, damp each parameter by the largest curvature seen so far, so a parameter
+        # pressed against a bound (where its column of `J` vanishes) cannot take wild steps
+        damping[rows] = np.maximum(damping[rows], np.diagonal(A, axis1=1, axis2=2))
+        diag = np.maximum(damping[rows], 1e-12)
+        step = -np.linalg.solve(A + (lam[rows, None] * diag)[:, :, None] * np.eye(6), g[:, :, None])[:, :, 0]
+        trial = u[rows] + step
+        r_trial, cost_trial = residuals(trial, rows)
+        better = cost_trial < cost[rows]
+        # Accepted steps relax the damping towards Gauss-Newton, rejected ones push towards gradient descent
+        done = (better & (cost[rows] - cost_trial <= ftol * cost[rows])) | \
+               (np.abs(step) <= xtol * (np.abs(u[rows]) + xtol)).all(axis=1) | (lam[rows] > 1e16)
+        ok = rows[better]
+        u[ok], r[ok], cost[ok] = trial[better], r_trial[better], cost_trial[better]
+        lam[rows] = np.where(better, np.maximum(lam[rows] / 10, 1e-12), lam[rows] * 10)
+        converged[rows[done]] = True
+    
+    values, _ = _from_internal(u)
+    table = pd.DataFrame(values, columns=list(PARAM_BOUNDS), index=index)
+    table['chisqr'] = cost
+    table['iterations'] = iterations
+    table['success'] = converged & np.isfinite(cost) & (mask.sum(axis=1) > len(PARAM_BOUNDS))
+    _end_stage('pdc.fit_batch', start, curves=len(Y), iterations=int(iterations.sum()),
+               success=int(table['success'].sum()))
+    return table
+
+# %% ../nbs/01_PDC.ipynb 34
+class FitRecord(NamedTuple):
+    "Outcome of one fit: best values, their standard errors, chi-square and whether it succeeded"
+    best_values: Optional[dict] = None
+    stderr: Optional[dict] = None
+    chisqr: float = np.nan
+    nfev: int = 0
+    success: bool = False
+    message: str = ''
+    
+    @classmethod
+    def from_result(cls, result):
+        "Record of an lmfit `ModelResult`"
+        message = 'Fit timed out.' if result.aborted else result.message
+        return cls(dict(result.best_values), {name: p.stderr for name, p in result.params.items()},
+                   result.chisqr, result.nfev, bool(result.success and not result.aborted), message)
+
+# %% ../nbs/01_PDC.ipynb 35
+def _fit_chunk(curves, jac, timeout, separable=False):
+    "Fit every `(x, y, weights, init)` of `curves`, catching per-fit errors"
+    records = []
+    for x, y, weights, init in curves:
+        try:
+            if separable: records.append(PDC(x, y, weights).fit_separable(init, timeout))
+            else: records.append(FitRecord.from_result(PDC(x, y, weights).fit(init, jac, timeout)))
+        except Exception as e:
+            records.append(FitRecord(message=f"{type(e).__name__}: {e}"))
+    return records
+
+def _report_many(start, records):
+    "Report the `pdc.fit_many` stage that started at `start` and return its `records`"
+    if start is not None:
+        _end_stage('pdc.fit_many', start, curves=len(records), nfev=sum(r.nfev for r in records),
+                   success=sum(r.success for r in records))
+    return records
+
+# %% ../nbs/01_PDC.ipynb 36
+def fit_many(pdcs,               # `PDC` objects to fit
+             workers=None,       # Number of workers, defaults to the number of CPUs. With 1 the fits run in this process
+             backend='process',  # 'process' or 'thread'
+             init=None,          # Starting point for every fit, or a list with one per `PDC`
+             jac=True,           # Use the analytic Jacobian
+             timeout=None,       # Seconds after which a single fit is aborted and reported as failed
+             chunksize=16,       # Number of fits sent to a worker at a time
+             separable=False):   # Fit by variable projection, see `PDC.fit_separable`
+    "Fit many `PDC` objects concurrently, returning one `FitRecord` per object in input order"
+    if backend not in ('process', 'thread'): raise ValueError(f"Unknown backend {backend!r}, expected 'process' or 'thread'")
+    started = _start_stage()
+    pdcs = list(pdcs)
+    # A single FitRecord is itself a tuple, so only lists hold one starting point per PDC
+    inits = init if isinstance(init, list) else [init] * len(pdcs)
+    if len(inits) != len(pdcs): raise ValueError("Expected one init per PDC")
+    # Previous results are reduced to their values so that workers receive only plain data
+    curves = [(np.asarray(p.x), np.asarray(p.y), p.weights,
+               i if i is None or isinstance(i, str) else _init_values(i, p.x, p.y))
+              for p, i in zip(pdcs, inits)]
+    chunksize = max(chunksize, 1)
+    starts = range(0, len(curves), chunksize)
+    if workers == 1: return _report_many(started, _fit_chunk(curves, jac, timeout, separable))
+    records = [None] * len(curves)
+    executor = ProcessPoolExecutor if backend == 'process' else ThreadPoolExecutor
+    with executor(max_workers=workers) as pool:
+        futures = {pool.submit(_fit_chunk, curves[start:start + chunksize], jac, timeout, separable): start
+                   for start in starts}
+        for future in as_completed(futures):
+            start = futures[future]
+            try:
+                chunk = future.result()
+            except BrokenProcessPool as e:
+                # A worker died, report the fits it held
+                chunk = [FitRecord(message=f"BrokenProcessPool: {e}")] * len(curves[start:start + chunksize])
+            records[start:start + len(chunk)] = chunk
+    return _report_many(started, records)
+
+# %% ../nbs/01_PDC.ipynb 40
+# Positions in `PARAM_BOUNDS` of the linear frc, ftp and a, and of the nonlinear tte, tau and tau2
+_LINEAR, _NONLINEAR = [0, 1, 5], [2, 3, 4]
+
+def _linear_basis(x, tte, tau, tau2):
+    "Columns of `power_curve` multiplying frc, ftp and a, for fixed tte, tau and tau2"
+    return np.stack([(1.0 - np.exp(-x/tau)) / x, 1 - np.exp(-x/tau2), -np.maximum(0, np.log(x / tte))], axis=-1)
+
+def _solve_linear(B, y):
+    "Least-squares frc, ftp and a for the basis `B` within their bounds, with the mask of those off their bounds"
+    lo, hi = _LOWER[_LINEAR], _UPPER[_LINEAR]
+    c = np.linalg.lstsq(B, y, rcond=None)[0]
+    if ((c >= lo) & (c <= hi)).all(): return c, np.ones(len(c), dtype=bool)
+    from scipy.optimize import lsq_linear
+    bounded = lsq_linear(B, y, bounds=(lo, hi), method='bvls')
+    return bounded.x, bounded.active_mask == 0
+
+def _join(theta, c):
+    "Values of every parameter in `PARAM_BOUNDS` order from the nonlinear `theta` and linear `c`"
+    values = np.empty(len(PARAM_BOUNDS))
+    values[_NONLINEAR], values[_LINEAR] = theta, c
+    return values
+
+# %% ../nbs/01_PDC.ipynb 41
+class _Timeout(Exception): "Raised inside a separable fit once its deadline has passed or its async caller was cancelled"
+
+def _stderr(x, values, chisqr, w):
+    "Standard errors of `values` from the covariance of the full model at the optimum, None where undetermined"
+    J = power_curve_jac(x, *values) * w[:, None]
+    dof = len(x) - len(values)
+    try:
+        cov = np.linalg.inv(J.T @ J) * chisqr / dof if dof > 0 else None
+    except np.linalg.LinAlgError:
+        cov = None
+    return {name: None if cov is None or not cov[i, i] > 0 else float(np.sqrt(cov[i, i]))
+            for i, name in enumerate(PARAM_BOUNDS)}
+
+def _fit_separable(x, y, init, timeout, weights=None):
+    "Variable projection fit of `power_curve`, see `PDC.fit_separable`"
+    from scipy.optimize import least_squares
+    start = _start_stage()
+    x, y = np.asarray(x, dtype=float), np.asarray(y, dtype=float)
+    w = np.ones(len(x)) if weights is None else np.broadcast_to(np.asarray(weights, dtype=float), x.shape)
+    wy = w * y
+    init = _init_values(init, x, y) or {}
+    margin = 1e-3 * (_UPPER - _LOWER)
+    values = np.clip([init.get(name, value) for name, value in zip(PARAM_BOUNDS, _INIT)], _LOWER + margin, _UPPER - margin)
+    stop = _stop_check(timeout)
+    last, iterations = {}, None
+    
+    def solve(theta):
+        # The solver asks for the Jacobian where it last evaluated the residual, so keep that solve
+        key = theta.tobytes()
+        if key not in last:
+            if stop is not None and stop(): raise _Timeout
+            B = _linear_basis(x, *theta) * w[:, None]
+            last.clear()
+            last[key] = (B, *_solve_linear(B, wy))
+        return last[key]
+    
+    def residuals(theta):
+        B, c, _ = solve(theta)
+        return B @ c - wy
+    
+    def jac(theta):
+        B, c, free = solve(theta)
+        J = power_curve_jac(x, *_join(theta, c))[:, _NONLINEAR] * w[:, None]
+        Q = np.linalg.qr(B[:, free])[0]
+        return J - Q @ (Q.T @ J)
+    
+    try:
+        fit = least_squares(residuals, values[_NONLINEAR], jac=jac, bounds=(_LOWER[_NONLINEAR], _UPPER[_NONLINEAR]),
+                            x_scale='jac')
+    except _Timeout:
+        record = FitRecord(message='Fit timed out.')
+    else:
+        iterations = fit.njev
+        B, c, _ = solve(fit.x)
+        values = _join(fit.x, c)
+        chisqr = float(np.sum((B @ c - wy) ** 2))
+        record = FitRecord(dict(zip(PARAM_BOUNDS, values.tolist())), _stderr(x, values, chisqr, w), chisqr, fit.nfev,
+                           bool(fit.status > 0 and np.isfinite(chisqr)), fit.message)
+    _end_stage('pdc.fit_separable', start, points=len(y), nfev=record.nfev,
+               iterations=iterations, success=record.success)
+    return record
+
+# %% ../nbs/01_PDC.ipynb 45
+def _upper_hull(x, y):
+    "Indices of the points on the upper concave hull of `y` against increasing `x`"
+    hull = []
+    for i in range(len(x)):
+        # Pop the last point while it lies on or below the chord from the one before it to point i
+        while len(hull) >= 2 and ((x[hull[-1]] - x[hull[-2]]) * (y[i] - y[hull[-2]])
+                                  >= (y[hull[-1]] - y[hull[-2]]) * (x[i] - x[hull[-2]])):
+            hull.pop()
+        hull.append(i)
+    return np.array(hull, dtype=np.int64)
+
+def thin_curve(x,              # Durations in seconds
+               y,              # Power, NaN where a duration is missing
+               per_decade=20,  # Log-spaced bins per decade of duration
+               hull=False,     # Also drop the bins below the upper concave hull of work against time
+               weights=None):  # Weights of the points, defaults to 1
+    "Thin a curve to at most one weighted mean point per log-spaced bin, as `(x, y, weights)` arrays"
+    x, y = np.asarray(x, dtype=float), np.asarray(y, dtype=float)
+    w2 = np.ones(len(x)) if weights is None else np.broadcast_to(np.asarray(weights, dtype=float), x.shape) ** 2
+    keep = (x > 0) & np.isfinite(y)
+    order = np.argsort(x[keep])
+    x, y, w2 = x[keep][order], y[keep][order], w2[keep][order]
+    if not len(x): return x, y, w2
+    bins = np.floor(np.log10(x / x[0]) * per_decade + 1e-9).astype(np.int64)
+    # Every point counts towards its bin's weight, even the submaximal ones dropped below
+    total = np.bincount(bins, w2)
+    longest = np.maximum.accumulate(y[::-1])[::-1]
+    maximal = y >= np.append(longest[1:], -np.inf)
+    bins, x, y, w2 = bins[maximal], x[maximal], y[maximal], w2[maximal]
+    kept = np.bincount(bins, w2, minlength=len(total))
+    used = np.flatnonzero(kept > 0)
+    tx = np.bincount(bins, w2 * x, len(total))[used] / kept[used]
+    ty = np.bincount(bins, w2 * y, len(total))[used] / kept[used]
+    tw = np.sqrt(total[used])
+    if hull:
+        on_hull = _upper_hull(tx, tx * ty)
+        tx, ty, tw = tx[on_hull], ty[on_hull], tw[on_hull]
+    return tx, ty, tw
+
+# %% ../nbs/01_PDC.ipynb 49
+class BootstrapResult(NamedTuple):
+    "Fit of the full curve, every resample's parameters, chi-square and success, and the percentile intervals"
+    base: FitRecord
+    samples: 'pd.DataFrame'
+    intervals: 'pd.DataFrame'
+
+def _resample_weights(n, size, weights, rng):
+    "Weights of `n` resamples of `size` points drawn with replacement, a point drawn `k` times weighing `√k`"
+    counts = rng.multinomial(size, np.full(size, 1 / size), size=n)
+    W = np.sqrt(counts)
+    return W if weights is None else W * np.asarray(weights, dtype=float)
+
+def _warm_start(values, margin=0.1):
+    "`values` pulled at least `margin` of their range inside `PARAM_BOUNDS`"
+    # Near a bound the sine transform flattens and the solvers crawl, so a start on a bound costs more than a cold one
+    values = np.array([values[name] for name in PARAM_BOUNDS], dtype=float)
+    inset = margin * (_UPPER - _LOWER)
+    return dict(zip(PARAM_BOUNDS, np.clip(values, _LOWER + inset, _UPPER - inset)))
+
+def _bootstrap(pdc, n, level, method, workers, backend, chunksize, seed):
+    "Refit resamples of `pdc`, see `PDC.bootstrap`"
+    import pandas as pd
+    if method not in ('fit', 'separable', 'batch'):
+        raise ValueError(f"Unknown method {method!r}, expected 'fit', 'separable' or 'batch'")
+    start = _start_stage()
+    names = list(PARAM_BOUNDS)
+    x, y = np.asarray(pdc.x, dtype=float), np.asarray(pdc.y, dtype=float)
+    W = _resample_weights(n, len(x), pdc.weights, np.random.default_rng(seed))
+    if method == 'batch':
+        row = fit_batch(x, y, pdc.weights, init='auto').iloc[0]
+        base = FitRecord(dict(row[names].astype(float)), None, float(row['chisqr']), int(row['iterations']) + 1,
+                         bool(row['success']))
+        table = fit_batch(x, np.broadcast_to(y, W.shape), W, init=list(_warm_start(base.best_values).values()))
+        samples = table[names + ['chisqr', 'success']].reset_index(drop=True)
+    else:
+        base = pdc.fit_separable() if method == 'separable' else FitRecord.from_result(pdc.fit())
+        init = _warm_start(base.best_values) if base.success else 'auto'
+        records = fit_many([PDC(x, y, w) for w in W], workers, backend, init=init, chunksize=chunksize,
+                           separable=method == 'separable')
+        samples = pd.DataFrame([r.best_values or {} for r in records], columns=names, dtype=float)
+        samples['chisqr'] = [r.chisqr for r in records]
+        samples['success'] = [r.success for r in records]
+    ok = samples.loc[samples['success'], names]
+    tail = (1 - level) / 2
+    intervals = pd.DataFrame({'value': pd.Series(base.best_values, index=names, dtype=float),
+                              'lower': ok.quantile(tail), 'upper': ok.quantile(1 - tail), 'std': ok.std()})
+    _end_stage('pdc.bootstrap', start, resamples=n, success=int(samples['success'].sum()))
+    return BootstrapResult(base, samples, intervals)
@@ -0,0 +1,223 @@
+"""Memory-mapped columnar store of decoded activities"""
+
+# AUTOGENERATED! DO NOT EDIT! File to edit: ../nbs/05_STORE.ipynb.
+
+# %% auto 0
+__all__ = ['STORE_VERSION', 'StoredActivity', 'ActivityStore']
+
+# %% ../nbs/05_STORE.ipynb 3
+import json
+import os
+import tempfile
+from contextlib import contextmanager
+import numpy as np
+from pathlib import Path
+from typing import TYPE_CHECKING, Iterator, List, NamedTuple, Optional, Tuple, Union
+
+if TYPE_CHECKING:
+    import pandas as pd
+
+from .cache import file_digest
+from .fit import FitLoader, _as_loader, _max_pause, resample_power
+from .mmp import mmp_curve
+
+# %% ../nbs/05_STORE.ipynb 5
+STORE_VERSION = 1
+_DATA, _INDEX = 'activities.bin', 'index.json'
+
+# %% ../nbs/05_STORE.ipynb 6
+class StoredActivity(NamedTuple):
+    """Decoded columns of one activity, as views into the store's memory map"""
+    timestamp: np.ndarray
+    power: np.ndarray
+    start: Optional[int]
+    
+    @property
+    def elapsed_time(self) -> np.ndarray:
+        """Seconds since the first record, NaN where the timestamp is missing"""
+        ts = self.timestamp.astype(np.int64)
+        elapsed = (ts - (self.start or 0)).astype(np.float64)
+        elapsed[np.isnat(self.timestamp)] = np.nan
+        return elapsed
+    
+    def to_frame(self) -> 'pd.DataFrame':
+        """DataFrame with the columns of `FitLoader.extract_power_data`"""
+        import pandas as pd
+        return pd.DataFrame({'timestamp': pd.Series(self.timestamp.astype('datetime64[us]')).dt.tz_localize('UTC'),
+                             'power': self.power.astype(np.int64),
+                             'elapsed_time': self.elapsed_time})
+
+# %% ../nbs/05_STORE.ipynb 7
+class ActivityStore:
+    """Append-only file of decoded activities, read back zero-copy through a memory map"""
+    
+    def __init__(self, directory: Union[str, Path]):
+        """Open the store in `directory`, created if needed"""
+        self.directory = Path(directory).expanduser()
+        self.directory.mkdir(parents=True, exist_ok=True)
+        self._data_path = self.directory / _DATA
+        self._index_path = self.directory / _INDEX
+        self._index, self._sources = self._read_index()
+        self._map = None
+        self._batches = 0  # open `batch` blocks, the index is written when the last one closes
+        self._dirty = False
+    
+    def _read_index(self) -> Tuple[dict, dict]:
+        try:
+            index = json.loads(self._index_path.read_text())
+        except FileNotFoundError:
+            return {}, {}
+        if index.get('version') != STORE_VERSION:
+            raise ValueError(f"Unsupported activity store version {index.get('version')}")
+        return index['activities'], index.get('sources', {})
+    
+    def _save_index(self):
+        if self._batches:
+            self._dirty = True
+        else:
+            self._write_index()
+    
+    def _write_index(self):
+        # Write then rename so readers never see a partial index
+        fd, tmp = tempfile.mkstemp(suffix='.tmp', dir=self.directory)
+        with os.fdopen(fd, 'w') as f:
+            json.dump({'version': STORE_VERSION, 'activities': self._index, 'sources': self._sources}, f)
+        os.replace(tmp, self._index_path)
+    
+    def __len__(self) -> int:
+        return len(self._index)
+    
+    def __contains__(self, activity_id: str) -> bool:
+        return activity_id in self._index
+    
+    def __iter__(self) -> Iterator[str]:
+        return iter(list(self._index))
+    
+    @contextmanager
+    def batch(self):
+        """Write the index once for all the activities added inside the block
+        
+        The index is written when the block exits, even on error, so the activities added
+        before it are kept.
+        """
+        self._batches += 1
+        try:
+            yield self
+        finally:
+            self._batches -= 1
+            if not self._batches and self._dirty:
+                self._dirty = False
+                self._write_index()
+    
+    def add(self, activity_id: str, timestamp: np.ndarray, power: np.ndarray, start: Optional[int] = None):
+        """Append the columns of an activity, replacing any stored under the same ID
+        
+        Args:
+            activity_id: Name of the activity in the store
+            timestamp: Record timestamps, converted to `datetime64[s]`
+            power: Power of each record in watts, from 0 to 65534
+            start: Unix time elapsed times are measured from, defaults to the first timestamp
+        """
+        timestamp = np.asarray(timestamp, dtype='datetime64[s]')
+        power = np.asarray(power)
+        if len(timestamp) != len(power):
+            raise ValueError("timestamp and power must have the same length")
+        if start is None and (~np.isnat(timestamp)).any():
+            start = int(timestamp[~np.isnat(timestamp)][0].astype(np.int64))
+        payload = timestamp.astype('<i8').tobytes() + power.astype('<u2').tobytes()
+        payload += b'\0' * (-len(payload) % 8)
+        with open(self._data_path, 'ab') as f:
+            offset = f.tell()
+            f.write(payload)
+        self._index[activity_id] = [offset, len(power), start]
+        self._sources.pop(activity_id, None)
+        self._save_index()
+    
+    def add_fit(self, filepath: Union[str, Path, FitLoader], activity_id: Optional[str] = None,
+                overwrite: bool = False) -> str:
+        """Decode a FIT file into the store, unless it is already there under its ID
+        
+        Args:
+            filepath: Path to the FIT file, or a FitLoader whose decoded records are reused
+            activity_id: Name of the activity in the store, defaults to the file name without extension
+            overwrite: Decode and store the file again even if the ID is present
+        
+        Returns:
+            The activity ID
+        
+        Raises:
+            ValueError: If the ID holds an activity decoded from a different file, e.g. another
+                directory's file of the same name, and `overwrite` is False
+        """
+        loader = _as_loader(filepath)
+        activity_id = activity_id or loader.filepath.stem
+        source = file_digest(loader.filepath).hex()
+        if activity_id in self._index and not overwrite:
+            if self._sources.get(activity_id, source) != source:
+                raise ValueError(f"Activity {activity_id!r} is stored from a different file than {loader.filepath}, "
+                                 "pass another activity_id or overwrite=True")
+            return activity_id
+        df = loader._power_frame()
+        timestamp = df['timestamp'].to_numpy(dtype='datetime64[s]')
+        elapsed = df['elapsed_time'].to_numpy()
+        valid = ~np.isnan(elapsed)
+        start = int(timestamp[valid][0].astype(np.int64) - elapsed[valid][0]) if valid.any() else None
+        with self.batch():
+            self.add(activity_id, timestamp, df['power'].to_numpy(), start)
+            self._sources[activity_id] = source
+        return activity_id
+    
+    def _memory_map(self) -> np.ndarray:
+        """Memory map of the data file, mapped again once the file has grown"""
+        size = self._data_path.stat().st_size if self._data_path.exists() else 0
+        if self._map is None or len(self._map) != size:
+            self._map = np.memmap(self._data_path, dtype=np.uint8, mode='r') if size else np.zeros(0, np.uint8)
+        return self._map
+    
+    def get(self, activity_id: str) -> StoredActivity:
+        """Columns of an activity as read-only views into the memory map
+        
+        Raises:
+            KeyError: If the activity is not in the store
+        """
+        offset, n, start = self._index[activity_id]
+        data = self._memory_map()
+        timestamp = data[offset:offset + 8 * n].view('<i8').view('datetime64[s]')
+        power = data[offset + 8 * n:offset + 10 * n].view('<u2')
+        return StoredActivity(timestamp, power, start)
+    
+    def mmp_curve(self, activity_id: str, durations: Optional[List[int]] = None, gaps: str = 'zero',
+                  max_gap: float = 5.0) -> Tuple[np.ndarray, np.ndarray]:
+        """MMP curve of a stored activity, resampled as in `FitLoader.compute_mmp_curve`
+        
+        Args:
+            activity_id: Name of the activity in the store
+            durations: List of durations in seconds to compute MMP for
+            gaps: 'zero' to count pauses as zero power, 'break' so that no window spans them
+            max_gap: Longest gap in seconds bridged by holding the previous sample
+        
+        Returns:
+            Tuple of (durations, mmp_values) as numpy arrays
+        """
+        activity = self.get(activity_id)
+        return mmp_curve(resample_power(activity.elapsed_time, activity.power, 1.0, gaps, max_gap,
+                                        _max_pause(durations)), durations)
+    
+    def size(self) -> int:
+        """Size in bytes of the data file"""
+        return self._data_path.stat().st_size if self._data_path.exists() else 0
+    
+    def compact(self):
+        """Rewrite the data file without the bytes of replaced activities"""
+        fd, tmp = tempfile.mkstemp(suffix='.tmp', dir=self.directory)
+        index, offset = {}, 0
+        with os.fdopen(fd, 'wb') as f:
+            for activity_id, (start_offset, n, start) in self._index.items():
+                size = 10 * n + (-10 * n % 8)
+                f.write(self._memory_map()[start_offset:start_offset + size].tobytes())
+                index[activity_id] = [offset, n, start]
+                offset += size
+        self._map = None  # release the old mapping before replacing the file
+        os.replace(tmp, self._data_path)
+        self._index = index
+        self._write_index()  # never deferred, the old offsets are gone
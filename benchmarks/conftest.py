@@ -0,0 +1,46 @@
+"""Fixtures and measurement helpers for the benchmark suite"""
+
+import resource
+import sys
+import tracemalloc
+import pytest
+from benchmarks.synthetic import SIZES, power_stream
+from tests.fitgen import write_fit_file
+
+
+@pytest.fixture(scope='session', params=list(SIZES))
+def fit_file(request, tmp_path_factory):
+    """Synthetic FIT file of each benchmarked length, written once per session"""
+    seconds = SIZES[request.param]
+    path = tmp_path_factory.mktemp('fit') / f'ride_{request.param}.fit'
+    return write_fit_file(path, power_stream(seconds).tolist()), seconds
+
+
+@pytest.fixture
+def measure(benchmark):
+    """Benchmark a call and record its throughput and memory high-water marks
+
+    The returned function times `func(*args)` with pytest-benchmark, then runs it once more
+    under tracemalloc. Besides the timings, the report's extra info holds `items_per_s`,
+    the peak memory traced during one call and the process peak RSS afterwards. Under
+    `--benchmark-disable` the call runs once and nothing is recorded.
+    """
+    def run(func, *args, items=1, rounds=None):
+        if rounds is None:
+            result = benchmark(func, *args)
+        else:
+            result = benchmark.pedantic(func, args, rounds=rounds, iterations=1)
+        if benchmark.disabled:
+            return result
+        tracemalloc.start()
+        try:
+            func(*args)
+            _, peak = tracemalloc.get_traced_memory()
+        finally:
+            tracemalloc.stop()
+        # ru_maxrss is in kilobytes on Linux and bytes on macOS
+        rss = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss * (1 if sys.platform == 'darwin' else 1024)
+        benchmark.extra_info.update(items=items, items_per_s=items / benchmark.stats.stats.median,
+                                    peak_traced_mb=peak / 2**20, peak_rss_mb=rss / 2**20)
+        return result
+    return run
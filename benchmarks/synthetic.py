@@ -0,0 +1,43 @@
+"""Synthetic activities and MMP curves for the benchmarks"""
+
+import numpy as np
+from PDC_Utils.pdc import power_curve
+
+# Activity lengths in seconds benchmarked for decoding and MMP
+SIZES = {'1h': 3600, '6h': 6 * 3600, '24h': 24 * 3600}
+
+# Parameters of the curves the fit benchmarks start from
+_PARAMS = {'frc': 20000, 'ftp': 280, 'tte': 2400, 'tau': 15, 'tau2': 20, 'a': 30}
+
+
+def power_stream(seconds, seed=0):
+    """1 Hz ride of `seconds` samples: noisy intervals around a base power with coasting stops
+
+    Args:
+        seconds: Number of samples
+        seed: Seed of the random generator, the same seed gives the same ride
+
+    Returns:
+        int64 array of power in watts
+    """
+    rng = np.random.default_rng(seed)
+    efforts = np.repeat(rng.choice([150, 220, 300, 450, 0], size=seconds // 60 + 1, p=[.3, .35, .2, .05, .1]), 60)
+    return np.clip(efforts[:seconds] + rng.normal(0, 25, seconds), 0, 2000).astype(np.int64)
+
+
+def mmp_curves(n, seed=0, durations=None):
+    """`n` noisy MMP curves around randomly scaled power_curve parameters
+
+    Args:
+        n: Number of curves
+        seed: Seed of the random generator
+        durations: Durations in seconds of every curve, defaults to 1 s to 2 h on a log grid
+
+    Returns:
+        Tuple of (durations, curves) with curves of shape (n, len(durations))
+    """
+    rng = np.random.default_rng(seed)
+    x = np.unique(np.geomspace(1, 7200, 60).astype(int)) if durations is None else np.asarray(durations)
+    scale = rng.uniform(0.8, 1.2, size=(n, 1))
+    Y = power_curve(x, **{k: v * (scale if k in ('frc', 'ftp') else 1) for k, v in _PARAMS.items()})
+    return x, Y * rng.normal(1, 0.01, size=Y.shape)
@@ -0,0 +1,60 @@
+"""Benchmarks of FIT decoding and MMP computation"""
+
+import numpy as np
+import pytest
+from PDC_Utils.fit import FitLoader, resample_power
+from PDC_Utils.mmp import MMPStream, mmp_curve, mmp_curve_full, summarize_power
+from benchmarks.synthetic import SIZES, power_stream
+
+
+def _decode(path):
+    return FitLoader(path).extract_power_data()
+
+
+def _loader_mmp(path):
+    return FitLoader(path).compute_mmp_curve()
+
+
+class TestDecodeBenchmarks:
+    """Decode synthetic FIT files of each length, throughput in records per second"""
+    
+    def test_extract_power_data(self, measure, fit_file):
+        """Benchmark decoding the power records of a FIT file"""
+        path, seconds = fit_file
+        df = measure(_decode, path, items=seconds)
+        assert len(df) == seconds
+    
+    def test_compute_mmp_curve(self, measure, fit_file):
+        """Benchmark decoding, resampling and the default MMP curve end to end"""
+        path, seconds = fit_file
+        measure(_loader_mmp, path, items=seconds)
+
+
+@pytest.mark.parametrize('size', list(SIZES))
+class TestMMPBenchmarks:
+    """Compute MMP curves of synthetic power streams, throughput in samples per second"""
+    
+    def test_mmp_curve(self, measure, size):
+        """Benchmark the MMP curve at the default durations"""
+        power = power_stream(SIZES[size])
+        measure(mmp_curve, power, items=len(power))
+    
+    def test_mmp_curve_full(self, measure, size):
+        """Benchmark the MMP curve at every duration"""
+        power = power_stream(SIZES[size])
+        measure(mmp_curve_full, power, items=len(power), rounds=3 if size == '24h' else None)
+    
+    def test_mmp_stream(self, measure, size):
+        """Benchmark pushing a whole ride into an MMPStream"""
+        power = power_stream(SIZES[size])
+        measure(lambda p: MMPStream().push(p), power, items=len(power))
+    
+    def test_resample_power(self, measure, size):
+        """Benchmark resampling to 1 Hz"""
+        power = power_stream(SIZES[size])
+        measure(resample_power, np.arange(len(power), dtype=float), power, items=len(power))
+    
+    def test_summarize_power(self, measure, size):
+        """Benchmark the activity summary, sharing its cumulative sum with the default MMP curve"""
+        power = power_stream(SIZES[size])
+        measure(summarize_power, power, 250, items=len(power))
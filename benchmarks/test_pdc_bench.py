@@ -0,0 +1,59 @@
+"""Benchmarks of power duration curve fitting"""
+
+import pytest
+from PDC_Utils.mmp import mmp_curve_full
+from PDC_Utils.pdc import PDC, fit_batch, fit_many
+from benchmarks.synthetic import SIZES, mmp_curves, power_stream
+
+
+def _fit_loop(x, Y):
+    return [PDC(x, y).fit() for y in Y]
+
+
+@pytest.mark.parametrize('n', [1, 100])
+def test_pdc_fit_loop(measure, n):
+    """Benchmark fitting curves one at a time with PDC.fit, throughput in curves per second"""
+    x, Y = mmp_curves(n)
+    measure(_fit_loop, x, Y, items=n, rounds=1 if n > 1 else None)
+
+
+def _separable_loop(x, Y):
+    return [PDC(x, y).fit_separable() for y in Y]
+
+
+@pytest.mark.parametrize('n', [1, 100])
+def test_pdc_fit_separable_loop(measure, n):
+    """Benchmark fitting curves one at a time by variable projection, throughput in curves per second"""
+    x, Y = mmp_curves(n)
+    records = measure(_separable_loop, x, Y, items=n, rounds=1 if n > 1 else None)
+    assert sum(r.success for r in records) > 0.9 * n
+
+
+@pytest.mark.parametrize('size', ['1h', '6h'])
+def test_thinned_dense_fit(measure, size):
+    """Benchmark thinning and fitting the per-second MMP of a ride, throughput in curve points per second"""
+    x, y = mmp_curve_full(power_stream(SIZES[size]))
+    record = measure(lambda: PDC(x, y).thin().fit_separable(), items=len(x))
+    assert record.success
+
+
+@pytest.mark.parametrize('n', [1, 100, 10_000])
+def test_fit_batch(measure, n):
+    """Benchmark the vectorised fit_batch, throughput in curves per second"""
+    x, Y = mmp_curves(n)
+    result = measure(fit_batch, x, Y, items=n, rounds=1 if n > 100 else None)
+    assert result['success'].mean() > 0.9
+
+
+def test_fit_many_threads(measure):
+    """Benchmark fit_many over 100 curves on a thread pool, throughput in curves per second"""
+    x, Y = mmp_curves(100)
+    measure(lambda: fit_many([PDC(x, y) for y in Y], backend='thread'), items=100, rounds=1)
+
+
+@pytest.mark.parametrize('method', ['batch', 'separable'])
+def test_bootstrap(measure, method):
+    """Benchmark 1000 bootstrap refits of one curve, throughput in resamples per second"""
+    x, Y = mmp_curves(1)
+    boot = measure(lambda: PDC(x, Y[0]).bootstrap(1000, method=method, seed=0), items=1000, rounds=1)
+    assert boot.samples['success'].mean() > 0.9
@@ -3,6 +3,13 @@
 import pytest
 import numpy as np
 import pandas as pd
+from tests.fitgen import write_fit_file
+
+
+def pytest_ignore_collect(collection_path, config):
+    """Leave the benchmarks out of the test run unless they are asked for explicitly"""
+    if collection_path.name == 'benchmarks' and not any('benchmarks' in arg for arg in config.args):
+        return True
 
 
 @pytest.fixture
@@ -30,4 +37,15 @@ def power_curve_params():
         'tau': 15,
         'tau2': 5000,
         'a': 10
-    }
\ No newline at end of file
+    }
+
+
+@pytest.fixture
+def fit_file_factory(tmp_path):
+    """Fixture writing synthetic activity FIT files into a temporary directory"""
+    counter = iter(range(1_000_000))
+    
+    def make(power, path=None, **kwargs):
+        path = path or tmp_path / f"activity_{next(counter)}.fit"
+        return write_fit_file(path, power, **kwargs)
+    return make
@@ -0,0 +1,77 @@
+"""Synthetic FIT file writer used by the FIT decoding tests"""
+
+import struct
+from fitdecode.utils import compute_crc
+
+# Seconds between the Unix epoch and the FIT epoch (1989-12-31 00:00:00 UTC)
+FIT_EPOCH = 631065600
+
+# (field number, size, base type, struct code, invalid value) for the record fields we can emit
+RECORD_FIELDS = {
+    'timestamp': (253, 4, 0x86, 'I', 0xFFFFFFFF),
+    'heart_rate': (3, 1, 0x02, 'B', 0xFF),
+    'cadence': (4, 1, 0x02, 'B', 0xFF),
+    'power': (7, 2, 0x84, 'H', 0xFFFF),
+}
+
+
+def _definition(local_num, global_num, fields, endian='<', dev_fields=()):
+    """Definition message for `fields`, a list of (number, size, base type)"""
+    header = 0x40 | local_num | (0x20 if dev_fields else 0)
+    body = struct.pack(f'{endian}BBHB', 0, endian == '>', global_num, len(fields))
+    body += b''.join(struct.pack('BBB', *f[:3]) for f in fields)
+    if dev_fields:
+        body += struct.pack('B', len(dev_fields)) + b''.join(struct.pack('BBB', *f) for f in dev_fields)
+    return struct.pack('B', header) + body
+
+
+def _data(header, fields, values, endian='<', dev_bytes=b''):
+    """Data message packing `values` with the codes of `fields`"""
+    body = b''.join(struct.pack(endian + f[3], f[4] if v is None else v) for f, v in zip(fields, values))
+    return struct.pack('B', header) + body + dev_bytes
+
+
+def write_fit_file(path, power, timestamps=None, start=1_000_000_000, compressed=False,
+                   endian='<', dev_fields=False, **channels):
+    """Write an activity FIT file with one `record` message per power sample
+
+    Args:
+        path: Destination of the FIT file
+        power: Power samples in watts, None for a record without power
+        timestamps: Offsets in seconds from `start`, defaults to one sample per second
+        start: Unix time of the first sample
+        compressed: Use compressed timestamp headers whenever the gap allows it
+        endian: Byte order of the messages, '<' or '>'
+        dev_fields: Add a 2-byte developer field to every record
+        channels: Extra record channels (heart_rate, cadence) with one value per sample
+
+    Returns:
+        The path that was written
+    """
+    if timestamps is None:
+        timestamps = range(len(power))
+    timestamps = [start - FIT_EPOCH + t for t in timestamps]
+    fields = [RECORD_FIELDS[n] for n in ['power'] + list(channels)]
+    full = [RECORD_FIELDS['timestamp']] + fields
+    dev = [(0, 2, 0)] if dev_fields else []
+    dev_bytes = b'\x00\x00' if dev_fields else b''
+
+    data = _definition(0, 0, [(0, 1, 0x00)]) + struct.pack('<BB', 0, 4)  # file_id, type=activity
+    data += _definition(1, 20, full, endian, dev)
+    if compressed:
+        data += _definition(2, 20, fields, endian, dev)
+    columns = [list(power)] + [list(v) for v in channels.values()]
+    last = None
+    for ts, values in zip(timestamps, zip(*columns)):
+        if compressed and last is not None and 0 <= ts - last < 32:
+            data += _data(0x80 | (2 << 5) | (ts & 0x1F), fields, values, endian, dev_bytes)
+        else:
+            data += _data(1, full, (ts,) + values, endian, dev_bytes)
+        last = ts
+
+    header = struct.pack('<BBHI4s', 14, 0x20, 2132, len(data), b'.FIT')
+    header += struct.pack('<H', compute_crc(header))
+    content = header + data
+    with open(path, 'wb') as f:
+        f.write(content + struct.pack('<H', compute_crc(content)))
+    return path
@@ -0,0 +1,188 @@
+"""Tests for the async API and its shared executor"""
+
+import asyncio
+import threading
+import time
+import pytest
+import numpy as np
+from PDC_Utils.aio import ExecutorBusy, _shared, _stop_check, configure_executor, run_blocking, shutdown_executor
+from PDC_Utils.fit import mmp_from_fit, mmp_from_fit_async, pdc_from_fit_async
+from PDC_Utils.instrument import EventLog, stage_hook
+from PDC_Utils.pdc import PDC
+
+
+def _wait_for_cancel(started, limit=5.0):
+    """Block until the async caller is cancelled, returning whether it was"""
+    stop = _stop_check(limit)
+    started.set()
+    while not stop():
+        time.sleep(0.005)
+    return _stop_check(None)()
+
+
+class TestRunBlocking:
+    """Test offloading blocking calls to the shared executor"""
+
+    def teardown_method(self):
+        """Drop the executor configured by the test"""
+        shutdown_executor()
+
+    def test_result_and_loop_stays_responsive(self):
+        """Test that the call runs on a worker thread while the loop keeps serving other tasks"""
+        async def main():
+            ticks = []
+            async def ticker():
+                for _ in range(5):
+                    ticks.append(time.monotonic())
+                    await asyncio.sleep(0.01)
+            result, _ = await asyncio.gather(run_blocking(lambda: (time.sleep(0.1), threading.get_ident())[1]), ticker())
+            return result, ticks
+
+        thread, ticks = asyncio.run(main())
+
+        assert thread != threading.get_ident()
+        assert len(ticks) == 5 and ticks[-1] - ticks[0] < 0.09
+
+    def test_concurrency_bound_and_order(self):
+        """Test that no more than max_workers calls run at once and waiting calls start in arrival order"""
+        lock, running, peak, order = threading.Lock(), [0], [0], []
+
+        def work(i):
+            with lock:
+                running[0] += 1
+                peak[0] = max(peak[0], running[0])
+                order.append(i)
+            time.sleep(0.02)
+            with lock:
+                running[0] -= 1
+            return i
+
+        async def main():
+            configure_executor(max_workers=2)
+            return await asyncio.gather(*(run_blocking(work, i) for i in range(8)))
+
+        assert asyncio.run(main()) == list(range(8))
+        assert peak[0] == 2
+        assert order[2:] == list(range(2, 8))
+        assert _shared()[1].running == 0
+
+    def test_max_pending(self):
+        """Test that calls beyond the queue bound are rejected and the rest still run"""
+        async def main():
+            configure_executor(max_workers=1, max_pending=2)
+            calls = [asyncio.ensure_future(run_blocking(time.sleep, 0.02)) for _ in range(4)]
+            return await asyncio.gather(*calls, return_exceptions=True)
+
+        outcomes = asyncio.run(main())
+
+        assert outcomes[:3] == [None] * 3
+        assert isinstance(outcomes[3], ExecutorBusy)
+
+    def test_cancel_waiting_call(self):
+        """Test that a call cancelled while queued never runs and gives up its place"""
+        ran = []
+
+        async def main():
+            configure_executor(max_workers=1)
+            first = asyncio.ensure_future(run_blocking(time.sleep, 0.05))
+            queued = asyncio.ensure_future(run_blocking(ran.append, 'queued'))
+            await asyncio.sleep(0.01)
+            queued.cancel()
+            await first
+            await run_blocking(ran.append, 'after')
+            return queued.cancelled()
+
+        assert asyncio.run(main())
+        assert ran == ['after']
+        assert _shared()[1].running == 0 and _shared()[1].pending == 0
+
+    def test_cancel_running_call(self):
+        """Test that a running call sees the cancellation and its slot is freed once it returns"""
+        started = threading.Event()
+
+        async def main():
+            configure_executor(max_workers=1)
+            task = asyncio.ensure_future(run_blocking(_wait_for_cancel, started))
+            while not started.is_set():
+                await asyncio.sleep(0.005)
+            start = time.monotonic()
+            task.cancel()
+            with pytest.raises(asyncio.CancelledError):
+                await task
+            await run_blocking(lambda: None)
+            return time.monotonic() - start
+
+        assert asyncio.run(main()) < 1
+        assert _shared()[1].running == 0
+
+    def test_invalid_configuration(self):
+        """Test that unknown backends and empty pools are rejected"""
+        with pytest.raises(ValueError):
+            configure_executor(backend='cluster')
+        with pytest.raises(ValueError):
+            configure_executor(max_workers=0)
+
+    def test_process_backend(self):
+        """Test that picklable calls run on a process pool"""
+        async def main():
+            configure_executor(max_workers=1, backend='process')
+            return await run_blocking(sum, [1, 2, 3], start=4)
+
+        assert asyncio.run(main()) == 10
+
+
+class TestAsyncAPI:
+    """Test the async counterparts of loading and fitting"""
+
+    def teardown_method(self):
+        """Drop the shared executor"""
+        shutdown_executor()
+
+    def test_mmp_from_fit_async(self, fit_file_factory):
+        """Test that the async MMP matches the blocking one"""
+        path = fit_file_factory([200, 300, 400, 300, 200] * 60)
+
+        mmp = asyncio.run(mmp_from_fit_async(path, [1, 5, 60]))
+
+        expected = mmp_from_fit(path, [1, 5, 60])
+        assert mmp == expected
+
+    def test_fits(self, fit_file_factory):
+        """Test that async fits match the blocking ones and report to the caller's hooks"""
+        path = fit_file_factory(list(np.linspace(800, 200, 1800).astype(int)))
+
+        async def main():
+            pdc = await pdc_from_fit_async(path)
+            with stage_hook(EventLog()) as log:
+                result = await pdc.fit_async(init='auto')
+                record = await pdc.fit_separable_async()
+            return pdc, result, record, log
+
+        pdc, result, record, log = asyncio.run(main())
+
+        assert result.chisqr == pytest.approx(pdc.fit(init='auto').chisqr)
+        assert record.chisqr == pytest.approx(pdc.fit_separable().chisqr)
+        assert len(log.stage('pdc.fit')) == 1 and len(log.stage('pdc.fit_separable')) == 1
+
+    def test_cancelled_fit_stops(self, sample_power_data):
+        """Test that a fit whose caller is cancelled stops at its next iteration"""
+        x, y = sample_power_data
+        started, stopped = threading.Event(), []
+
+        def fit():
+            started.set()
+            result = PDC(x, y).fit()
+            stopped.append(result.aborted)
+
+        async def main():
+            configure_executor(max_workers=1)
+            task = asyncio.ensure_future(run_blocking(fit))
+            while not started.is_set():
+                await asyncio.sleep(0)
+            task.cancel()
+            with pytest.raises(asyncio.CancelledError):
+                await task
+            await run_blocking(lambda: None)
+
+        asyncio.run(main())
+        assert stopped == [True]
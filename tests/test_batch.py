@@ -0,0 +1,106 @@
+"""Tests for parallel batch loading of FIT files"""
+
+import time
+import pytest
+import numpy as np
+from concurrent.futures import ProcessPoolExecutor
+from pathlib import Path
+from unittest.mock import patch
+from PDC_Utils.batch import BatchResult, find_fit_files, iter_mmp_batch, mmp_batch
+from PDC_Utils.fit import mmp_from_fit
+from PDC_Utils.mmp import MMP
+
+
+@pytest.fixture
+def archive(tmp_path, fit_file_factory):
+    """Fixture providing a directory of FIT files, one of them corrupt"""
+    rng = np.random.default_rng(0)
+    (tmp_path / 'nested').mkdir()
+    paths = [fit_file_factory(rng.integers(100, 400, 120).tolist(), path=tmp_path / f'ride_{i}.fit')
+             for i in range(4)]
+    paths.append(fit_file_factory([200, 250, 300], path=tmp_path / 'nested' / 'RIDE_UPPER.FIT'))
+    bad = tmp_path / 'broken.fit'
+    bad.write_bytes(b'not a fit file')
+    (tmp_path / 'notes.txt').write_text('ignored')
+    return tmp_path, paths, bad
+
+
+class TestFindFitFiles:
+    """Test the batch source resolution"""
+    
+    def test_directory(self, archive):
+        """Test that directories are searched recursively and case-insensitively"""
+        root, paths, bad = archive
+        
+        found = find_fit_files(root)
+        
+        assert found == sorted(paths + [bad])
+    
+    def test_glob(self, archive):
+        """Test glob patterns"""
+        root, paths, bad = archive
+        
+        assert find_fit_files(str(root / 'ride_*.fit')) == sorted(paths[:4])
+    
+    def test_iterable(self, archive):
+        """Test explicit lists of paths"""
+        root, paths, bad = archive
+        
+        assert find_fit_files([str(p) for p in paths[:2]]) == paths[:2]
+
+
+class TestMMPBatch:
+    """Test the parallel MMP computation"""
+    
+    @pytest.mark.parametrize("workers", [1, 2])
+    def test_iter_mmp_batch(self, archive, workers):
+        """Test that every file yields a result and errors do not abort the batch"""
+        root, paths, bad = archive
+        
+        results = list(iter_mmp_batch(root, [1, 5, 60], workers=workers, chunksize=2))
+        
+        assert all(isinstance(r, BatchResult) for r in results)
+        by_path = {r.path: r for r in results}
+        assert set(by_path) == set(paths + [bad])
+        assert not by_path[bad].ok
+        assert 'not a FIT file' in by_path[bad].error
+        for path in paths:
+            expected = mmp_from_fit(path, [1, 5, 60])
+            assert by_path[path].ok
+            assert np.array_equal(by_path[path].durations, expected.x)
+            # MMP objects keep their powers as float32
+            assert np.array_equal(by_path[path].mmp.astype(np.float32), expected.y)
+    
+    def test_stop_early(self, tmp_path, fit_file_factory):
+        """Test that breaking out of the iterator returns without processing the rest of the archive"""
+        power = np.random.default_rng(0).integers(100, 400, 3600).tolist()
+        for i in range(40):
+            fit_file_factory(power, path=tmp_path / f'ride_{i}.fit')
+        
+        with patch.object(ProcessPoolExecutor, 'submit', autospec=True,
+                          side_effect=ProcessPoolExecutor.submit) as submit:
+            start = time.monotonic()
+            for result in iter_mmp_batch(tmp_path, workers=2, chunksize=1):
+                break
+            elapsed = time.monotonic() - start
+        
+        assert result.ok
+        assert submit.call_count == 4
+        assert elapsed < 10
+    
+    def test_mmp_batch(self, archive, tmp_path):
+        """Test collecting MMP objects and errors, with a shared cache"""
+        root, paths, bad = archive
+        
+        curves, errors = mmp_batch(paths + [bad], workers=2, cache=tmp_path / 'cache')
+        cached, _ = mmp_batch(paths, workers=1, cache=tmp_path / 'cache')
+        
+        assert set(curves) == set(paths)
+        assert list(errors) == [bad]
+        assert all(isinstance(c, MMP) for c in curves.values())
+        for path in paths:
+            assert np.array_equal(curves[path].y, cached[path].y)
+    
+    def test_empty_source(self, tmp_path):
+        """Test a source without FIT files"""
+        assert list(iter_mmp_batch(tmp_path)) == []
@@ -0,0 +1,150 @@
+"""Tests for the on-disk MMP cache"""
+
+import os
+import pytest
+import numpy as np
+from concurrent.futures import ThreadPoolExecutor
+from unittest.mock import patch
+from PDC_Utils.cache import MMPCache, file_digest
+from PDC_Utils.fit import FitLoader, mmp_from_fit, pdc_from_fit
+
+
+class TestMMPCache:
+    """Test the MMPCache class"""
+    
+    def test_put_get_roundtrip(self, tmp_path):
+        """Test that a stored curve is returned unchanged"""
+        cache = MMPCache(tmp_path)
+        cache.put('abc', np.array([1, 5, 60]), np.array([812.5, 600.25, 350.125]))
+        
+        durations, mmp = cache.get('abc')
+        
+        assert np.array_equal(durations, [1, 5, 60])
+        assert np.array_equal(mmp, [812.5, 600.25, 350.125])
+    
+    def test_get_missing_key(self, tmp_path):
+        """Test that a miss returns None"""
+        assert MMPCache(tmp_path).get('missing') is None
+    
+    def test_corrupt_entry_is_dropped(self, tmp_path):
+        """Test that a truncated entry is treated as a miss and removed"""
+        cache = MMPCache(tmp_path)
+        cache.put('abc', np.array([1, 5]), np.array([800., 600.]))
+        path = tmp_path / 'abc.mmp'
+        path.write_bytes(path.read_bytes()[:-3])
+        
+        assert cache.get('abc') is None
+        assert not path.exists()
+    
+    def test_key_depends_on_contents_and_params(self, tmp_path):
+        """Test that keys change with file contents and computation parameters"""
+        cache = MMPCache(tmp_path / 'cache')
+        a, b = tmp_path / 'a.fit', tmp_path / 'b.fit'
+        a.write_bytes(b'one')
+        b.write_bytes(b'one')
+        
+        assert cache.key(a) == cache.key(b)
+        assert cache.key(a, durations=[1, 5]) == cache.key(b, durations=np.array([1, 5]))
+        assert cache.key(a, durations=[1, 5]) != cache.key(a, durations=[1, 6])
+        assert cache.key(a, durations=None) != cache.key(a, durations=[1, 5])
+        
+        b.write_bytes(b'two')
+        assert cache.key(a) != cache.key(b)
+        assert file_digest(a) != file_digest(b)
+    
+    def test_lru_eviction(self, tmp_path):
+        """Test that the least recently used entries are evicted beyond the size cap"""
+        entry_size = 8 + 12 * 10
+        cache = MMPCache(tmp_path, max_bytes=3 * entry_size)
+        x, y = np.arange(1, 11), np.linspace(500, 300, 10)
+        for i, key in enumerate(['a', 'b', 'c']):
+            cache.put(key, x, y)
+            os.utime(tmp_path / f'{key}.mmp', ns=(i * 10**9, i * 10**9))
+        
+        assert cache.get('a') is not None  # 'a' becomes the most recently used
+        cache.put('d', x, y)
+        
+        assert cache.get('b') is None
+        assert cache.get('a') is not None
+        assert cache.get('d') is not None
+        assert cache.size() <= 3 * entry_size
+    
+    def test_get_or_compute(self, tmp_path):
+        """Test that the computation only runs on a miss"""
+        cache = MMPCache(tmp_path)
+        calls = []
+        
+        def compute():
+            calls.append(1)
+            return np.array([1, 2]), np.array([400., 300.])
+        
+        first = cache.get_or_compute('k', compute)
+        second = cache.get_or_compute('k', compute)
+        
+        assert len(calls) == 1
+        assert np.array_equal(first[1], second[1])
+    
+    def test_concurrent_puts(self, tmp_path):
+        """Test that threads writing the same key do not trip over each other's temporary files"""
+        cache = MMPCache(tmp_path)
+        durations = np.arange(1, 3601)
+        
+        def put(i):
+            for _ in range(20):
+                cache.put('k', durations, np.full(3600, float(i)))
+        
+        with ThreadPoolExecutor(4) as executor:
+            list(executor.map(put, range(4)))
+        
+        _, mmp = cache.get('k')
+        assert mmp[0] in range(4) and (mmp == mmp[0]).all()
+        assert [entry.name for entry in tmp_path.iterdir()] == ['k.mmp']
+    
+    def test_clear(self, tmp_path):
+        """Test that clear removes every entry"""
+        cache = MMPCache(tmp_path)
+        cache.put('a', np.array([1]), np.array([100.]))
+        cache.clear()
+        
+        assert cache.size() == 0
+        assert cache.get('a') is None
+
+
+class TestCachedFitHelpers:
+    """Test mmp_from_fit and pdc_from_fit with a cache"""
+    
+    def test_mmp_from_fit_uses_cache(self, fit_file_factory, tmp_path):
+        """Test that a cached curve skips decoding the FIT file"""
+        path = fit_file_factory([100, 300, 200, 400, 250])
+        cache_dir = tmp_path / 'cache'
+        
+        first = mmp_from_fit(path, [1, 2, 3], cache=cache_dir)
+        with patch.object(FitLoader, '_decode_power_data') as decode:
+            second = mmp_from_fit(path, [1, 2, 3], cache=cache_dir)
+            pdc = pdc_from_fit(path, [1, 2, 3], cache=MMPCache(cache_dir))
+        
+        decode.assert_not_called()
+        assert np.array_equal(first.x, second.x)
+        assert np.array_equal(first.y, second.y)
+        assert np.array_equal(pdc.y, first.y)
+        np.testing.assert_allclose(first.y, [400, 325, 300])
+    
+    def test_cache_distinguishes_durations(self, fit_file_factory, tmp_path):
+        """Test that different durations are cached separately"""
+        path = fit_file_factory([100, 300, 200, 400, 250])
+        
+        a = mmp_from_fit(path, [1, 2], cache=tmp_path)
+        b = mmp_from_fit(path, [3], cache=tmp_path)
+        
+        assert np.array_equal(a.x, [1, 2])
+        assert np.array_equal(b.x, [3])
+    
+    def test_cache_distinguishes_gap_handling(self, fit_file_factory, tmp_path):
+        """Test that curves resampled with different gap handling are cached separately"""
+        path = fit_file_factory([300] * 5 + [200] * 5, timestamps=list(range(5)) + list(range(60, 65)))
+        
+        zero = mmp_from_fit(path, [5, 10], cache=tmp_path)
+        broken = mmp_from_fit(path, [5, 10], cache=tmp_path, gaps='break')
+        
+        assert np.array_equal(zero.x, [5, 10])
+        assert np.array_equal(broken.x, [5])
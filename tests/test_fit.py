@@ -7,7 +7,8 @@ import tempfile
 import os
 from pathlib import Path
 from unittest.mock import Mock, patch, MagicMock
-from PDC_Utils.fit import FitLoader, load_fit_file, mmp_from_fit, pdc_from_fit
+from PDC_Utils.fit import FitLoader, load_fit_file, mmp_from_fit, pdc_from_fit, resample_power
+from PDC_Utils.fit import _scan_power_records, _read_power_records, _scan_power_chunks, _UnsupportedFit
 
 
 class TestFitLoader:
@@ -104,6 +105,357 @@ class TestFitLoader:
             os.unlink(tmp_path)
 
 
+    @patch.object(FitLoader, '_decode_power_data')
+    def test_compute_mmp_curve(self, mock_extract):
+        """Test compute_mmp_curve on extracted power data"""
+        mock_extract.return_value = pd.DataFrame({'power': [100, 300, 200, 0],
+                                                  'elapsed_time': [0., 1., 2., 3.]})
+        with tempfile.NamedTemporaryFile(suffix=".fit", delete=False) as tmp:
+            tmp_path = tmp.name
+        
+        try:
+            loader = FitLoader(tmp_path)
+            durations, mmp = loader.compute_mmp_curve([1, 2, 3, 10])
+            
+            assert np.array_equal(durations, [1, 2, 3])
+            np.testing.assert_allclose(mmp, [300, 250, 200])
+            
+            durations, mmp = loader.compute_full_mmp_curve()
+            assert np.array_equal(durations, [1, 2, 3, 4])
+            np.testing.assert_allclose(mmp, [300, 250, 200, 150])
+        finally:
+            os.unlink(tmp_path)
+
+
+class TestFitDecoding:
+    """Test decoding of synthetic FIT files"""
+    
+    def test_extract_power_data(self, fit_file_factory):
+        """Test that records without power are dropped and elapsed time is kept"""
+        path = fit_file_factory([100, None, 300, 250], timestamps=[0, 1, 2, 5])
+        
+        df = FitLoader(path).extract_power_data()
+        
+        assert list(df['power']) == [100, 300, 250]
+        assert list(df['elapsed_time']) == [0.0, 2.0, 5.0]
+        assert df['timestamp'].iloc[0] == pd.Timestamp(1_000_000_000, unit='s', tz='UTC')
+    
+    @pytest.mark.parametrize("options", [
+        {},
+        {'compressed': True},
+        {'endian': '>'},
+        {'dev_fields': True, 'heart_rate': [150, 151, 152, None, 154, 155]},
+    ])
+    def test_fast_path_matches_fitdecode(self, fit_file_factory, options):
+        """Test that the fast record scanner decodes like fitdecode"""
+        path = fit_file_factory([100, None, 300, 250, 0, 65534], timestamps=[0, 1, 2, 5, 40, 41], **options)
+        
+        fast = _scan_power_records(path.read_bytes())
+        reference = _read_power_records(path)
+        
+        assert fast == reference
+        assert list(fast[1]) == [100, 300, 250, 0, 65534]
+    
+    def test_compressed_timestamps(self, fit_file_factory):
+        """Test that compressed timestamp headers give the same elapsed time"""
+        path = fit_file_factory([100, 200, 300, 400], timestamps=[0, 1, 30, 33], compressed=True)
+        
+        df = FitLoader(path).extract_power_data()
+        
+        assert list(df['elapsed_time']) == [0.0, 1.0, 30.0, 33.0]
+    
+    def test_unsupported_file_uses_fitdecode(self, fit_file_factory):
+        """Test that files the fast path rejects are decoded with fitdecode"""
+        path = fit_file_factory([100, 200, 300])
+        
+        with pytest.raises(_UnsupportedFit):
+            _scan_power_records(path.read_bytes()[:-10])
+        with patch('PDC_Utils.fit._scan_power_records', side_effect=_UnsupportedFit):
+            df = FitLoader(path).extract_power_data()
+        
+        assert list(df['power']) == [100, 200, 300]
+    
+    def test_records_decoded_once(self, fit_file_factory):
+        """Test that every accessor reuses the decoded records"""
+        path = fit_file_factory([100, 200, 300, 400])
+        loader = FitLoader(path)
+        
+        with patch.object(loader, '_decode_power_data', wraps=loader._decode_power_data) as decode:
+            loader.extract_power_data()
+            loader.get_power_duration_data()
+            loader.compute_mmp_curve()
+            loader.compute_full_mmp_curve()
+            mmp_from_fit(loader)
+            pdc_from_fit(loader)
+        
+        assert decode.call_count == 1
+    
+    def test_extract_power_data_returns_copy(self, fit_file_factory):
+        """Test that callers cannot modify the cached records"""
+        loader = FitLoader(fit_file_factory([100, 200, 300]))
+        
+        df = loader.extract_power_data()
+        df['power'] = 0
+        
+        assert list(loader.extract_power_data()['power']) == [100, 200, 300]
+    
+    def test_records_invalidated_when_file_changes(self, fit_file_factory):
+        """Test that a rewritten file is decoded again"""
+        path = fit_file_factory([100, 200, 300])
+        loader = FitLoader(path)
+        assert list(loader.extract_power_data()['power']) == [100, 200, 300]
+        
+        fit_file_factory([400, 500], path=path)
+        os.utime(path, ns=(0, 0))
+        
+        assert list(loader.extract_power_data()['power']) == [400, 500]
+    
+    def test_reload(self, fit_file_factory):
+        """Test that reload decodes the file again"""
+        loader = FitLoader(fit_file_factory([100, 200, 300]))
+        loader.extract_power_data()
+        
+        with patch.object(loader, '_decode_power_data', wraps=loader._decode_power_data) as decode:
+            df = loader.reload()
+            loader.extract_power_data()
+        
+        assert decode.call_count == 1
+        assert list(df['power']) == [100, 200, 300]
+
+
+
+class TestFitChunks:
+    """Test incremental decoding of FIT files in chunks"""
+    
+    def setup_method(self):
+        """Power with gaps and heart rate with missing values"""
+        self.power = [100, None, 300, 250, 0, 400, 350, 200, 150, 50]
+        self.heart_rate = [120, 121, None, 123, 124, 125, None, 127, 128, 129]
+    
+    def test_chunks_match_whole_file(self, fit_file_factory):
+        """Test that concatenated chunks equal the whole-file records"""
+        path = fit_file_factory(self.power, compressed=True)
+        loader = FitLoader(path)
+        
+        chunks = list(loader.iter_chunks(chunk_size=4))
+        
+        assert [len(c) for c in chunks] == [4, 4, 1]
+        pd.testing.assert_frame_equal(pd.concat(chunks, ignore_index=True), loader.extract_power_data())
+    
+    def test_channels(self, fit_file_factory):
+        """Test that extra channels are decoded alongside power, NaN where missing"""
+        path = fit_file_factory(self.power, heart_rate=self.heart_rate, cadence=[90] * 10)
+        
+        df = pd.concat(FitLoader(path).iter_chunks(chunk_size=3, channels=['heart_rate', 'cadence']))
+        
+        expected = [hr for p, hr in zip(self.power, self.heart_rate) if p is not None]
+        np.testing.assert_array_equal(df['heart_rate'], np.array(expected, dtype=float))
+        assert (df['cadence'] == 90).all()
+    
+    def test_channels_match_fitdecode(self, fit_file_factory):
+        """Test that the fitdecode fallback decodes the same channels"""
+        path = fit_file_factory(self.power, heart_rate=self.heart_rate, dev_fields=True)
+        fast = pd.concat(FitLoader(path).iter_chunks(4, ['heart_rate']), ignore_index=True)
+        
+        with patch('PDC_Utils.fit._scan_power_chunks', side_effect=_UnsupportedFit):
+            slow = pd.concat(FitLoader(path).iter_chunks(4, ['heart_rate']), ignore_index=True)
+        
+        pd.testing.assert_frame_equal(fast, slow)
+    
+    def test_small_reads(self, fit_file_factory):
+        """Test that messages split across read blocks are reassembled"""
+        path = fit_file_factory(self.power * 20, heart_rate=self.heart_rate * 20, compressed=True)
+        whole = _scan_power_records(path.read_bytes())
+        
+        with patch('PDC_Utils.fit._READ_AHEAD', 16), open(path, 'rb') as f:
+            chunks = list(_scan_power_chunks(f, 7, ['heart_rate'], block_size=5))
+        
+        assert sum((list(c[1]) for c in chunks), []) == list(whole[1])
+        assert sum((list(c[0]) for c in chunks), []) == list(whole[0])
+    
+    def test_fallback_after_partial_fast_path(self, fit_file_factory):
+        """Test that fitdecode resumes after the records the fast path already produced"""
+        path = fit_file_factory(self.power)
+        
+        def fail_after_first_chunk(*args, **kwargs):
+            yield next(_scan_power_chunks(*args, **kwargs))
+            raise _UnsupportedFit("Unexpected definition")
+        
+        with patch('PDC_Utils.fit._scan_power_chunks', side_effect=fail_after_first_chunk):
+            df = pd.concat(FitLoader(path).iter_chunks(chunk_size=4), ignore_index=True)
+        
+        assert list(df['power']) == [p for p in self.power if p is not None]
+    
+    def test_stream_mmp_curve(self, fit_file_factory):
+        """Test that the MMP curve computed from chunks matches the whole-file curve"""
+        loader = FitLoader(fit_file_factory(self.power))
+        
+        durations, mmp = loader.stream_mmp_curve([1, 2, 5, 60], chunk_size=3)
+        expected = loader.compute_mmp_curve([1, 2, 5, 60])
+        
+        assert np.array_equal(durations, expected[0])
+        np.testing.assert_allclose(mmp, expected[1])
+    
+    def test_invalid_requests(self, fit_file_factory):
+        """Test unknown channels and files without power"""
+        with pytest.raises(ValueError):
+            list(FitLoader(fit_file_factory(self.power)).iter_chunks(channels=['speed']))
+        with pytest.raises(ValueError):
+            list(FitLoader(fit_file_factory([None, None])).iter_chunks())
+
+
+class TestResampling:
+    """Test regularising records to a fixed rate before computing MMP"""
+    
+    def test_regular_samples_unchanged(self):
+        """Test that contiguous 1 Hz samples come back as they are"""
+        resampled = resample_power([0., 1., 2., 3.], [100, 200, 300, 400])
+        
+        np.testing.assert_array_equal(resampled, [100, 200, 300, 400])
+    
+    def test_faster_recording_is_averaged(self):
+        """Test that samples sharing a slot are averaged"""
+        elapsed = np.arange(8) / 4
+        
+        resampled = resample_power(elapsed, [100, 200, 300, 400, 500, 500, 500, 500])
+        
+        np.testing.assert_array_equal(resampled, [250, 500])
+        assert len(resample_power(elapsed, np.ones(8), rate=4)) == 8
+    
+    def test_gaps(self):
+        """Test that short gaps hold the previous sample and long gaps are zeros or breaks"""
+        elapsed, power = [0., 1., 4., 5., 15., 16.], [100, 200, 300, 400, 500, 600]
+        
+        zero = resample_power(elapsed, power)
+        broken = resample_power(elapsed, power, gaps='break')
+        
+        np.testing.assert_array_equal(zero, [100, 200, 200, 200, 300, 400] + [0] * 9 + [500, 600])
+        np.testing.assert_array_equal(broken[:6], zero[:6])
+        assert np.isnan(broken[6:15]).all()
+        np.testing.assert_array_equal(resample_power(elapsed, power, max_gap=2)[2:4], [0, 0])
+    
+    def test_missing_timestamps_dropped(self):
+        """Test that records without a timestamp are left out"""
+        resampled = resample_power([0., np.nan, 1.], [100, 999, 200])
+        
+        np.testing.assert_array_equal(resampled, [100, 200])
+        assert len(resample_power([], [])) == 0
+        with pytest.raises(ValueError):
+            resample_power([0.], [100], gaps='interpolate')
+    
+    def test_mmp_curve_uses_timestamps(self, fit_file_factory):
+        """Test that an auto-pause is zero-filled or treated as a break"""
+        timestamps = list(range(10)) + list(range(100, 110))
+        path = fit_file_factory([300] * 10 + [200] * 10, timestamps=timestamps)
+        loader = FitLoader(path)
+        
+        zero = loader.compute_mmp_curve([10, 20, 60])
+        broken = loader.compute_mmp_curve([10, 20, 60], gaps='break')
+        
+        assert np.array_equal(zero[0], [10, 20, 60])
+        np.testing.assert_allclose(zero[1], [300, 150, 50])
+        assert np.array_equal(broken[0], [10])
+        assert len(loader.compute_full_mmp_curve()[0]) == 110
+        assert len(loader.compute_full_mmp_curve(gaps='break')[0]) == 10
+    
+    def test_summarize(self, fit_file_factory):
+        """Test that the summary is computed from the resampled stream, with its gaps"""
+        timestamps = list(range(40)) + list(range(100, 140))
+        path = fit_file_factory([300] * 40 + [200] * 40, timestamps=timestamps)
+        loader = FitLoader(path)
+        
+        zero = loader.summarize(ftp=250, durations=[10, 60])
+        broken = loader.summarize(ftp=250, durations=[10, 60], gaps='break')
+        
+        assert zero.duration == 140 and broken.duration == 80
+        assert zero.work == broken.work == pytest.approx(20.0)
+        assert list(broken.zones) == [0, 0, 40, 0, 0, 40, 0]
+        for summary, gaps in ((zero, 'zero'), (broken, 'break')):
+            curve = loader.compute_mmp_curve([10, 60], gaps=gaps)
+            assert np.array_equal(summary.mmp[0], curve[0])
+            np.testing.assert_allclose(summary.mmp[1], curve[1])
+    
+    def test_summary_totals_independent_of_durations(self, fit_file_factory):
+        """Test that a stop longer than an hour counts in full whatever MMP durations are asked for"""
+        timestamps = list(range(3600)) + list(range(10800, 14400))
+        loader = FitLoader(fit_file_factory([250] * 7200, timestamps=timestamps))
+        
+        short = loader.summarize(ftp=250, durations=[60, 1200])
+        long = loader.summarize(ftp=250, durations=[60, 1200, 7200])
+        
+        assert short.duration == long.duration == 14400
+        for field in ('work', 'average_power', 'normalized_power', 'intensity_factor', 'tss'):
+            assert getattr(short, field) == pytest.approx(getattr(long, field))
+        assert np.array_equal(short.zones, long.zones)
+        assert short.average_power == pytest.approx(125)
+        np.testing.assert_allclose(long.mmp[1], loader.compute_mmp_curve([60, 1200, 7200])[1])
+    
+    def test_stream_mmp_curve_with_gaps(self, fit_file_factory):
+        """Test that chunked MMP fills gaps between chunks like the whole-file curve"""
+        timestamps = [0, 1, 2, 4, 5, 20, 21, 22, 23, 40, 41, 42]
+        path = fit_file_factory([100, 200, 300, 400, 500, 600, 700, 600, 500, 400, 300, 200], timestamps=timestamps)
+        loader = FitLoader(path)
+        
+        for gaps in ('zero', 'break'):
+            streamed = loader.stream_mmp_curve([1, 3, 5, 10, 30], chunk_size=4, gaps=gaps)
+            whole = loader.compute_mmp_curve([1, 3, 5, 10, 30], gaps=gaps)
+            assert np.array_equal(streamed[0], whole[0])
+            np.testing.assert_allclose(streamed[1], whole[1])
+    
+    def test_stream_mmp_curve_sub_second(self, fit_file_factory):
+        """Test that a 4 Hz recording streams to the same curve whatever second the chunks split"""
+        power = np.random.default_rng(0).integers(100, 600, 5000).tolist()
+        loader = FitLoader(fit_file_factory(power, timestamps=list(np.arange(5000) // 4)))
+        durations = [1, 2, 5, 30, 300, 1250]
+        
+        x, y = loader.compute_mmp_curve(durations)
+        
+        for chunk_size in (1, 63, 1001):
+            streamed = loader.stream_mmp_curve(durations, chunk_size=chunk_size)
+            assert np.array_equal(streamed[0], x)
+            np.testing.assert_allclose(streamed[1], y)
+    
+    def test_long_pause_shortened(self):
+        """Test that a pause longer than max_pause is shortened to it, or to one NaN break"""
+        elapsed, power = [0., 1., 20000., 20001.], [100, 200, 300, 400]
+        
+        zero = resample_power(elapsed, power, max_pause=600)
+        broken = resample_power(elapsed, power, gaps='break', max_pause=600)
+        
+        np.testing.assert_array_equal(zero, [100, 200] + [0] * 600 + [300, 400])
+        np.testing.assert_array_equal(broken, [100, 200, np.nan, 300, 400])
+    
+    def test_full_curve_keeps_long_pauses(self, fit_file_factory):
+        """Test that the full curve spans a pause longer than the default pause bound, like the sparse curve"""
+        timestamps = list(range(3600)) + list(range(14400, 18000))
+        loader = FitLoader(fit_file_factory([300] * 7200, timestamps=timestamps))
+        durations = [60, 3600, 7200, 10800, 18000]
+        
+        full_x, full_y = loader.compute_full_mmp_curve()
+        x, y = loader.compute_mmp_curve(durations)
+        
+        assert full_x[-1] == 18000
+        assert np.array_equal(x, durations)
+        np.testing.assert_allclose(full_y[x - 1], y)
+        np.testing.assert_allclose(y, [300, 300, 150, 100, 120])
+    
+    def test_timestamp_glitch_dropped(self, fit_file_factory):
+        """Test that one record with a timestamp years ahead is dropped instead of stretching the grid"""
+        power = list(np.linspace(600, 150, 3600).astype(int))
+        timestamps = list(range(3600))
+        glitched = FitLoader(fit_file_factory(power[:1800] + [2000] + power[1800:],
+                                              timestamps=timestamps[:1800] + [6 * 365 * 86400] + timestamps[1800:]))
+        clean = FitLoader(fit_file_factory(power))
+        durations = [1, 5, 60, 600, 3600]
+        
+        expected = clean.compute_mmp_curve(durations)
+        
+        assert len(glitched.resample_power()) == 3600
+        for curve in (glitched.compute_mmp_curve(durations), glitched.stream_mmp_curve(durations, chunk_size=512),
+                      glitched.summarize(durations=durations).mmp):
+            assert np.array_equal(curve[0], expected[0])
+            np.testing.assert_allclose(curve[1], expected[1])
+
 class TestFitUtilityFunctions:
     """Test utility functions for FIT file processing"""
     
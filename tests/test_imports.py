@@ -0,0 +1,68 @@
+"""Tests that importing the package does not load its heavy dependencies"""
+
+import subprocess
+import sys
+import pytest
+
+HEAVY = ('lmfit', 'scipy', 'pandas', 'fitdecode')
+MODULES = ('mmp', 'pdc', 'fit', 'cache', 'batch', 'store', 'instrument', 'aio')
+
+# Seconds allowed for importing every module of the package, on top of numpy
+IMPORT_BUDGET = 0.3
+
+
+def _run(code):
+    """Output of `code` run in a fresh interpreter"""
+    return subprocess.run([sys.executable, '-c', code], capture_output=True, text=True, check=True).stdout
+
+
+class TestLazyImports:
+    """Test the import cost of the package"""
+    
+    def test_modules_do_not_load_heavy_dependencies(self):
+        """Test that importing every module leaves lmfit, scipy, pandas and fitdecode unloaded"""
+        loaded = _run(f"import sys\nimport PDC_Utils.{', PDC_Utils.'.join(MODULES)}\n"
+                      f"print(' '.join(m for m in {HEAVY!r} if m in sys.modules))")
+        assert loaded.split() == []
+    
+    def test_import_time_budget(self):
+        """Test that importing every module stays within the import-time budget"""
+        code = ("import time, numpy\nstart = time.perf_counter()\n"
+                f"import PDC_Utils.{', PDC_Utils.'.join(MODULES)}\nprint(time.perf_counter() - start)")
+        elapsed = min(float(_run(code)) for _ in range(3))
+        assert elapsed < IMPORT_BUDGET
+    
+    def test_package_attributes_load_on_first_use(self):
+        """Test that the package exposes the public API and submodules lazily"""
+        loaded = _run("import sys, PDC_Utils\nbefore = 'PDC_Utils.pdc' in sys.modules\n"
+                      "PDC_Utils.PDC, PDC_Utils.fit.FitLoader\n"
+                      "print(before, 'PDC_Utils.pdc' in sys.modules, 'lmfit' in sys.modules)")
+        assert loaded.split() == ['False', 'True', 'False']
+    
+    def test_package_exports_public_api(self):
+        """Test that every public name of every module is exported, as itself, by the package"""
+        import importlib
+        import PDC_Utils
+        
+        for name in MODULES:
+            module = importlib.import_module(f'PDC_Utils.{name}')
+            assert sorted(PDC_Utils._EXPORTS[name]) == sorted(module.__all__)
+            assert all(getattr(PDC_Utils, export) is getattr(module, export) for export in module.__all__)
+    
+    def test_lmfit_loads_on_first_fit(self, sample_power_data):
+        """Test that the lazily built model is the public PDC_MODEL and fits as before"""
+        import PDC_Utils
+        from PDC_Utils.pdc import PDC, PDC_MODEL, _model
+        
+        assert PDC_MODEL is _model() and PDC_Utils.PDC_MODEL is PDC_MODEL
+        assert PDC(*sample_power_data).fit().success
+    
+    def test_unknown_attribute(self):
+        """Test that unknown names still raise AttributeError"""
+        import PDC_Utils
+        import PDC_Utils.pdc
+        
+        with pytest.raises(AttributeError):
+            PDC_Utils.missing
+        with pytest.raises(AttributeError):
+            PDC_Utils.pdc.missing
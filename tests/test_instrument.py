@@ -0,0 +1,132 @@
+"""Tests for the pipeline instrumentation hooks"""
+
+import pytest
+import numpy as np
+from unittest.mock import patch
+from PDC_Utils.fit import FitLoader, pdc_from_fit
+from PDC_Utils.instrument import Event, EventLog, stage_hook
+from PDC_Utils.pdc import PDC, fit_batch, fit_many
+
+
+class TestInstrument:
+    """Test installing hooks"""
+    
+    def test_no_hook_reads_no_clock(self, sample_power_data):
+        """Test that nothing is timed when no hook is installed"""
+        x, y = sample_power_data
+        with patch('PDC_Utils.instrument.time.perf_counter') as clock:
+            PDC(x, y).fit()
+        clock.assert_not_called()
+    
+    def test_nested_hooks(self, sample_power_data):
+        """Test that enclosing hooks receive the events of nested blocks, and hooks are removed on exit"""
+        x, y = sample_power_data
+        with stage_hook(EventLog()) as outer:
+            with stage_hook(EventLog()) as inner:
+                PDC(x, y).fit()
+            PDC(x, y).fit()
+        PDC(x, y).fit()
+        
+        assert len(inner.stage('pdc.fit')) == 1
+        assert len(outer.stage('pdc.fit')) == 2
+    
+    def test_hook_errors_propagate(self, sample_power_data):
+        """Test that an exception raised by a hook reaches the caller"""
+        def hook(event): raise RuntimeError(event.stage)
+        
+        with pytest.raises(RuntimeError, match='pdc.fit'):
+            with stage_hook(hook):
+                PDC(*sample_power_data).fit()
+    
+    def test_summary(self):
+        """Test that the summary totals calls, seconds and numeric counters per stage"""
+        log = EventLog()
+        log(Event('a', 1.0, {'records': 10, 'reader': 'fast'}))
+        log(Event('a', 3.0, {'records': 5, 'reader': 'fast'}))
+        log(Event('b', 0.5, {'iterations': None}))
+        
+        table = log.summary()
+        
+        assert list(table.index) == ['a', 'b']
+        assert table.loc['a', 'calls'] == 2
+        assert table.loc['a', 'seconds'] == 4.0
+        assert table.loc['a', 'mean_seconds'] == 2.0
+        assert table.loc['a', 'records'] == 15
+        assert 'reader' not in table
+
+
+class TestInstrumentedStages:
+    """Test the events reported by the FIT and PDC pipeline"""
+    
+    def test_fit_loader_stages(self, fit_file_factory):
+        """Test that decoding, resampling and MMP report their stages and counts"""
+        path = fit_file_factory([100, 300, 200, 400, 250], timestamps=[0, 1, 2, 4, 5])
+        loader = FitLoader(path)
+        
+        with stage_hook(EventLog()) as log:
+            loader.compute_mmp_curve([1, 2, 3])
+            loader.compute_full_mmp_curve()
+        
+        decode, = log.stage('fit.decode')
+        assert decode.info == {'records': 5, 'reader': 'fast'}
+        assert [e.info for e in log.stage('fit.resample')] == [{'records': 5, 'samples': 6}] * 2
+        assert [e.info for e in log.stage('fit.mmp')] == [{'samples': 6, 'durations': 3},
+                                                          {'samples': 6, 'durations': 6}]
+        assert all(e.seconds >= 0 for e in log.events)
+    
+    def test_stream_mmp_stage(self, fit_file_factory):
+        """Test that streaming reports its chunk and record counts"""
+        path = fit_file_factory(list(range(10)))
+        
+        with stage_hook(EventLog()) as log:
+            FitLoader(path).stream_mmp_curve([1, 5], chunk_size=4)
+        
+        event, = log.stage('fit.stream_mmp')
+        assert event.info == {'chunks': 3, 'records': 10, 'samples': 10}
+    
+    def test_pdc_fit_counts(self, real_mmp_data):
+        """Test that PDC.fit reports evaluations and iterations matching the fit result"""
+        x, y = real_mmp_data
+        
+        with stage_hook(EventLog()) as log:
+            result = PDC(x, y).fit()
+            PDC(x, y).fit(jac=False)
+        
+        with_jac, without_jac = log.stage('pdc.fit')
+        assert with_jac.info['nfev'] == result.nfev
+        assert 0 < with_jac.info['iterations'] <= result.nfev
+        assert with_jac.info['points'] == len(y) and with_jac.info['success']
+        assert without_jac.info['iterations'] is None
+    
+    def test_pdc_fit_result_unchanged(self, real_mmp_data):
+        """Test that instrumenting a fit does not change its result"""
+        x, y = real_mmp_data
+        plain = PDC(x, y).fit()
+        with stage_hook(EventLog()):
+            instrumented = PDC(x, y).fit()
+        
+        assert plain.best_values == instrumented.best_values
+        assert plain.nfev == instrumented.nfev
+    
+    def test_batch_stages(self, real_mmp_data):
+        """Test that fit_batch and fit_many report one event for the whole batch"""
+        x, y = real_mmp_data
+        
+        with stage_hook(EventLog()) as log:
+            table = fit_batch(x, np.stack([y, y * 1.1]))
+            records = fit_many([PDC(x, y)] * 2, workers=1)
+        
+        batch, = log.stage('pdc.fit_batch')
+        many, = log.stage('pdc.fit_many')
+        assert batch.info == {'curves': 2, 'iterations': table['iterations'].sum(), 'success': table['success'].sum()}
+        assert many.info['curves'] == 2 and many.info['nfev'] == sum(r.nfev for r in records)
+        assert len(log.stage('pdc.fit')) == 2
+    
+    def test_pdc_from_fit(self, fit_file_factory):
+        """Test that a whole FIT to PDC run reports every stage in order"""
+        path = fit_file_factory([400, 380, 360, 340, 320, 300, 290, 280, 270, 260] * 2)
+        
+        with stage_hook(EventLog()) as log:
+            pdc_from_fit(path, [1, 2, 3, 5, 8, 10, 15, 20]).fit()
+        
+        assert [e.stage for e in log.events] == ['fit.decode', 'fit.resample', 'fit.mmp', 'pdc.fit']
@@ -2,7 +2,9 @@
 
 import pytest
 import numpy as np
-from PDC_Utils.mmp import MMP
+import pandas as pd
+from PDC_Utils.mmp import CPFit, MMP, MMPEnvelope, fit_cp, MMPStream, mmp_curve, mmp_curve_full, DEFAULT_DURATIONS
+from PDC_Utils.mmp import summarize_power
 
 
 class TestMMP:
@@ -35,14 +37,14 @@ class TestMMP:
         """Test that MMP has a fit method"""
         mmp = MMP(self.x, self.y)
         
-        # The fit method currently just passes, but it should exist
         assert hasattr(mmp, 'fit')
         assert callable(mmp.fit)
         
-        # Should not raise an error when called
+        # The 2-parameter model is fitted on the points from 2 to 20 minutes
         result = mmp.fit()
-        # Currently returns None since it's just a pass statement
-        assert result is None
+        assert isinstance(result, CPFit)
+        assert result.n == 4 and result.k == 0
+        assert 200 < result.cp < 300 and result.w_prime > 0
     
     def test_mmp_empty_data(self):
         """Test MMP behavior with empty data"""
@@ -52,9 +54,9 @@ class TestMMP:
         assert len(mmp.x) == 0
         assert len(mmp.y) == 0
         
-        # fit() should still work (currently just passes)
+        # fit() has no points to fit
         result = mmp.fit()
-        assert result is None
+        assert np.isnan(result.cp) and result.n == 0
     
     def test_mmp_single_point(self):
         """Test MMP with single data point"""
@@ -65,9 +67,9 @@ class TestMMP:
         assert mmp.x[0] == 60
         assert mmp.y[0] == 300
         
-        # fit() should work
+        # One point cannot determine the model
         result = mmp.fit()
-        assert result is None
+        assert np.isnan(result.cp) and np.isnan(result.w_prime)
     
     def test_mmp_data_types(self):
         """Test MMP with different data types"""
@@ -100,9 +102,9 @@ class TestMMP:
         assert len(mmp.x) == 3
         assert len(mmp.y) == 2
         
-        # fit() should still work (currently just passes)
-        result = mmp.fit()
-        assert result is None
+        # Fitting needs one power per duration
+        with pytest.raises(ValueError):
+            mmp.fit()
     
     def test_mmp_negative_values(self):
         """Test MMP behavior with negative values"""
@@ -120,9 +122,9 @@ class TestMMP:
         mmp = MMP(x_pos, y_neg)
         assert mmp.y[0] == -100
         
-        # Both should work for initialization
+        # Both should work for initialization, with too few points in range to fit
         result = mmp.fit()
-        assert result is None
+        assert np.isnan(result.cp)
     
     def test_mmp_large_datasets(self):
         """Test MMP with larger datasets"""
@@ -137,7 +139,7 @@ class TestMMP:
         
         # fit() should work
         result = mmp.fit()
-        assert result is None
+        assert result.n == 881 and np.isfinite(result.cp)
     
     def test_mmp_zero_values(self):
         """Test MMP behavior with zero values"""
@@ -157,4 +159,450 @@ class TestMMP:
         
         # Both should work
         result = mmp.fit()
-        assert result is None
\ No newline at end of file
+        assert np.isnan(result.cp)
+    
+    
+    def test_mmp_compact_storage(self):
+        """Test that pandas inputs are stored as compact contiguous arrays"""
+        mmp = MMP(pd.Series(self.x), pd.Series(self.y, dtype=float))
+        
+        assert mmp.x.dtype == np.int32 and mmp.y.dtype == np.float32
+        assert mmp.x.flags.c_contiguous and mmp.y.flags.c_contiguous
+        assert not hasattr(mmp, '__dict__')
+        assert MMP([1.5, 3], [400, 300]).x.dtype == np.float32
+
+
+class TestMMPLookup:
+    """Test interpolated lookups and serialization of MMP curves"""
+    
+    def setup_method(self):
+        """Set up a decreasing curve"""
+        self.mmp = MMP([1, 10, 100, 1000], [800, 500, 300, 250])
+    
+    def test_power_at_points_and_between(self):
+        """Test that power_at returns the points exactly and interpolates in log-duration"""
+        np.testing.assert_array_equal(self.mmp.power_at([1, 10, 100, 1000]), [800, 500, 300, 250])
+        assert self.mmp.power_at(np.sqrt(10)) == pytest.approx(650)
+        assert self.mmp.power_at(316.2277660168379) == pytest.approx(275)
+        assert np.isscalar(self.mmp.power_at(5))
+    
+    def test_power_at_outside_curve(self):
+        """Test that durations outside the curve give NaN"""
+        assert np.isnan(self.mmp.power_at([0.5, 1001, np.nan])).all()
+    
+    def test_power_at_fractional_durations(self):
+        """Test lookups on a curve with fractional durations"""
+        mmp = MMP([0.5, 2.0], [900, 700])
+        
+        assert mmp.power_at(1.0) == pytest.approx(800)
+    
+    def test_duration_for(self):
+        """Test that duration_for inverts power_at"""
+        np.testing.assert_allclose(self.mmp.duration_for([800, 500, 300, 250]), [1, 10, 100, 1000])
+        assert self.mmp.duration_for(650) == pytest.approx(np.sqrt(10))
+        durations = np.geomspace(1, 1000, 50)
+        np.testing.assert_allclose(self.mmp.duration_for(self.mmp.power_at(durations)), durations, rtol=1e-4)
+    
+    def test_duration_for_outside_curve_and_flat(self):
+        """Test NaN outside the curve and the longest duration on a flat stretch"""
+        assert np.isnan(self.mmp.duration_for([801, 249])).all()
+        assert MMP([1, 5, 20], [400, 300, 300]).duration_for(300) == 20
+    
+    def test_single_point(self):
+        """Test lookups on one-point and empty curves"""
+        mmp = MMP([60], [300])
+        
+        assert mmp.power_at(60) == 300 and np.isnan(mmp.power_at(30))
+        assert mmp.duration_for(300) == 60
+        assert np.isnan(MMP([], []).power_at(10))
+    
+    def test_mismatched_lengths(self):
+        """Test that lookups need as many powers as durations"""
+        with pytest.raises(ValueError):
+            MMP([1, 10, 60], [500, 400]).power_at(5)
+    
+    def test_bytes_roundtrip(self):
+        """Test that curves round-trip through their binary encoding in 8 bytes per point"""
+        for mmp in (self.mmp, MMP([0.5, 2.5], [900.25, 700.5]), MMP([], [])):
+            data = mmp.to_bytes()
+            decoded = MMP.from_bytes(data)
+            
+            assert len(data) == 9 + 8 * len(mmp)
+            assert decoded == mmp and decoded.x.dtype == mmp.x.dtype
+            assert decoded.y.flags.writeable
+        
+        with pytest.raises(ValueError):
+            MMP.from_bytes(self.mmp.to_bytes()[:-1])
+    
+    def test_equality(self):
+        """Test that curves compare by their points"""
+        assert self.mmp == MMP(np.array([1, 10, 100, 1000]), [800., 500., 300., 250.])
+        assert self.mmp != MMP([1, 10], [800, 500])
+
+
+class TestCriticalPower:
+    """Test the closed-form critical power fits"""
+    
+    def setup_method(self):
+        """Set up exact model curves"""
+        self.x = np.array([1, 5, 30, 60, 120, 180, 300, 600, 900, 1200, 3600])
+        self.cp, self.w_prime = 250., 20000.
+    
+    def test_two_parameter_exact(self):
+        """Test that an exact 2-parameter curve is recovered"""
+        result = MMP(self.x, self.cp + self.w_prime / self.x).fit()
+        
+        assert result.cp == pytest.approx(self.cp, rel=1e-5)
+        assert result.w_prime == pytest.approx(self.w_prime, rel=1e-4)
+        assert result.n == 6 and result.rmse < 0.01
+    
+    def test_three_parameter_exact(self):
+        """Test that an exact 3-parameter curve is recovered, including its offset"""
+        result = MMP(self.x, self.cp + self.w_prime / (self.x + 20)).fit('3p')
+        
+        assert result.k == -20
+        assert result.cp == pytest.approx(self.cp, rel=1e-4)
+        assert result.w_prime == pytest.approx(self.w_prime, rel=1e-4)
+        assert result.power(20.) == pytest.approx(self.cp + self.w_prime / 40, rel=1e-4)
+    
+    def test_durations_range(self):
+        """Test that only the requested durations are fitted"""
+        assert MMP(self.x, self.cp + self.w_prime / self.x).fit(durations=(30, 3600)).n == 9
+    
+    def test_batch_matches_single_fits(self):
+        """Test that a batch with missing points gives the same fits as one curve at a time"""
+        rng = np.random.default_rng(0)
+        Y = (self.cp + self.w_prime / (self.x + 10)) * rng.uniform(0.9, 1.1, size=(5, 1)) \
+            + rng.normal(0, 3, size=(5, len(self.x)))
+        Y[1, 6] = Y[3, [4, 5, 6, 7, 8]] = np.nan
+        
+        for model in ('2p', '3p'):
+            batch = fit_cp(self.x, Y, model)
+            for i, y in enumerate(Y):
+                keep = ~np.isnan(y)
+                single = fit_cp(self.x[keep], y[keep], model)
+                np.testing.assert_allclose([batch.cp[i], batch.w_prime[i], batch.k[i], batch.rmse[i]],
+                                           single[:4], rtol=1e-6)
+        # Of the fourth curve only 1200 s is left between 2 and 20 minutes
+        two = fit_cp(self.x, Y)
+        assert np.isnan(two.cp[3]) and two.n[3] == 1
+    
+    def test_unknown_model(self):
+        """Test that an unknown model is rejected"""
+        with pytest.raises(ValueError):
+            fit_cp(self.x, self.x, 'cp4')
+
+
+def rolling_mmp(power, duration):
+    """Reference MMP for one duration using a pandas rolling mean"""
+    return pd.Series(power).rolling(window=duration, min_periods=duration).mean().max()
+
+
+class TestMMPCurve:
+    """Test the cumulative-sum MMP engine"""
+    
+    def setup_method(self):
+        """Set up a synthetic ride with steady blocks, noise and coasting"""
+        rng = np.random.default_rng(42)
+        base = np.repeat(rng.uniform(100, 350, 20), 300)
+        power = base + rng.normal(0, 60, len(base))
+        power[rng.random(len(base)) < 0.05] = 0
+        self.power = np.clip(power, 0, 1500).astype(np.int64)
+    
+    def test_mmp_curve_matches_rolling_mean(self):
+        """Test that the sparse curve matches a pandas rolling mean for every duration"""
+        durations, mmp = mmp_curve(self.power)
+        
+        expected = [rolling_mmp(self.power, d) for d in durations]
+        np.testing.assert_allclose(mmp, expected)
+    
+    def test_mmp_curve_default_durations(self):
+        """Test that the default grid is used and durations beyond the ride are dropped"""
+        durations, mmp = mmp_curve(self.power[:1000])
+        
+        expected = [d for d in DEFAULT_DURATIONS if d <= 1000]
+        assert np.array_equal(durations, expected)
+        assert len(mmp) == len(durations)
+    
+    def test_mmp_curve_custom_durations(self):
+        """Test MMP with custom durations"""
+        durations, mmp = mmp_curve([100, 300, 200, 0], [1, 2, 3, 5])
+        
+        assert np.array_equal(durations, [1, 2, 3])
+        np.testing.assert_allclose(mmp, [300, 250, 200])
+    
+    def test_mmp_curve_float_power(self):
+        """Test MMP with float power samples"""
+        durations, mmp = mmp_curve([100.5, 300.25, 200.0], [1, 2])
+        
+        np.testing.assert_allclose(mmp, [300.25, 250.125])
+    
+    def test_mmp_curve_invalid_duration(self):
+        """Test that non-positive durations are rejected"""
+        with pytest.raises(ValueError):
+            mmp_curve(self.power, [0, 10])
+    
+    def test_mmp_curve_empty_power(self):
+        """Test MMP of an empty stream"""
+        durations, mmp = mmp_curve([])
+        
+        assert len(durations) == 0
+        assert len(mmp) == 0
+    
+    def test_mmp_curve_full_matches_brute_force(self):
+        """Test that the pruned full curve is exact for every duration"""
+        durations, mmp = mmp_curve_full(self.power)
+        
+        cs = np.concatenate(([0], np.cumsum(self.power)))
+        expected = [(cs[d:] - cs[:-d]).max() / d for d in range(1, len(self.power) + 1)]
+        assert np.array_equal(durations, np.arange(1, len(self.power) + 1))
+        np.testing.assert_array_equal(mmp, expected)
+    
+    def test_mmp_curve_full_agrees_with_sparse_grid(self):
+        """Test that the full curve contains the sparse grid values"""
+        durations, mmp = mmp_curve(self.power)
+        _, full = mmp_curve_full(self.power)
+        
+        np.testing.assert_allclose(full[durations - 1], mmp)
+    
+    def test_mmp_curve_full_negative_power(self):
+        """Test that negative samples fall back to an exhaustive scan"""
+        power = self.power[:600] - 50
+        
+        _, full = mmp_curve_full(power)
+        
+        expected = [rolling_mmp(power, d) for d in range(1, len(power) + 1)]
+        np.testing.assert_allclose(full, expected)
+    
+    def test_mmp_curve_breaks(self):
+        """Test that NaN breaks split the ride into segments no window may span"""
+        power = self.power[:900].astype(float)
+        power[300] = np.nan
+        power[700:720] = np.nan
+        segments = [power[:300], power[301:700], power[720:]]
+        
+        durations, mmp = mmp_curve(power, [1, 30, 299, 300, 399, 400, 600])
+        
+        assert np.array_equal(durations, [1, 30, 299, 300, 399])
+        expected = [max(rolling_mmp(seg, d) for seg in segments if len(seg) >= d) for d in durations]
+        np.testing.assert_allclose(mmp, expected)
+    
+    def test_mmp_curve_full_breaks(self):
+        """Test that the full curve with breaks agrees with the sparse grid"""
+        power = self.power[:2000].astype(float)
+        power[500:560] = np.nan
+        power[1999] = np.nan
+        
+        durations, full = mmp_curve_full(power)
+        sparse_x, sparse_y = mmp_curve(power, durations)
+        
+        assert durations[-1] == 1439
+        assert np.array_equal(sparse_x, durations)
+        np.testing.assert_allclose(full, sparse_y)
+
+
+
+class TestActivitySummary:
+    """Test the fused activity summary"""
+    
+    def setup_method(self):
+        """Set up a noisy hour-long ride"""
+        rng = np.random.default_rng(7)
+        self.power = np.clip(rng.normal(220, 80, 3600), 0, None).astype(np.int64)
+    
+    def test_matches_pandas_reference(self):
+        """Test work, average and normalized power, IF and TSS against their pandas definitions"""
+        summary = summarize_power(self.power, ftp=250)
+        
+        rolling = pd.Series(self.power).rolling(30).mean().dropna()
+        normalized = (rolling ** 4).mean() ** 0.25
+        assert summary.duration == 3600
+        assert summary.work == pytest.approx(self.power.sum() / 1000)
+        assert summary.average_power == pytest.approx(self.power.mean())
+        assert summary.normalized_power == pytest.approx(normalized)
+        assert summary.intensity_factor == pytest.approx(normalized / 250)
+        assert summary.tss == pytest.approx((normalized / 250) ** 2 * 100)
+    
+    def test_zones(self):
+        """Test that time in zone bins samples by their upper bound as a fraction of FTP"""
+        summary = summarize_power([50, 100, 149, 150, 151, 400], ftp=200, zones=(0.5, 0.75), durations=[1])
+        
+        assert list(summary.zones) == [1, 2, 3]
+        assert summarize_power(self.power, ftp=250).zones.sum() == 3600
+    
+    def test_shares_mmp_curve(self):
+        """Test that the summary carries the same MMP curve as `mmp_curve`"""
+        summary = summarize_power(self.power, durations=[1, 60, 600])
+        
+        expected = mmp_curve(self.power, [1, 60, 600])
+        assert np.array_equal(summary.mmp[0], expected[0])
+        np.testing.assert_allclose(summary.mmp[1], expected[1])
+    
+    def test_without_ftp(self):
+        """Test that IF, TSS and zones are missing without an FTP"""
+        summary = summarize_power(self.power)
+        
+        assert np.isnan(summary.intensity_factor) and np.isnan(summary.tss)
+        assert summary.zones is None
+    
+    def test_breaks(self):
+        """Test that breaks are left out of every total and no 30 s window spans one"""
+        paused = np.concatenate([self.power[:1800], np.full(600, np.nan), self.power[1800:]])
+        
+        summary = summarize_power(paused, ftp=250)
+        
+        rolling = pd.concat([pd.Series(self.power[:1800]).rolling(30).mean(),
+                             pd.Series(self.power[1800:]).rolling(30).mean()]).dropna()
+        assert summary.duration == 3600 and summary.zones.sum() == 3600
+        assert summary.average_power == pytest.approx(self.power.mean())
+        assert summary.normalized_power == pytest.approx((rolling ** 4).mean() ** 0.25)
+        np.testing.assert_allclose(summary.mmp[1], mmp_curve(paused)[1])
+    
+    def test_short_ride(self):
+        """Test that a ride shorter than the normalized power window has no normalized power"""
+        summary = summarize_power([200] * 10, ftp=250)
+        
+        assert summary.work == pytest.approx(2.0)
+        assert np.isnan(summary.normalized_power)
+
+
+class TestMMPAggregation:
+    """Test merging MMP curves and season envelopes"""
+    
+    def test_merge_takes_elementwise_best(self):
+        """Test that merge keeps the best power and its source on the union grid"""
+        a = MMP(np.array([1, 60]), np.array([900., 400.]), ['a', 'a'])
+        b = MMP(np.array([1, 60, 300]), np.array([800., 450., 300.]), ['b', 'b', 'b'])
+        
+        merged = a.merge(b)
+        
+        assert np.array_equal(merged.x, [1, 60, 300])
+        assert np.array_equal(merged.y, [900, 450, 300])
+        assert list(merged.sources) == ['a', 'b', 'b']
+    
+    def test_update_in_place(self):
+        """Test that update raises the curve in place and tracks sources"""
+        best = MMP(np.array([1, 60]), np.array([900., 400.]))
+        best.update(MMP(np.array([1, 60]), np.array([850., 420.]), ['ride2', 'ride2']))
+        
+        assert np.array_equal(best.y, [900, 420])
+        assert list(best.sources) == [None, 'ride2']
+    
+    def test_envelope_matches_merge(self):
+        """Test that the all-time envelope equals merging every curve"""
+        rng = np.random.default_rng(1)
+        env = MMPEnvelope(durations=[1, 5, 60, 300])
+        expected = None
+        for i in range(40):
+            curve = MMP(np.array([1, 5, 60, 300]), rng.uniform(100, 1000, 4), [i] * 4)
+            env.add(curve, np.datetime64('2024-01-01') + i)
+            expected = curve if expected is None else expected.merge(curve)
+        
+        best = env.curve()
+        
+        assert np.array_equal(best.y, expected.y)
+        assert list(best.sources) == list(expected.sources)
+    
+    def test_rolling_window_expires_efforts(self):
+        """Test that efforts older than the window are dropped and the next best takes over"""
+        env = MMPEnvelope(durations=[1, 60], window=42)
+        env.add(MMP([1, 60], [1000, 500]), '2024-01-01', 'old')
+        env.add(MMP([1, 60], [900, 450]), '2024-02-01', 'mid')
+        env.add(MMP([1], [800]), '2024-03-01', 'new')
+        
+        recent = env.curve()
+        
+        assert np.array_equal(recent.y, [900, 450])
+        assert list(recent.sources) == ['mid', 'mid']
+        assert list(env.curve(as_of='2024-04-01').sources) == ['new']
+        # Looking back does not disturb the current window
+        assert list(env.curve(as_of='2024-01-10').sources) == ['old', 'old']
+        assert list(env.curve().sources) == ['new']
+    
+    def test_envelope_ignores_missing_durations(self):
+        """Test that durations no ride reached are left out of the envelope"""
+        env = MMPEnvelope(durations=[1, 60, 3600])
+        env.add(MMP([1, 60], [700, 400]), '2024-01-01')
+        
+        best = env.curve()
+        
+        assert np.array_equal(best.x, [1, 60])
+        assert list(best.sources) == [0, 0]
+
+
+class TestMMPStream:
+    """Test the streaming MMP accumulator"""
+    
+    def setup_method(self):
+        """Create a ride of random integer power"""
+        rng = np.random.default_rng(3)
+        self.power = rng.integers(0, 600, 5000)
+        self.sizes = rng.integers(1, 400, 100)
+    
+    def feed(self, stream, power):
+        """Push `power` in chunks of varying size"""
+        bounds = np.cumsum(self.sizes)
+        for chunk in np.split(power, bounds[bounds < len(power)]):
+            stream.push(chunk)
+        return stream
+    
+    def test_chunks_match_mmp_curve(self):
+        """Test that uneven chunks give exactly the batch curve"""
+        x, y = self.feed(MMPStream(), self.power).curve()
+        
+        expected_x, expected_y = mmp_curve(self.power)
+        assert np.array_equal(x, np.unique(expected_x))
+        assert np.array_equal(y, mmp_curve(self.power, x)[1])
+    
+    def test_single_samples(self):
+        """Test pushing one sample at a time"""
+        stream = MMPStream([1, 5, 30])
+        for value in self.power[:200]:
+            stream.push(value)
+        
+        x, y = stream.curve()
+        
+        assert len(stream) == 200
+        np.testing.assert_allclose(y, mmp_curve(self.power[:200], [1, 5, 30])[1])
+    
+    def test_float_and_negative_power(self):
+        """Test float samples, including negative values, switching from integer state"""
+        power = np.concatenate([self.power[:100], np.linspace(-50, 300.5, 900)])
+        stream = MMPStream([1, 10, 60, 600])
+        stream.push(power[:100])
+        self.feed(stream, power[100:])
+        
+        np.testing.assert_allclose(stream.curve()[1], mmp_curve(power, [1, 10, 60, 600])[1])
+    
+    def test_durations_not_reached(self):
+        """Test that only durations covered by the samples so far are reported"""
+        stream = MMPStream([1, 5, 60])
+        stream.push([100, 200, 300, 400, 500])
+        
+        x, y = stream.curve()
+        
+        assert np.array_equal(x, [1, 5])
+        assert np.array_equal(y, [500, 300])
+    
+    def test_state_is_bounded(self):
+        """Test that the kept samples never exceed the longest duration"""
+        stream = self.feed(MMPStream([1, 60, 300]), self.power)
+        
+        assert len(stream._tail) == 300
+    
+    def test_breaks(self):
+        """Test that NaN samples break the stream like they break `mmp_curve`"""
+        power = self.power[:3000].astype(float)
+        power[1000:1200] = np.nan
+        power[2500] = np.nan
+        
+        x, y = self.feed(MMPStream(), power).curve()
+        
+        expected_x, expected_y = mmp_curve(power, x)
+        assert np.array_equal(x, np.unique(mmp_curve(power)[0]))
+        np.testing.assert_allclose(y, expected_y)
+    
+    def test_invalid_duration(self):
+        """Test that durations below one second are rejected"""
+        with pytest.raises(ValueError):
+            MMPStream([0, 5])
@@ -3,7 +3,10 @@
 import pytest
 import numpy as np
 import pandas as pd
-from PDC_Utils.pdc import PDC, power_curve
+from PDC_Utils.pdc import (PDC, PARAM_BOUNDS, BootstrapResult, FitRecord, fit_batch, fit_many, initial_guess,
+                           make_params, power_curve, power_curve_grid, power_curve_jac, thin_curve)
+from PDC_Utils.pdc import _resample_weights
+from PDC_Utils.mmp import MMP
 
 
 class TestPowerCurve:
@@ -218,4 +221,477 @@ class TestPDC:
         try:
             result = pdc.fit()
         except (ValueError, RuntimeError, TypeError):
-            pass
\ No newline at end of file
+            pass
+
+class TestPDCInit:
+    """Test initial values and warm-started fits"""
+    
+    def setup_method(self):
+        """Load the sample curve"""
+        df = pd.read_csv('data/mmpcurve.csv')
+        self.pdc = PDC(df['Secs'], df['Watts'])
+    
+    def test_make_params_defaults_and_clipping(self):
+        """Test that initial values default per parameter and are clipped into the bounds"""
+        params = make_params({'ftp': 1000, 'frc': 8000})
+        
+        assert 399 < params['ftp'].value < 400
+        assert params['frc'].value == 8000
+        assert params['tte'].value == PARAM_BOUNDS['tte'][0]
+        assert (params['a'].min, params['a'].max) == (1, 200)
+    
+    def test_initial_guess_from_curve(self):
+        """Test that threshold and anaerobic capacity come from a critical power fit from 1 to 10 minutes"""
+        guess = initial_guess([1, 60, 300, 1200, 3600], [900, 500, 320, 260, 230])
+        
+        # The work of 30 kJ at 60 s and 96 kJ at 300 s puts CP at 275 W and W' at 13.5 kJ
+        assert guess['ftp'] == pytest.approx(275)
+        assert guess['frc'] == pytest.approx(13500)
+        assert set(guess) == set(PARAM_BOUNDS)
+    
+    def test_initial_guess_fallback(self):
+        """Test the heuristic used when too few points lie between 1 and 10 minutes"""
+        guess = initial_guess([1, 60, 1200, 3600], [900, 500, 260, 230])
+        
+        assert guess['ftp'] == pytest.approx(0.95 * 260)
+        assert guess['frc'] == pytest.approx((500 - 247) * 60)
+    
+    def test_critical_power_init(self):
+        """Test that a critical power fit seeds PDC.fit like init='auto'"""
+        cp = MMP(self.pdc.x, self.pdc.y).fit(durations=(60, 600))
+        
+        assert self.pdc.fit(init=cp).chisqr == pytest.approx(self.pdc.fit(init='auto').chisqr, rel=1e-6)
+    
+    def test_fit_accepts_any_init(self):
+        """Test that dicts, Parameters and previous results are valid starting points"""
+        result = self.pdc.fit(init='auto')
+        
+        for init in (result, result.params, result.best_values):
+            refit = self.pdc.fit(init=init)
+            assert refit.success
+            assert refit.chisqr == pytest.approx(result.chisqr, rel=1e-3)
+    
+    def test_auto_init_reaches_optimum(self):
+        """Test that the data-driven start fits as well as the defaults"""
+        assert self.pdc.fit(init='auto').chisqr < 1.001 * self.pdc.fit().chisqr
+    
+    def test_warm_start_needs_fewer_evaluations(self):
+        """Test that refitting from a converged result is much cheaper than a cold fit"""
+        cold = self.pdc.fit()
+        warm = self.pdc.fit(init=cold)
+        
+        assert warm.nfev < cold.nfev / 3
+        assert self.pdc.fit(init='auto').nfev < cold.nfev
+    
+    def test_unknown_init(self):
+        """Test that an unknown init string is rejected"""
+        with pytest.raises(ValueError):
+            self.pdc.fit(init='best')
+
+
+class TestPowerCurveGrid:
+    """Test evaluating power_curve over grids of parameters"""
+    
+    def setup_method(self):
+        """Set up scenarios around typical parameters"""
+        rng = np.random.default_rng(1)
+        self.x = np.arange(1, 3601)
+        self.params = dict(frc=rng.uniform(5000, 20000, 300), ftp=rng.uniform(150, 350, 300), tte=2000.,
+                           tau=rng.uniform(10, 25, 300), tau2=20., a=rng.uniform(1, 50, 300))
+    
+    def test_matches_power_curve(self):
+        """Test that every row equals power_curve with that row's parameters, across scratch blocks"""
+        grid = power_curve_grid(self.x, **self.params, block=64)
+        expected = power_curve(self.x, **{k: np.asarray(v)[..., None] for k, v in self.params.items()})
+        
+        assert grid.shape == (300, 3600) and grid.dtype == np.float64
+        np.testing.assert_allclose(grid, expected, rtol=1e-12)
+    
+    def test_float32_and_out(self):
+        """Test the float32 mode and writing into a preallocated buffer"""
+        out = np.empty((300, 3600), dtype=np.float32)
+        
+        grid = power_curve_grid(self.x, **self.params, dtype=np.float32, out=out)
+        
+        assert grid is out
+        np.testing.assert_allclose(grid, power_curve_grid(self.x, **self.params), rtol=1e-5)
+    
+    def test_out_must_match(self):
+        """Test that a buffer of the wrong shape or dtype is rejected"""
+        with pytest.raises(ValueError):
+            power_curve_grid(self.x, **self.params, out=np.empty((300, 3600), dtype=np.float32))
+        with pytest.raises(ValueError):
+            power_curve_grid(self.x, **self.params, out=np.empty((299, 3600)))
+    
+    def test_allocates_only_output(self):
+        """Test that no temporaries of the output's size are allocated"""
+        import tracemalloc
+        out = np.empty((300, 3600))
+        tracemalloc.start()
+        try:
+            power_curve_grid(self.x, **self.params, out=out, block=16)
+            _, peak = tracemalloc.get_traced_memory()
+        finally:
+            tracemalloc.stop()
+        
+        assert peak < out.nbytes / 10
+    
+    def test_scalar_parameters(self):
+        """Test that scalar parameters give a single row"""
+        grid = power_curve_grid([1, 60, 600], 15000, 250, 2000, 15, 20, 10)
+        
+        np.testing.assert_allclose(grid, [power_curve(np.array([1, 60, 600]), 15000, 250, 2000, 15, 20, 10)])
+
+
+class TestPowerCurveJacobian:
+    """Test the analytic Jacobian and its use in fitting"""
+    
+    def test_matches_finite_differences(self):
+        """Test each column against central differences, on both sides of tte"""
+        x = np.array([1., 5., 60., 600., 1900., 2500., 7200.])
+        values = dict(frc=8000., ftp=250., tte=2000., tau=12., tau2=20., a=30.)
+        jac = power_curve_jac(x, **values)
+        
+        assert jac.shape == (len(x), 6)
+        for i, name in enumerate(values):
+            h = 1e-6 * max(abs(values[name]), 1)
+            up, down = dict(values), dict(values)
+            up[name] += h
+            down[name] -= h
+            numeric = (power_curve(x, **up) - power_curve(x, **down)) / (2 * h)
+            np.testing.assert_allclose(jac[:, i], numeric, rtol=1e-5, atol=1e-7)
+    
+    def test_fit_with_jacobian(self):
+        """Test that the analytic Jacobian reaches the same optimum with fewer evaluations"""
+        df = pd.read_csv('data/mmpcurve.csv')
+        pdc = PDC(df['Secs'], df['Watts'])
+        
+        analytic = pdc.fit()
+        numeric = pdc.fit(jac=False)
+        
+        assert analytic.success
+        assert analytic.chisqr == pytest.approx(numeric.chisqr, rel=1e-4)
+        assert analytic.nfev < numeric.nfev / 2
+    
+    def test_fixed_parameters(self):
+        """Test that only the columns of varying parameters are returned to the solver"""
+        from PDC_Utils.pdc import _residual_jac
+        params = make_params()
+        params['tte'].vary = False
+        x = np.array([1., 60., 3000.])
+        
+        jac = _residual_jac(params, np.zeros(3), None, x=x)
+        
+        assert jac.shape == (3, 5)
+    
+    def test_broadcasts_over_parameter_rows(self):
+        """Test that one Jacobian per parameter row is returned for array parameters"""
+        x = np.array([1., 60., 3000.])
+        rows = np.array([[8000., 250., 2000., 12., 20., 30.],
+                         [9000., 280., 2500., 15., 22., 10.]])
+        
+        jac = power_curve_jac(x, *rows.T[:, :, None])
+        
+        assert jac.shape == (2, 3, 6)
+        np.testing.assert_allclose(jac[1], power_curve_jac(x, *rows[1]))
+
+
+class TestFitBatch:
+    """Test fitting many curves at once"""
+    
+    def setup_method(self):
+        """Load the sample curve and noisy copies of it"""
+        df = pd.read_csv('data/mmpcurve.csv')
+        self.x = df['Secs'].to_numpy()
+        rng = np.random.default_rng(0)
+        self.Y = df['Watts'].to_numpy() * rng.normal(1, 0.02, (8, len(df)))
+    
+    def test_matches_single_fits(self):
+        """Test that every row reaches the optimum of fitting it alone"""
+        table = fit_batch(self.x, self.Y, init='auto')
+        
+        assert table['success'].all()
+        for i, y in enumerate(self.Y):
+            single = PDC(self.x, y).fit(init='auto')
+            assert table['chisqr'][i] == pytest.approx(single.chisqr, rel=1e-3)
+            assert table['ftp'][i] == pytest.approx(single.best_values['ftp'], rel=1e-2)
+    
+    def test_missing_points_are_ignored(self):
+        """Test that NaN points are left out of a row's fit"""
+        Y = self.Y[:2].copy()
+        Y[0, ::3] = np.nan
+        keep = ~np.isnan(Y[0])
+        
+        table = fit_batch(self.x, Y, init='auto')
+        single = fit_batch(self.x[keep], Y[0, keep], init='auto')
+        
+        assert table['success'].all()
+        assert table['chisqr'][0] == pytest.approx(single['chisqr'][0], rel=1e-6)
+    
+    def test_too_few_points(self):
+        """Test that a row with fewer points than parameters is flagged as failed"""
+        Y = self.Y[:2].copy()
+        Y[1, 5:] = np.nan
+        
+        table = fit_batch(self.x, Y)
+        
+        assert list(table['success']) == [True, False]
+    
+    def test_dataframe_and_warm_start(self):
+        """Test that a DataFrame keeps its index and a previous table warm-starts the fit"""
+        Y = pd.DataFrame(self.Y[:3], index=['ann', 'bob', 'cid'])
+        
+        cold = fit_batch(self.x, Y, init='auto')
+        warm = fit_batch(self.x, Y, init=cold)
+        
+        assert list(cold.index) == ['ann', 'bob', 'cid']
+        assert set(PARAM_BOUNDS) <= set(cold.columns)
+        assert (warm['iterations'] < cold['iterations']).all()
+        np.testing.assert_allclose(warm['chisqr'], cold['chisqr'], rtol=1e-4)
+    
+    def test_parameters_within_bounds(self):
+        """Test that fitted values respect the parameter bounds"""
+        table = fit_batch(self.x, self.Y)
+        
+        for name, (_, lo, hi) in PARAM_BOUNDS.items():
+            assert ((table[name] >= lo) & (table[name] <= hi)).all()
+
+
+class TestFitMany:
+    """Test fitting many PDC objects concurrently"""
+    
+    def setup_method(self):
+        """Build PDC objects from noisy copies of the sample curve"""
+        df = pd.read_csv('data/mmpcurve.csv')
+        rng = np.random.default_rng(0)
+        Y = df['Watts'].to_numpy() * rng.normal(1, 0.02, (5, len(df)))
+        self.pdcs = [PDC(df['Secs'], y) for y in Y]
+    
+    @pytest.mark.parametrize('workers,backend', [(1, 'process'), (2, 'thread'), (2, 'process')])
+    def test_records_match_single_fits(self, workers, backend):
+        """Test that records come back in input order and match fitting each PDC alone"""
+        records = fit_many(self.pdcs, workers=workers, backend=backend, init='auto', chunksize=2)
+        
+        assert len(records) == len(self.pdcs)
+        for pdc, record in zip(self.pdcs, records):
+            assert isinstance(record, FitRecord)
+            assert record.success
+            assert record.chisqr == pytest.approx(pdc.fit(init='auto').chisqr)
+            assert set(record.stderr) == set(PARAM_BOUNDS)
+    
+    def test_timeout(self):
+        """Test that a fit exceeding its timeout is aborted and reported as failed"""
+        records = fit_many(self.pdcs[:1], workers=1, timeout=0)
+        
+        assert not records[0].success
+        assert records[0].message == 'Fit timed out.'
+    
+    def test_errors_are_reported(self):
+        """Test that a failing fit does not stop the others"""
+        records = fit_many([PDC([], [])] + self.pdcs[:1], workers=1)
+        
+        assert not records[0].success
+        assert records[0].best_values is None
+        assert records[0].message
+        assert records[1].success
+    
+    def test_warm_start_from_records(self):
+        """Test that previous records can be passed back as per-PDC starting points"""
+        first = fit_many(self.pdcs, workers=1, init='auto')
+        second = fit_many(self.pdcs, workers=1, init=first)
+        
+        assert all(b.nfev < a.nfev for a, b in zip(first, second))
+        assert fit_many(self.pdcs[:2], workers=1, init=first[0])[0].nfev < first[0].nfev
+    
+    def test_invalid_arguments(self):
+        """Test that unknown backends and mismatched inits are rejected"""
+        with pytest.raises(ValueError):
+            fit_many(self.pdcs, backend='cluster')
+        with pytest.raises(ValueError):
+            fit_many(self.pdcs, init=[None])
+
+
+class TestSeparableFit:
+    """Test the variable projection fit"""
+    
+    def setup_method(self):
+        """Load the sample curve"""
+        df = pd.read_csv('data/mmpcurve.csv')
+        self.pdc = PDC(df['Secs'], df['Watts'])
+    
+    def test_matches_full_fit(self):
+        """Test that the separable fit reaches the optimum of PDC.fit in fewer evaluations"""
+        full = self.pdc.fit()
+        record = self.pdc.fit_separable()
+        
+        assert isinstance(record, FitRecord)
+        assert record.success
+        assert record.chisqr <= full.chisqr * (1 + 1e-6)
+        assert record.nfev < full.nfev
+        for name in ('frc', 'ftp', 'tau', 'a'):
+            assert record.best_values[name] == pytest.approx(full.best_values[name], rel=1e-3)
+            assert record.stderr[name] == pytest.approx(full.params[name].stderr, rel=1e-3)
+    
+    def test_insensitive_to_starting_point(self):
+        """Test that starting points across the bounds converge to the same optimum"""
+        rng = np.random.default_rng(3)
+        best = self.pdc.fit_separable().chisqr
+        
+        for _ in range(5):
+            init = {name: rng.uniform(lo, hi) for name, (_, lo, hi) in PARAM_BOUNDS.items()}
+            record = self.pdc.fit_separable(init)
+            assert record.success
+            assert record.chisqr == pytest.approx(best, rel=1e-6)
+    
+    def test_failed_record_as_init(self):
+        """Test that a failed fit record, which has no values, starts from the defaults as PDC.fit does"""
+        record = self.pdc.fit_separable(init=FitRecord(message='Fit timed out.'))
+        
+        assert record.success
+        assert record.chisqr == pytest.approx(self.pdc.fit_separable().chisqr, rel=1e-6)
+        assert self.pdc.fit(init=FitRecord(message='Fit timed out.')).success
+    
+    def test_linear_parameters_stay_in_bounds(self):
+        """Test that linear values beyond their bounds are solved on the bound"""
+        record = PDC(self.pdc.x, 3 * self.pdc.y).fit_separable()
+        
+        assert record.success
+        assert record.best_values['ftp'] == pytest.approx(PARAM_BOUNDS['ftp'][2])
+        for name, (_, lo, hi) in PARAM_BOUNDS.items():
+            assert lo <= record.best_values[name] <= hi
+    
+    def test_timeout(self):
+        """Test that a separable fit exceeding its timeout is reported as failed"""
+        record = self.pdc.fit_separable(timeout=0)
+        
+        assert not record.success
+        assert record.message == 'Fit timed out.'
+    
+    def test_fit_many(self):
+        """Test that fit_many runs separable fits on its workers"""
+        records = fit_many([self.pdc] * 3, workers=2, backend='thread', separable=True)
+        
+        assert all(r.success for r in records)
+        assert records[0].chisqr == pytest.approx(self.pdc.fit_separable().chisqr)
+
+
+class TestThinCurve:
+    """Test thinning dense curves before fitting"""
+    
+    def setup_method(self):
+        """Build a per-second curve of a two-hour model ride"""
+        rng = np.random.default_rng(0)
+        self.x = np.arange(1., 7201.)
+        y = power_curve(self.x, 20000, 280, 2400, 15, 20, 30) * rng.normal(1, 0.01, len(self.x))
+        self.y = np.minimum.accumulate(y)
+    
+    def test_log_grid(self):
+        """Test that the short end is kept point by point and the rest thins to the log grid"""
+        x, y, w = thin_curve(self.x, self.y, per_decade=20)
+        
+        assert len(x) < 20 * np.log10(7200) + 1
+        np.testing.assert_array_equal(x[:8], np.arange(1, 9))
+        np.testing.assert_array_equal(w[:8], 1)
+        assert w @ w == pytest.approx(len(self.x))
+        assert np.all(np.diff(x) > 0)
+    
+    def test_fit_unchanged(self):
+        """Test that the weighted thinned curve fits to the parameters of the dense curve"""
+        dense = PDC(self.x, self.y).fit_separable()
+        thinned = PDC(self.x, self.y).thin()
+        
+        assert len(thinned.x) < 80
+        record = thinned.fit_separable()
+        for name, value in dense.best_values.items():
+            assert record.best_values[name] == pytest.approx(value, rel=0.01)
+        result = thinned.fit()
+        assert result.best_values['ftp'] == pytest.approx(dense.best_values['ftp'], rel=0.01)
+    
+    def test_submaximal_points_dropped(self):
+        """Test that points beaten by a longer duration are dropped but still weigh in their bin"""
+        x, y, w = thin_curve([1, 2, 3, 100, 1000], [900, 400, 500, 300, np.nan], per_decade=1)
+        
+        # 400 W at 2 s is beaten by 500 W at 3 s, so the first bin is the mean of 1 s and 3 s
+        np.testing.assert_array_equal(x, [2, 100])
+        np.testing.assert_array_equal(y, [700, 300])
+        np.testing.assert_allclose(w, [np.sqrt(3), 1])
+    
+    def test_hull(self):
+        """Test that bins below the upper concave hull of work are dropped"""
+        x, y, w = thin_curve([1, 2, 3, 4], [1000, 520, 400, 300], hull=True)
+        
+        # The work at 2 s lies below the chord from 1 s to 3 s
+        np.testing.assert_array_equal(x, [1, 3, 4])
+        assert len(thin_curve(self.x, self.y, hull=True)[0]) < len(thin_curve(self.x, self.y)[0])
+    
+    def test_weights(self):
+        """Test that input weights combine into the bin weights and weighted means"""
+        x, y, w = thin_curve([10, 11], [300, 290], per_decade=1, weights=[1, 3])
+        
+        assert w[0] == pytest.approx(np.sqrt(10))
+        assert x[0] == pytest.approx(10.9)
+        assert y[0] == pytest.approx(291)
+    
+    def test_fit_many_weights(self):
+        """Test that fit_many fits weighted curves with their weights"""
+        thinned = PDC(self.x, self.y).thin()
+        
+        record = fit_many([thinned], workers=1, separable=True)[0]
+        assert record.chisqr == pytest.approx(thinned.fit_separable().chisqr)
+
+
+class TestBootstrap:
+    """Test bootstrap intervals of the fitted parameters"""
+    
+    def setup_method(self):
+        """Load the sample curve"""
+        df = pd.read_csv('data/mmpcurve.csv')
+        self.pdc = PDC(df['Secs'], df['Watts'])
+    
+    def test_resample_weights(self):
+        """Test that resample weights are the square roots of how often each point was drawn"""
+        W = _resample_weights(50, 20, None, np.random.default_rng(0))
+        
+        assert W.shape == (50, 20)
+        np.testing.assert_allclose((W ** 2).sum(axis=1), 20)
+        np.testing.assert_allclose(W ** 2, np.round(W ** 2))
+        np.testing.assert_allclose(_resample_weights(1, 3, [2., 2., 2.], np.random.default_rng(0)) ** 2 / 4,
+                                   _resample_weights(1, 3, None, np.random.default_rng(0)) ** 2)
+    
+    def test_batch(self):
+        """Test that batch refits give intervals around the fit of the full curve"""
+        boot = self.pdc.bootstrap(200, method='batch', seed=0)
+        
+        assert isinstance(boot, BootstrapResult)
+        assert len(boot.samples) == 200
+        assert boot.samples['success'].mean() > 0.95
+        assert list(boot.intervals.index) == list(PARAM_BOUNDS)
+        for name in ('frc', 'ftp', 'tau', 'a'):
+            lower, value, upper = boot.intervals.loc[name, ['lower', 'value', 'upper']]
+            assert lower < value < upper
+    
+    @pytest.mark.parametrize('method,backend', [('separable', 'process'), ('fit', 'thread')])
+    def test_fit_many(self, method, backend):
+        """Test that refits on the workers of fit_many agree with the batch intervals"""
+        boot = self.pdc.bootstrap(40, method=method, workers=2, backend=backend, chunksize=10, seed=0)
+        batch = self.pdc.bootstrap(40, method='batch', seed=0)
+        
+        assert boot.samples['success'].all()
+        assert boot.base.success
+        # Same seed, same resamples: both fitters find the same optima
+        ok = batch.samples['success'].to_numpy()
+        np.testing.assert_allclose(boot.samples.loc[ok, 'ftp'], batch.samples.loc[ok, 'ftp'], rtol=1e-3)
+    
+    def test_level_and_seed(self):
+        """Test that wider levels widen the intervals and seeds make resamples reproducible"""
+        narrow = self.pdc.bootstrap(100, level=0.5, method='batch', seed=1)
+        wide = self.pdc.bootstrap(100, level=0.99, method='batch', seed=1)
+        
+        pd.testing.assert_frame_equal(narrow.samples, wide.samples)
+        assert wide.intervals.loc['ftp', 'lower'] < narrow.intervals.loc['ftp', 'lower']
+        assert wide.intervals.loc['ftp', 'upper'] > narrow.intervals.loc['ftp', 'upper']
+    
+    def test_invalid_method(self):
+        """Test that unknown methods are rejected"""
+        with pytest.raises(ValueError):
+            self.pdc.bootstrap(10, method='jackknife')
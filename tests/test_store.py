@@ -0,0 +1,162 @@
+"""Tests for the memory-mapped activity store"""
+
+import json
+import pytest
+import numpy as np
+from unittest.mock import patch
+from PDC_Utils.fit import FitLoader
+from PDC_Utils.store import ActivityStore
+
+
+class TestActivityStore:
+    """Test the ActivityStore class"""
+    
+    def test_add_get_roundtrip(self, tmp_path):
+        """Test that stored columns are returned unchanged as memory-mapped views"""
+        store = ActivityStore(tmp_path)
+        times = np.datetime64('2024-05-01T08:00:00') + np.array([0, 1, 2, 4])
+        store.add('ride', times, np.array([100, 250, 0, 65534]))
+        
+        activity = store.get('ride')
+        
+        assert np.array_equal(activity.timestamp, times)
+        assert np.array_equal(activity.power, [100, 250, 0, 65534])
+        assert np.array_equal(activity.elapsed_time, [0, 1, 2, 4])
+        assert not activity.power.flags.owndata
+        assert not activity.power.flags.writeable
+    
+    def test_missing_timestamps(self, tmp_path):
+        """Test that missing timestamps round-trip as NaT with NaN elapsed time"""
+        store = ActivityStore(tmp_path)
+        times = np.array(['NaT', '2024-05-01T08:00:00', '2024-05-01T08:00:03'], dtype='datetime64[s]')
+        store.add('ride', times, np.array([5, 6, 7]))
+        
+        activity = store.get('ride')
+        
+        assert np.isnat(activity.timestamp[0])
+        np.testing.assert_array_equal(activity.elapsed_time, [np.nan, 0, 3])
+    
+    def test_index_persists(self, tmp_path):
+        """Test that a reopened store finds its activities"""
+        store = ActivityStore(tmp_path)
+        store.add('a', np.datetime64('2024-01-01') + np.arange(3), np.array([1, 2, 3]))
+        store.add('b', np.datetime64('2024-01-02') + np.arange(5), np.array([4, 5, 6, 7, 8]))
+        
+        reopened = ActivityStore(tmp_path)
+        
+        assert len(reopened) == 2
+        assert 'a' in reopened and 'c' not in reopened
+        assert list(reopened) == ['a', 'b']
+        assert np.array_equal(reopened.get('b').power, [4, 5, 6, 7, 8])
+    
+    def test_batch_writes_index_once(self, tmp_path):
+        """Test that adds inside a batch write the index once, when the outermost block exits"""
+        store = ActivityStore(tmp_path)
+        
+        with patch.object(ActivityStore, '_write_index', autospec=True,
+                          side_effect=ActivityStore._write_index) as write:
+            with store.batch():
+                for i in range(5):
+                    store.add(str(i), np.datetime64('2024-01-01') + np.arange(3), np.array([1, 2, i]))
+                with store.batch():
+                    store.add('nested', np.datetime64('2024-01-02') + np.arange(2), np.array([7, 8]))
+                assert write.call_count == 0
+                assert len(ActivityStore(tmp_path)) == 0
+        
+        assert write.call_count == 1
+        reopened = ActivityStore(tmp_path)
+        assert list(reopened) == ['0', '1', '2', '3', '4', 'nested']
+        assert np.array_equal(reopened.get('4').power, [1, 2, 4])
+    
+    def test_batch_keeps_adds_on_error(self, tmp_path):
+        """Test that activities added before an error in a batch are still indexed"""
+        store = ActivityStore(tmp_path)
+        
+        with pytest.raises(ValueError):
+            with store.batch():
+                store.add('a', np.datetime64('2024-01-01') + np.arange(3), np.array([1, 2, 3]))
+                store.add('b', np.datetime64('2024-01-01') + np.arange(3), np.array([1, 2]))
+        
+        assert list(ActivityStore(tmp_path)) == ['a']
+    
+    def test_unknown_version(self, tmp_path):
+        """Test that an index written by another store version is rejected"""
+        (tmp_path / 'index.json').write_text(json.dumps({'version': 99, 'activities': {}}))
+        
+        with pytest.raises(ValueError, match="version"):
+            ActivityStore(tmp_path)
+    
+    def test_mismatched_lengths(self, tmp_path):
+        """Test that columns of different lengths are rejected"""
+        with pytest.raises(ValueError):
+            ActivityStore(tmp_path).add('a', np.datetime64('2024-01-01') + np.arange(3), np.array([1, 2]))
+    
+    def test_replace_and_compact(self, tmp_path):
+        """Test that replacing an activity serves the new columns and compact reclaims the old ones"""
+        store = ActivityStore(tmp_path)
+        store.add('a', np.datetime64('2024-01-01') + np.arange(100), np.full(100, 1))
+        store.add('b', np.datetime64('2024-01-02') + np.arange(3), np.array([7, 8, 9]))
+        store.add('a', np.datetime64('2024-01-01') + np.arange(2), np.array([2, 3]))
+        size = store.size()
+        
+        store.compact()
+        
+        assert store.size() < size
+        assert np.array_equal(store.get('a').power, [2, 3])
+        assert np.array_equal(ActivityStore(tmp_path).get('b').power, [7, 8, 9])
+
+
+class TestActivityStoreFit:
+    """Test storing FIT files and computing MMP curves from the store"""
+    
+    def test_add_fit_matches_loader(self, fit_file_factory, tmp_path):
+        """Test that a stored FIT file gives the loader's records and MMP curve"""
+        path = fit_file_factory([100, 300, 200, 400, 250], timestamps=[0, 1, 2, 4, 5])
+        store = ActivityStore(tmp_path / 'store')
+        loader = FitLoader(path)
+        
+        activity_id = store.add_fit(path)
+        
+        assert activity_id == path.stem
+        expected = loader.extract_power_data()
+        frame = store.get(activity_id).to_frame()
+        assert frame['timestamp'].equals(expected['timestamp'])
+        assert np.array_equal(frame['power'], expected['power'])
+        assert np.array_equal(frame['elapsed_time'], expected['elapsed_time'])
+        for gaps in ('zero', 'break'):
+            x, y = store.mmp_curve(activity_id, [1, 2, 3], gaps=gaps, max_gap=0.5)
+            ex, ey = loader.compute_mmp_curve([1, 2, 3], gaps=gaps, max_gap=0.5)
+            assert np.array_equal(x, ex)
+            np.testing.assert_allclose(y, ey)
+    
+    def test_stored_activity_skips_decoding(self, fit_file_factory, tmp_path):
+        """Test that neither adding again nor computing a curve decodes the FIT file"""
+        path = fit_file_factory([100, 300, 200, 400, 250])
+        store = ActivityStore(tmp_path / 'store')
+        store.add_fit(path)
+        
+        with patch.object(FitLoader, '_decode_power_data') as decode:
+            store.add_fit(path)
+            x, y = ActivityStore(tmp_path / 'store').mmp_curve(path.stem, [1, 2, 3])
+        
+        decode.assert_not_called()
+        np.testing.assert_allclose(y, [400, 325, 300])
+    
+    def test_add_fit_name_collision(self, fit_file_factory, tmp_path):
+        """Test that a different file with an already stored name is refused instead of silently skipped"""
+        first = fit_file_factory([100, 200, 300], path=tmp_path / 'ride.fit')
+        (tmp_path / 'b').mkdir()
+        second = fit_file_factory([400, 500, 600], path=tmp_path / 'b' / 'ride.fit')
+        store = ActivityStore(tmp_path / 'store')
+        store.add_fit(first)
+        
+        with pytest.raises(ValueError, match="ride"):
+            ActivityStore(tmp_path / 'store').add_fit(second)
+        
+        assert store.add_fit(first) == 'ride'
+        assert store.add_fit(second, 'ride-b') == 'ride-b'
+        assert store.add_fit(second, overwrite=True) == 'ride'
+        assert np.array_equal(store.get('ride').power, [400, 500, 600])
+        store.add('ride', np.datetime64('2024-01-01') + np.arange(2), np.array([1, 2]))
+        assert store.add_fit(first) == 'ride'
+        assert np.array_equal(store.get('ride').power, [1, 2])